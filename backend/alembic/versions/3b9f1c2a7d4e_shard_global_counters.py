@@ -0,0 +1,58 @@
+"""shard_global_counters
+
+Revision ID: 3b9f1c2a7d4e
+Revises: fe7a432d7e9d
+Create Date: 2026-10-18 10:12:41.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9f1c2a7d4e'
+down_revision: Union[str, Sequence[str], None] = 'fe7a432d7e9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # global_counter becomes N slot rows (id=1..N) summed on read; the
+    # existing id=1 row keeps the current total as slot 1.
+    op.alter_column(
+        'global_counter',
+        'total_clicks',
+        existing_type=sa.Integer(),
+        type_=sa.BigInteger(),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold all slots back into the single id=1 row before narrowing the type
+    op.execute("""
+        INSERT INTO global_counter (id, total_clicks)
+        SELECT 1, COALESCE(SUM(total_clicks), 0) FROM global_counter
+        ON CONFLICT (id) DO UPDATE SET total_clicks = EXCLUDED.total_clicks
+    """)
+    op.execute("DELETE FROM global_counter WHERE id <> 1")
+    op.execute("""
+        INSERT INTO global_state (id, global_clicks, updated_at)
+        SELECT 1, COALESCE(SUM(global_clicks), 0), COALESCE(MAX(updated_at), now())
+        FROM global_state
+        HAVING COUNT(*) > 0
+        ON CONFLICT (id) DO UPDATE
+        SET global_clicks = EXCLUDED.global_clicks, updated_at = EXCLUDED.updated_at
+    """)
+    op.execute("DELETE FROM global_state WHERE id <> 1")
+    op.alter_column(
+        'global_counter',
+        'total_clicks',
+        existing_type=sa.BigInteger(),
+        type_=sa.Integer(),
+        existing_nullable=False,
+    )
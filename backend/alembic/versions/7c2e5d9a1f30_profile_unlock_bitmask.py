@@ -0,0 +1,72 @@
+"""profile_unlock_bitmask
+
+Revision ID: 7c2e5d9a1f30
+Revises: 3b9f1c2a7d4e
+Create Date: 2026-10-18 16:20:07.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5d9a1f30'
+down_revision: Union[str, Sequence[str], None] = '3b9f1c2a7d4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cosmetic bit positions as of this revision (app.domain.cosmetics may grow,
+# but existing positions never change)
+COSMETIC_BITS = {
+    'default': 0,
+    'neon': 1,
+    'amber': 2,
+    'violet': 3,
+    'cyan': 4,
+    'ember': 5,
+    'hazard': 6,
+    'prism': 7,
+    'specter': 8,
+}
+
+_CATALOG = ", ".join(
+    f"('{cosmetic_id}', {1 << bit})" for cosmetic_id, bit in COSMETIC_BITS.items()
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'profiles',
+        sa.Column('unlocked_mask', sa.BigInteger(), server_default='1', nullable=False),
+    )
+    # Fold unlock rows into the mask; ids outside the catalog have no bit
+    op.execute(f"""
+        UPDATE profiles p
+        SET unlocked_mask = 1 | u.mask
+        FROM (
+            SELECT uc.device_id, bit_or(c.bit) AS mask
+            FROM unlocked_cosmetics uc
+            JOIN (VALUES {_CATALOG}) AS c(cosmetic_id, bit)
+              ON c.cosmetic_id = uc.cosmetic_id
+            GROUP BY uc.device_id
+        ) u
+        WHERE u.device_id = p.device_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Restore unlock rows for anything unlocked since the upgrade
+    op.execute(f"""
+        INSERT INTO unlocked_cosmetics (device_id, cosmetic_id, created_at)
+        SELECT p.device_id, c.cosmetic_id, now()
+        FROM profiles p
+        JOIN (VALUES {_CATALOG}) AS c(cosmetic_id, bit)
+          ON p.unlocked_mask & c.bit <> 0
+        WHERE c.cosmetic_id <> 'default'
+        ON CONFLICT ON CONSTRAINT uq_device_cosmetic DO NOTHING
+    """)
+    op.drop_column('profiles', 'unlocked_mask')
@@ -1,77 +1,140 @@
 """Click endpoints"""
-from datetime import datetime, timezone
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import update
-from sqlalchemy.orm import Session
 
+from app.concurrency import call
 from app.config import settings
-from app.deps import get_db_session
+from app.deps import get_click_service, get_click_writer
 from app.domain.models import utc_now
-from app.models import GlobalCounterORM, UserORM
-from app.schemas.click import ClickIncrementRequest, ClickIncrementResponse
+from app.metrics import REGISTRY
+from app.repositories.interfaces import ClickBufferFull, ClickWriter
+from app.schemas.click import (
+    ClickBatchRequest,
+    ClickBatchResponse,
+    ClickBatchResult,
+    ClickIncrementRequest,
+    ClickIncrementResponse,
+)
+from app.services.click_service import ClickService
 
 router = APIRouter()
 
+CLICKS_APPLIED = REGISTRY.counter("clicks_applied_total", "Clicks applied (sum of deltas), every write mode")
+
 
 @router.post("/increment", response_model=ClickIncrementResponse)
-def increment_clicks(
+async def increment_clicks(
     request: ClickIncrementRequest,
-    db: Annotated[Session, Depends(get_db_session)],
+    click_writer: Annotated[ClickWriter, Depends(get_click_writer)],
+    click_service: Annotated[ClickService, Depends(get_click_service)],
 ) -> ClickIncrementResponse:
     """
     Increment clicks for a user and globally.
-    
+
     Delta is validated to be in range 1..10 by Pydantic.
-    Updates both per-user user.total_clicks and global_counter.total_clicks atomically within a single transaction.
+    In postgres mode, updates both per-user user.total_clicks and the global counter atomically within a single transaction.
+    The global counter is sharded over GLOBAL_COUNTER_SHARDS slot rows; global_clicks is their sum.
+    CLICK_WRITE_MODE picks the write path:
+    - direct: one statement per click (commit happens in the session dependency)
+    - group_commit: concurrent clicks share one transaction; still durable before responding
+    - write_behind: clicks are buffered and flushed in batches; counts are projected
+    In inmemory mode, clicks go through ClickService.
     """
-    if settings.repository_mode != "postgres":
-        raise HTTPException(status_code=500, detail="repository_mode must be postgres")
-
-    user_id = request.user_id
-    delta = request.delta
-    now = datetime.now(timezone.utc)
-
-    user = db.get(UserORM, user_id)
-    if user is None:
-        user = UserORM(user_id=user_id, total_clicks=0, created_at=now, last_seen=now)
-        db.add(user)
-        db.flush()
-
-    global_counter = db.get(GlobalCounterORM, 1)
-    if global_counter is None:
-        raise HTTPException(status_code=500, detail="Global counter not initialized")
-
-    db.execute(
-        update(UserORM)
-        .where(UserORM.user_id == user_id)
-        .values(total_clicks=UserORM.total_clicks + delta, last_seen=now)
-    )
-
-    db.execute(
-        update(GlobalCounterORM)
-        .where(GlobalCounterORM.id == 1)
-        .values(total_clicks=GlobalCounterORM.total_clicks + delta)
-    )
+    if settings.repository_mode == "inmemory":
+        profile, global_state = await call(
+            click_service.increment_clicks, request.user_id, request.delta
+        )
+        CLICKS_APPLIED.inc(request.delta)
+        return ClickIncrementResponse(
+            device_id=profile.device_id,
+            my_clicks=profile.my_clicks,
+            global_clicks=global_state.global_clicks,
+            selected_cosmetic=profile.selected_cosmetic,
+            unlocked_cosmetics=profile.unlocked_cosmetics,
+            occurred_at=utc_now(),
+            schema_version=1,
+        )
 
-    db.flush()
+    if settings.repository_mode != "postgres":
+        raise HTTPException(status_code=500, detail="repository_mode must be postgres or inmemory")
 
-    user = db.get(UserORM, user_id)
-    global_counter = db.get(GlobalCounterORM, 1)
+    try:
+        my_clicks, global_clicks = await call(
+            click_writer.increment, request.user_id, request.delta
+        )
+    except ClickBufferFull:
+        raise HTTPException(status_code=503, detail="Click buffer is full, retry shortly")
+    CLICKS_APPLIED.inc(request.delta)
 
     # Cosmetics are not wired to users(user_id) yet.
     # Keep response stable for now; re-wire after profile/user consolidation.
     selected_cosmetic = "default"
     unlocked_cosmetics: list[str] = []
 
-    # Single session transaction; commit happens in get_db().
     return ClickIncrementResponse(
-        device_id=user_id,
-        my_clicks=user.total_clicks,
-        global_clicks=global_counter.total_clicks,
+        device_id=request.user_id,
+        my_clicks=my_clicks,
+        global_clicks=global_clicks,
         selected_cosmetic=selected_cosmetic,
         unlocked_cosmetics=unlocked_cosmetics,
         occurred_at=utc_now(),
         schema_version=1,
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/increment-batch", response_model=ClickBatchResponse)
+async def increment_clicks_batch(
+    request: ClickBatchRequest,
+    click_writer: Annotated[ClickWriter, Depends(get_click_writer)],
+    click_service: Annotated[ClickService, Depends(get_click_service)],
+) -> ClickBatchResponse:
+    """
+    Increment clicks for many users at once.
+
+    Each entry follows the single-click rules (delta 1..10, device_id alias).
+    Entries for the same user are merged. In postgres mode the batch goes
+    through the CLICK_WRITE_MODE writer as a whole: direct is one multi-row
+    upsert into users plus one global counter update in the request
+    transaction, group_commit joins the next group transaction, and
+    write_behind buffers it. At most CLICK_BATCH_MAX_SIZE entries per request.
+    """
+    if len(request.clicks) > settings.click_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.click_batch_max_size} entries",
+        )
+
+    deltas: dict[str, int] = {}
+    for click in request.clicks:
+        deltas[click.user_id] = deltas.get(click.user_id, 0) + click.delta
+
+    if settings.repository_mode == "inmemory":
+        profiles, global_state = await call(click_service.increment_clicks_batch, deltas)
+        user_totals = {device_id: p.my_clicks for device_id, p in profiles.items()}
+        global_clicks = global_state.global_clicks
+    elif settings.repository_mode == "postgres":
+        try:
+            user_totals, global_clicks = await call(click_writer.increment_many, deltas)
+        except ClickBufferFull:
+            raise HTTPException(status_code=503, detail="Click buffer is full, retry shortly")
+    else:
+        raise HTTPException(status_code=500, detail="repository_mode must be postgres or inmemory")
+    CLICKS_APPLIED.inc(sum(deltas.values()))
+
+    results = None
+    if request.include_results:
+        results = [
+            ClickBatchResult(device_id=user_id, my_clicks=user_totals[user_id])
+            for user_id in deltas
+        ]
+
+    return ClickBatchResponse(
+        applied=len(request.clicks),
+        users=len(deltas),
+        total_delta=sum(deltas.values()),
+        global_clicks=global_clicks,
+        results=results,
+        occurred_at=utc_now(),
+        schema_version=1,
+    )
@@ -3,7 +3,9 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends
 
+from app.concurrency import call
 from app.deps import get_cosmetic_service
+from app.metrics import REGISTRY
 from app.services.cosmetic_service import CosmeticService
 from app.schemas.cosmetic import (
     CosmeticSelectRequest,
@@ -14,6 +16,10 @@ from app.schemas.cosmetic import (
 
 router = APIRouter()
 
+UNLOCKS = REGISTRY.counter(
+    "cosmetic_unlocks_total", "Successful unlock requests (repeats of an unlock included)"
+)
+
 
 @router.put("/selected", response_model=CosmeticSelectResponse)
 async def select_cosmetic(
@@ -26,7 +32,8 @@ async def select_cosmetic(
     Validates that the cosmetic is in the user's unlocked_cosmetics list.
     Returns 400 if cosmetic is not unlocked.
     """
-    profile = cosmetic_service.select_cosmetic(
+    profile = await call(
+        cosmetic_service.select_cosmetic,
         request.device_id,
         request.selected_cosmetic
     )
@@ -49,10 +56,12 @@ async def unlock_cosmetic(
     
     Idempotent - does not add duplicates to unlocked_cosmetics list.
     """
-    profile = cosmetic_service.unlock_cosmetic(
+    profile = await call(
+        cosmetic_service.unlock_cosmetic,
         request.device_id,
         request.cosmetic_id
     )
+    UNLOCKS.inc()
     
     return CosmeticUnlockResponse(
         device_id=profile.device_id,
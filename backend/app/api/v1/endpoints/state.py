@@ -1,11 +1,95 @@
-from fastapi import APIRouter, Depends
+import asyncio
 
-from app.deps import get_click_service
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.concurrency import call
+from app.config import settings
+from app.deps import get_global_broadcaster, get_read_click_service
+from app.domain.models import GlobalState
 from app.schemas.global_state import GlobalStateResponse
 from app.services.click_service import ClickService
+from app.services.global_broadcaster import GlobalStateBroadcaster
 
 router = APIRouter()
 
 @router.get("/global", response_model=GlobalStateResponse)
-def get_global_state(click_service: ClickService = Depends(get_click_service)) -> GlobalStateResponse:
-    return click_service.get_global_state()
+async def get_global_state(click_service: ClickService = Depends(get_read_click_service)) -> GlobalStateResponse:
+    return await call(click_service.get_global_state)
+
+
+def _to_json(state: GlobalState) -> str:
+    return GlobalStateResponse(
+        global_clicks=state.global_clicks,
+        updated_at=state.updated_at,
+        schema_version=state.schema_version,
+    ).model_dump_json()
+
+
+async def _sse_events(broadcaster: GlobalStateBroadcaster, heartbeat_s: float):
+    async with broadcaster.subscribe() as queue:
+        while True:
+            try:
+                state = await asyncio.wait_for(queue.get(), heartbeat_s)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: global\ndata: {_to_json(state)}\n\n"
+
+
+@router.get("/global/stream")
+async def stream_global_state(
+    broadcaster: GlobalStateBroadcaster = Depends(get_global_broadcaster),
+) -> StreamingResponse:
+    """Server-Sent Events: one `global` event per (coalesced) counter change"""
+    return StreamingResponse(
+        _sse_events(broadcaster, settings.global_stream_heartbeat_s),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _ws_send_updates(
+    websocket: WebSocket, broadcaster: GlobalStateBroadcaster, queue: asyncio.Queue, heartbeat_s: float
+) -> None:
+    while True:
+        try:
+            state = await asyncio.wait_for(queue.get(), heartbeat_s)
+        except asyncio.TimeoutError:
+            # Keep-alive: repeat the current count, which clients already handle
+            state = broadcaster.latest
+            if state is None:
+                continue
+        await websocket.send_text(_to_json(state))
+
+
+async def _ws_wait_closed(websocket: WebSocket) -> None:
+    # Clients send nothing; reading is how a disconnect is noticed while idle
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/global/ws")
+async def global_state_ws(
+    websocket: WebSocket,
+    broadcaster: GlobalStateBroadcaster = Depends(get_global_broadcaster),
+) -> None:
+    """WebSocket variant of /global/stream: one JSON message per change"""
+    await websocket.accept()
+    async with broadcaster.subscribe() as queue:
+        sender = asyncio.create_task(
+            _ws_send_updates(websocket, broadcaster, queue, settings.global_stream_heartbeat_s)
+        )
+        closed = asyncio.create_task(_ws_wait_closed(websocket))
+        try:
+            done, _ = await asyncio.wait({sender, closed}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Either way the client is gone (or we are): unsubscribe now
+            sender.cancel()
+            closed.cancel()
+            await asyncio.gather(sender, closed, return_exceptions=True)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
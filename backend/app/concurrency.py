@@ -0,0 +1,15 @@
+"""Helpers for calling sync or async service methods from async endpoints"""
+import inspect
+from typing import Any, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+
+async def call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Await coroutine functions directly; run blocking callables in the
+    threadpool so they never stall the event loop.
+    """
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await run_in_threadpool(func, *args, **kwargs)
@@ -8,13 +8,69 @@ class Settings(BaseSettings):
     cors_origins: str = "http://localhost:5173,http://127.0.0.1:5173"
     host: str = "0.0.0.0"
     port: int = 8000
+    server_workers: int = 0  # python -m app.serve: 0 = one per CPU of the cgroup quota
+    server_backlog: int = 2048  # Listen queue for connection bursts
+    server_keep_alive_s: int = 75  # Idle keep-alive; above typical LB idle timeouts (60s)
+    server_graceful_shutdown_s: int = 20  # SIGTERM: max wait for in-flight requests
+    server_limit_concurrency: int = 0  # Per-worker connection cap answered with 503 (0 = none)
+    server_access_log: bool = False  # Per-request access log lines
+    metrics_enabled: bool = True  # /metrics + per-route request, DB statement and pool metrics
+    debug: bool = False  # Server-Timing header with each request's DB time and statement count
+    db_slow_statement_ms: float = 200  # Log statements slower than this with their route (0 = off)
     database_url: str = ""  # Set explicitly or build from DB_* vars
     db_host: str = "localhost"
     db_port: int = 5432
     db_name: str = "button0"
     db_user: str = "button0"
     db_password: str = ""
+    # Connections per process: DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW (sync and async
+    # engines each); times workers and replicas, this must fit max_connections
+    db_pool_mode: str = "queue"  # "queue" (pool per process) or "pooler" (behind PgBouncer transaction mode)
+    db_pool_size: int = 5  # Connections kept open (queue mode)
+    db_pool_max_overflow: int = 10  # Extra connections under load, closed when returned
+    db_pool_timeout_s: float = 30  # Max wait for a free connection before failing the request
+    db_pool_recycle_s: int = -1  # Reopen connections older than this (-1 = never)
+    db_pool_pre_ping: str = "idle"  # "always", "idle" (after DB_POOL_PRE_PING_IDLE_S unused) or "never"
+    db_pool_pre_ping_idle_s: float = 30
+    db_statement_timeout_ms: int = 0  # Server-side statement_timeout (0 = server default)
+    database_replica_url: str = ""  # postgres mode: read replica for read-only endpoints ("" = off)
+    replica_max_lag_ms: int = 1000  # Read from the primary while the replica is further behind
+    replica_check_interval_ms: int = 1000  # How often replication lag is measured
     repository_mode: str = "inmemory"  # "inmemory" or "postgres"
+    inmemory_profile_stripes: int = 1  # >1: lock-striped profile store with N shards
+    inmemory_profile_compact: bool = False  # Columnar profile store (overrides stripes)
+    inmemory_profile_shared: bool = False  # Profile table in shared memory (multi-worker)
+    inmemory_global_counter: str = "locked"  # "locked", "per_thread" or "shared" (multi-worker)
+    inmemory_shared_name: str = "button0"  # Prefix of the shared memory segments
+    inmemory_shared_profile_capacity: int = 100_000  # Fixed size of the shared profile table
+    inmemory_shared_worker_slots: int = 256  # Max worker processes on the shared counter
+    inmemory_journal_dir: str = ""  # Journal + snapshots for the in-memory stores ("" = off)
+    inmemory_journal_flush_ms: int = 50  # Group fsync period (max writes lost on a crash)
+    inmemory_snapshot_interval_s: float = 60  # Fold the journal into a snapshot this often
+    database_async: bool = False  # postgres mode: asyncpg engine + async repositories
+    global_counter_shards: int = 1  # Counter slots for global click rows (1 = single row)
+    click_write_mode: str = "direct"  # "direct", "write_behind" or "group_commit" (postgres mode)
+    click_flush_interval_ms: int = 250  # Write-behind flush period
+    click_flush_max_entries: int = 1000  # Flush early once this many users are pending
+    click_buffer_max_users: int = 100_000  # Hard bound on buffered users (backpressure)
+    click_known_users_max: int = 100_000  # Write-behind: durable user totals kept in memory
+    click_group_commit_window_ms: float = 3  # How long a batch leader waits for more clicks
+    click_group_commit_max_batch: int = 256  # Commit early once this many clicks joined
+    click_batch_max_size: int = 5000  # Max entries per /clicks/increment-batch request
+    global_state_cache: bool = False  # postgres mode: serve global state from memory
+    global_state_cache_refresh_ms: int = 250  # Background reload period for the cache
+    global_stream_max_rate_hz: float = 10  # Max global counter pushes per second
+    global_stream_heartbeat_s: float = 15  # Idle keep-alive: SSE comment, WebSocket repeat of the count
+    event_bus: str = "none"  # "none", "memory" or "postgres" (postgres mode)
+    event_bus_channel: str = "button0_events"  # LISTEN/NOTIFY channel
+    event_bus_flush_ms: int = 100  # Counter delta batching period
+    profile_cache: bool = False  # postgres mode: read-through profile cache
+    profile_cache_max_entries: int = 10_000  # LRU bound on cached profiles
+    profile_cache_ttl_s: float = 5.0  # Max age of a cached profile
+    profile_tiering: bool = False  # postgres mode: hot profiles in memory, written back in batches
+    profile_tier_hot_max_entries: int = 100_000  # LRU bound on in-memory (hot) profiles
+    profile_tier_flush_ms: int = 500  # Write-back period for dirty profiles
+    profile_tier_flush_batch: int = 1000  # Profiles per write-back statement
     
     class Config:
         env_file = ".env"
@@ -37,9 +93,26 @@ class Settings(BaseSettings):
         
         return "sqlite:///./button0.db"
     
+    def get_async_database_url(self) -> str:
+        """Database URL with the asyncio driver (asyncpg / aiosqlite)"""
+        return _with_async_driver(self.get_database_url())
+
+    def get_async_replica_url(self) -> str:
+        """Replica URL with the asyncio driver"""
+        return _with_async_driver(self.database_replica_url)
+    
     def get_cors_origins(self) -> list[str]:
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
 
+def _with_async_driver(url: str) -> str:
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite:///"):
+        return "sqlite+aiosqlite:///" + url[len("sqlite:///"):]
+    return url
+
+
 settings = Settings()
\ No newline at end of file
@@ -1,22 +1,136 @@
 """Database configuration and session management for SQLAlchemy 2.0"""
-from sqlalchemy import create_engine
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
 from app.config import settings
+from app.instrumentation import instrument_engine, timed_pool_class
 
-# Create engine from environment variable or build from DB_* vars
-engine = create_engine(
-    settings.get_database_url(),
-    echo=False,  # Set to True for SQL query logging in development
-    pool_pre_ping=True,  # Verify connections before use
-)
+# Engines and session factories are created on first use: in-memory mode
+# never builds them, and the asyncpg driver is only needed in async mode.
+_engine: Engine | None = None
+_session_factory: sessionmaker[Session] | None = None
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+# Optional read replica (DATABASE_REPLICA_URL) for read-only endpoints
+_replica_engine: Engine | None = None
+_replica_session_factory: sessionmaker[Session] | None = None
+_async_replica_engine: AsyncEngine | None = None
+_async_replica_session_factory: async_sessionmaker[AsyncSession] | None = None
 
-# Create session factory
-SessionLocal = sessionmaker(
-    bind=engine,
-    autocommit=False,
-    autoflush=False,
-    expire_on_commit=False,
-)
+
+def _pooler_mode() -> bool:
+    if settings.db_pool_mode not in ("queue", "pooler"):
+        raise ValueError(f"Invalid DB_POOL_MODE: {settings.db_pool_mode}. Must be 'queue' or 'pooler'")
+    return settings.db_pool_mode == "pooler"
+
+
+def _pool_options(queue_pool_class: type, label: str) -> dict:
+    """create_engine pool arguments from the DB_POOL_* settings"""
+    if _pooler_mode():
+        # A transaction-mode pooler (PgBouncer) does the pooling: each checkout
+        # opens a fresh server-side-stateless connection to it
+        poolclass, options = NullPool, {}
+    else:
+        if settings.db_pool_pre_ping not in ("always", "idle", "never"):
+            raise ValueError(
+                f"Invalid DB_POOL_PRE_PING: {settings.db_pool_pre_ping}. "
+                f"Must be 'always', 'idle' or 'never'"
+            )
+        poolclass = queue_pool_class
+        options = {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_pool_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_s,
+            "pool_recycle": settings.db_pool_recycle_s,
+            "pool_pre_ping": settings.db_pool_pre_ping == "always",
+        }
+    if settings.metrics_enabled:
+        poolclass = timed_pool_class(poolclass, label)
+    return {"poolclass": poolclass, **options}
+
+
+def _configure(engine: Engine) -> None:
+    """Idle pre-ping and, behind a pooler, the per-transaction statement_timeout"""
+    if not _pooler_mode() and settings.db_pool_pre_ping == "idle":
+        _ping_idle_connections(engine, settings.db_pool_pre_ping_idle_s)
+    if _pooler_mode() and settings.db_statement_timeout_ms:
+        # Session settings would leak to other clients of the pooled server
+        # connection: SET LOCAL lasts one transaction (one extra statement each)
+        timeout = f"SET LOCAL statement_timeout = {int(settings.db_statement_timeout_ms)}"
+
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(timeout)
+
+
+def _ping_idle_connections(engine: Engine, idle_s: float) -> None:
+    """Ping a connection on checkout only if it sat unused for idle_s; busy pools skip the round-trip"""
+
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_s:
+            return
+        try:
+            ok = engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            ok = False
+        if not ok:
+            # The pool discards this connection and retries with a new one
+            raise exc.DisconnectionError()
+
+
+def _create_engine(url: str, label: str) -> Engine:
+    connect_args = {}
+    if settings.db_statement_timeout_ms and not _pooler_mode():
+        connect_args["options"] = f"-c statement_timeout={int(settings.db_statement_timeout_ms)}"
+    engine = create_engine(
+        url,
+        echo=False,  # Set to True for SQL query logging in development
+        connect_args=connect_args,
+        **_pool_options(QueuePool, label),
+    )
+    _configure(engine)
+    instrument_engine(engine, label)
+    return engine
+
+
+def get_engine() -> Engine:
+    """Return the engine (DATABASE_URL or DB_* vars), creating it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(settings.get_database_url(), "sync")
+    return _engine
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    """Return the session factory, creating it on first use"""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            bind=get_engine(),
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _session_factory
+
+
+def new_session() -> Session:
+    """Open a session outside a request (background flushers, loaders)"""
+    return get_session_factory()()
 
 
 def get_db() -> Session:
@@ -24,7 +138,7 @@ def get_db() -> Session:
     FastAPI dependency for database sessions.
     Yields a session and ensures it's closed after use.
     """
-    db = SessionLocal()
+    db = new_session()
     try:
         yield db
         db.commit()
@@ -32,4 +146,146 @@ def get_db() -> Session:
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _create_async_engine(url: str, label: str) -> AsyncEngine:
+    connect_args = {}
+    if _pooler_mode():
+        # asyncpg prepares every statement; a pooler may hand the next one
+        # to another server connection, so use unique names and no caches
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    elif settings.db_statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(int(settings.db_statement_timeout_ms))}
+    engine = create_async_engine(
+        url,
+        echo=False,
+        connect_args=connect_args,
+        **_pool_options(AsyncAdaptedQueuePool, label),
+    )
+    _configure(engine.sync_engine)
+    instrument_engine(engine.sync_engine, label)
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the asyncio engine, creating it on first use"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_async_engine(settings.get_async_database_url(), "async")
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the asyncio session factory, creating it on first use"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """Asyncio session that commits on success, rolls back on error and closes"""
+    db = get_async_session_factory()()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency for asyncio database sessions."""
+    async with async_session_scope() as db:
+        yield db
+
+
+def get_replica_engine() -> Engine:
+    """Return the read replica engine (DATABASE_REPLICA_URL), creating it on first use"""
+    global _replica_engine
+    if _replica_engine is None:
+        _replica_engine = _create_engine(settings.database_replica_url, "replica")
+    return _replica_engine
+
+
+def get_replica_session_factory() -> sessionmaker[Session]:
+    """Return the read replica session factory, creating it on first use"""
+    global _replica_session_factory
+    if _replica_session_factory is None:
+        _replica_session_factory = sessionmaker(
+            bind=get_replica_engine(),
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _replica_session_factory
+
+
+def get_replica_db() -> Session:
+    """
+    FastAPI dependency for read replica sessions.
+    Nothing is written through them, so they are closed without a commit.
+    """
+    db = get_replica_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_async_replica_engine() -> AsyncEngine:
+    """Return the asyncio read replica engine, creating it on first use"""
+    global _async_replica_engine
+    if _async_replica_engine is None:
+        _async_replica_engine = _create_async_engine(settings.get_async_replica_url(), "async_replica")
+    return _async_replica_engine
+
+
+def get_async_replica_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the asyncio read replica session factory, creating it on first use"""
+    global _async_replica_session_factory
+    if _async_replica_session_factory is None:
+        _async_replica_session_factory = async_sessionmaker(
+            bind=get_async_replica_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_replica_session_factory
+
+
+async def get_async_replica_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency for asyncio read replica sessions (closed without a commit)"""
+    db = get_async_replica_session_factory()()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# Seconds the replica is behind: 0 on a primary or a replica that has
+# replayed everything it received (an idle primary writes no timestamps)
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+def measure_replica_lag() -> float:
+    """Replication lag of DATABASE_REPLICA_URL in seconds"""
+    with get_replica_engine().connect() as conn:
+        return float(conn.execute(_REPLICA_LAG_SQL).scalar_one())
@@ -1,38 +1,355 @@
-"""Dependency injection for FastAPI endpoints"""
-from typing import Annotated
+"""
+Dependency injection for FastAPI endpoints
+
+Postgres-only modules (and with them SQLAlchemy and the drivers) are
+imported inside the functions that build postgres-mode objects, so
+in-memory mode never loads them and never creates an engine.
+"""
+import threading
+from typing import TYPE_CHECKING, Annotated, AsyncIterator, Iterator
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
-from app.repositories.interfaces import ProfileRepository, GlobalStateRepository
-from app.repositories.memory.profile_repo import InMemoryProfileRepository
-from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
-from app.repositories.postgres.profile_repo import PostgresProfileRepository
-from app.repositories.postgres.global_repo import PostgresGlobalStateRepository
-from app.services.profile_service import ProfileService
-from app.services.click_service import ClickService
-from app.services.cosmetic_service import CosmeticService
+from app.domain.models import GlobalState
+from app.events.bus import CounterDeltaBatcher, EventBus
+from app.events.memory import InMemoryEventBus
+from app.repositories.interfaces import (
+    AsyncGlobalStateRepository,
+    AsyncProfileRepository,
+    ClickWriter,
+    GlobalStateRepository,
+    ProfileRepository,
+)
+from app.repositories.memory.profile_repo import (
+    InMemoryProfileRepository,
+    StripedInMemoryProfileRepository,
+)
+from app.repositories.memory.compact_profile_repo import CompactInMemoryProfileRepository
+from app.repositories.memory.global_repo import (
+    InMemoryGlobalStateRepository,
+    PerThreadInMemoryGlobalStateRepository,
+)
+from app.repositories.memory.shared_global_repo import SharedMemoryGlobalStateRepository
+from app.repositories.memory.shared_profile_repo import SharedMemoryProfileRepository
+from app.repositories.memory.journal import (
+    InMemoryJournal,
+    JournaledGlobalStateRepository,
+    JournaledProfileRepository,
+    RecoveryStats,
+)
+from app.repositories.cache.global_repo import (
+    AsyncCachedClickWriter,
+    AsyncCachedGlobalStateRepository,
+    CachedClickWriter,
+    CachedGlobalStateRepository,
+    GlobalStateCache,
+)
+from app.services.profile_service import AsyncProfileService, ProfileService
+from app.services.click_service import AsyncClickService, ClickService
+from app.services.cosmetic_service import AsyncCosmeticService, CosmeticService
+from app.services.global_broadcaster import (
+    AsyncBroadcastingClickWriter,
+    BroadcastingClickWriter,
+    GlobalStateBroadcaster,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.repositories.cache.profile_repo import ProfileCache
+    from app.repositories.postgres.click_repo import (
+        AsyncPostgresClickRepository,
+        PostgresClickRepository,
+    )
+    from app.repositories.replica.monitor import ReplicaMonitor
+    from app.repositories.tiered.profile_repo import TieredProfileRepository
+    from app.services.click_aggregator import WriteBehindClickAggregator
+    from app.services.group_commit import GroupCommitClickWriter
+
+
+def _create_inmemory_profile_repo() -> ProfileRepository:
+    if settings.inmemory_profile_shared:
+        return SharedMemoryProfileRepository(
+            f"{settings.inmemory_shared_name}-profiles",
+            capacity=settings.inmemory_shared_profile_capacity,
+        )
+    if settings.inmemory_profile_compact:
+        return CompactInMemoryProfileRepository()
+    if settings.inmemory_profile_stripes > 1:
+        return StripedInMemoryProfileRepository(settings.inmemory_profile_stripes)
+    return InMemoryProfileRepository()
+
+
+def _create_inmemory_global_repo() -> GlobalStateRepository:
+    if settings.inmemory_global_counter == "per_thread":
+        return PerThreadInMemoryGlobalStateRepository()
+    if settings.inmemory_global_counter == "locked":
+        return InMemoryGlobalStateRepository()
+    if settings.inmemory_global_counter == "shared":
+        return SharedMemoryGlobalStateRepository(
+            f"{settings.inmemory_shared_name}-global",
+            slots=settings.inmemory_shared_worker_slots,
+        )
+    raise ValueError(
+        f"Invalid INMEMORY_GLOBAL_COUNTER: {settings.inmemory_global_counter}. "
+        f"Must be 'locked', 'per_thread' or 'shared'"
+    )
+
+
+def inmemory_journal_enabled() -> bool:
+    """True when in-memory writes are journaled to disk (INMEMORY_JOURNAL_DIR is set)"""
+    return settings.repository_mode == "inmemory" and bool(settings.inmemory_journal_dir)
+
+
+# Singleton in-memory stores, their journal and the repositories over them
+# (built on first use, and only when REPOSITORY_MODE=inmemory: shared stores
+# create shared memory segments)
+_inmemory_lock = threading.Lock()
+_profile_store: ProfileRepository | None = None
+_global_store: GlobalStateRepository | None = None
+_inmemory_journal: InMemoryJournal | None = None
+_profile_repo: ProfileRepository | None = None
+_global_repo: GlobalStateRepository | None = None
+
+
+def _inmemory_repositories() -> tuple[ProfileRepository, GlobalStateRepository]:
+    """Build the in-memory stores (and journal) on first use; (profile repo, global repo)"""
+    global _profile_store, _global_store, _inmemory_journal, _profile_repo, _global_repo
+    with _inmemory_lock:
+        if _profile_repo is not None:
+            return _profile_repo, _global_repo
+        if settings.repository_mode != "inmemory":
+            raise RuntimeError("In-memory stores are only built when REPOSITORY_MODE=inmemory")
+        if inmemory_journal_enabled() and (
+            settings.server_workers > 1
+            or settings.inmemory_profile_shared
+            or settings.inmemory_global_counter == "shared"
+        ):
+            # Every worker would replay and append to the same journal segments
+            raise ValueError(
+                "INMEMORY_JOURNAL_DIR needs a single worker: it cannot be combined with "
+                "SERVER_WORKERS > 1 or shared-memory stores"
+            )
+        profile_store = _create_inmemory_profile_repo()
+        global_store = _create_inmemory_global_repo()
+        if inmemory_journal_enabled():
+            journal = InMemoryJournal(
+                settings.inmemory_journal_dir,
+                flush_interval_ms=settings.inmemory_journal_flush_ms,
+                snapshot_interval_s=settings.inmemory_snapshot_interval_s,
+            )
+            _inmemory_journal = journal
+            _global_repo = JournaledGlobalStateRepository(global_store, journal)
+            _profile_repo = JournaledProfileRepository(profile_store, journal)
+        else:
+            _global_repo = global_store
+            _profile_repo = profile_store
+        _profile_store, _global_store = profile_store, global_store
+        return _profile_repo, _global_repo
+
+# Process-wide write-behind buffer (only used when CLICK_WRITE_MODE=write_behind)
+_click_aggregator: "WriteBehindClickAggregator | None" = None
+# Process-wide group-commit batcher (only used when CLICK_WRITE_MODE=group_commit)
+_group_commit_writer: "GroupCommitClickWriter | None" = None
+# Process-wide global state cache (only used when GLOBAL_STATE_CACHE=true)
+_global_state_cache: GlobalStateCache | None = None
+# Process-wide global counter stream producer
+_global_broadcaster: GlobalStateBroadcaster | None = None
+# Process-wide event bus and counter delta batcher (only used when EVENT_BUS is set)
+_event_bus: EventBus | None = None
+_counter_batcher: CounterDeltaBatcher | None = None
+# Process-wide profile cache (only used when PROFILE_CACHE=true)
+_profile_cache: "ProfileCache | None" = None
+# Process-wide hot/cold profile store (only used when PROFILE_TIERING=true)
+_profile_tier: "TieredProfileRepository | None" = None
+# Process-wide replica lag checker (only used when DATABASE_REPLICA_URL is set)
+_replica_monitor: "ReplicaMonitor | None" = None
+
+
+def async_db_enabled() -> bool:
+    """True when postgres mode runs on the asyncio engine (DATABASE_ASYNC=true)"""
+    return settings.repository_mode == "postgres" and settings.database_async
+
+
+def global_state_cache_enabled() -> bool:
+    """True when postgres-mode global state reads are served from memory"""
+    return settings.repository_mode == "postgres" and settings.global_state_cache
+
+
+def event_bus_enabled() -> bool:
+    """True when postgres-mode writes are announced on the event bus"""
+    return settings.repository_mode == "postgres" and settings.event_bus != "none"
+
+
+def profile_cache_enabled() -> bool:
+    """True when postgres-mode profile reads go through the profile cache"""
+    return settings.repository_mode == "postgres" and settings.profile_cache
+
+
+def profile_tiering_enabled() -> bool:
+    """True when postgres-mode profiles live in the in-memory hot set first"""
+    return settings.repository_mode == "postgres" and settings.profile_tiering
+
+
+def replica_enabled() -> bool:
+    """True when postgres-mode read-only endpoints may read from DATABASE_REPLICA_URL"""
+    return settings.repository_mode == "postgres" and bool(settings.database_replica_url)
 
-# Singleton in-memory repository instances (only used when REPOSITORY_MODE=inmemory)
-_profile_repo = InMemoryProfileRepository()
-_global_repo = InMemoryGlobalStateRepository()
 
+def prepare_database() -> None:
+    """Build the engine for the configured mode ahead of the first request (no connection yet)"""
+    from app.database import get_async_engine, get_engine
 
-def get_db_session(db: Annotated[Session, Depends(get_db)]) -> Session:
-    """Provide a DB session (request-scoped)."""
-    return db
+    if async_db_enabled():
+        get_async_engine()
+    else:
+        get_engine()
+
+
+def prepare_inmemory_stores() -> None:
+    """Build the in-memory stores (and journal) before serving, not on the first request"""
+    _inmemory_repositories()
+
+
+def get_db_session() -> Iterator["Session | None"]:
+    """Provide a DB session (request-scoped); None unless sync postgres mode is on."""
+    if settings.repository_mode != "postgres" or async_db_enabled():
+        yield None
+        return
+    from app.database import get_db
+
+    yield from get_db()
+
+
+async def get_async_db_session() -> AsyncIterator["AsyncSession | None"]:
+    """Provide an asyncio DB session (request-scoped); None unless async mode is on."""
+    if not async_db_enabled():
+        yield None
+        return
+    from app.database import async_session_scope
+
+    async with async_session_scope() as db:
+        yield db
+
+
+def _replica_usable() -> bool:
+    from app.repositories.replica.monitor import FALLBACKS
+
+    state = get_replica_monitor().state()
+    if state != "ok":
+        FALLBACKS.labels(state).inc()
+    return state == "ok"
+
+
+def get_replica_db_session() -> Iterator["Session | None"]:
+    """Provide a read replica session (request-scoped); None unless one is configured and usable."""
+    if not replica_enabled() or async_db_enabled() or not _replica_usable():
+        yield None
+        return
+    from app.database import get_replica_db
+
+    yield from get_replica_db()
+
+
+async def get_async_replica_db_session() -> AsyncIterator["AsyncSession | None"]:
+    """Provide an asyncio read replica session; None unless one is configured and usable."""
+    if not replica_enabled() or not async_db_enabled() or not _replica_usable():
+        yield None
+        return
+    from app.database import get_async_replica_db
+
+    async for db in get_async_replica_db():
+        yield db
+
+
+def _postgres_profile_repository(db, async_db, replica_db=None, async_replica_db=None):
+    from app.events.publishing import AsyncPublishingProfileRepository, PublishingProfileRepository
+    from app.repositories.cache.profile_repo import (
+        AsyncCachedProfileRepository,
+        CachedProfileRepository,
+    )
+    from app.repositories.postgres.profile_repo import (
+        AsyncPostgresProfileRepository,
+        PostgresProfileRepository,
+    )
+    from app.repositories.replica.profile_repo import (
+        AsyncReplicaProfileRepository,
+        ReplicaProfileRepository,
+    )
+    from app.repositories.tiered.profile_repo import AsyncTieredProfileRepository
+
+    if profile_tiering_enabled():
+        # The hot set already answers reads without the database
+        tier = get_profile_tier()
+        return AsyncTieredProfileRepository(tier) if async_db is not None else tier
+    bus = get_event_bus() if event_bus_enabled() else None
+    cache = get_profile_cache() if profile_cache_enabled() else None
+    if async_db is not None:
+        repo = AsyncPostgresProfileRepository(async_db)
+        if async_replica_db is not None:
+            repo = AsyncReplicaProfileRepository(
+                repo, AsyncPostgresProfileRepository(async_replica_db), get_replica_monitor()
+            )
+        if bus:
+            repo = AsyncPublishingProfileRepository(repo, bus)
+        return AsyncCachedProfileRepository(repo, cache) if cache else repo
+    repo = PostgresProfileRepository(db)
+    if replica_db is not None:
+        repo = ReplicaProfileRepository(repo, PostgresProfileRepository(replica_db), get_replica_monitor())
+    if bus:
+        repo = PublishingProfileRepository(repo, bus)
+    return CachedProfileRepository(repo, cache) if cache else repo
+
+
+def _postgres_global_repository(db, async_db, replica_db=None, async_replica_db=None):
+    from app.events.publishing import (
+        AsyncPublishingGlobalStateRepository,
+        PublishingGlobalStateRepository,
+    )
+    from app.repositories.postgres.global_repo import (
+        AsyncPostgresGlobalStateRepository,
+        PostgresGlobalStateRepository,
+    )
+    from app.repositories.replica.global_repo import (
+        AsyncReplicaGlobalStateRepository,
+        ReplicaGlobalStateRepository,
+    )
+
+    shards = settings.global_counter_shards
+    cache = get_global_state_cache() if global_state_cache_enabled() else None
+    batcher = get_counter_batcher() if event_bus_enabled() else None
+    if async_db is not None:
+        repo = AsyncPostgresGlobalStateRepository(async_db, shards=shards)
+        if async_replica_db is not None:
+            repo = AsyncReplicaGlobalStateRepository(
+                repo,
+                AsyncPostgresGlobalStateRepository(async_replica_db, shards=shards),
+                get_replica_monitor(),
+            )
+        if batcher:
+            repo = AsyncPublishingGlobalStateRepository(repo, batcher)
+        return AsyncCachedGlobalStateRepository(repo, cache) if cache else repo
+    repo = PostgresGlobalStateRepository(db, shards=shards)
+    if replica_db is not None:
+        repo = ReplicaGlobalStateRepository(
+            repo, PostgresGlobalStateRepository(replica_db, shards=shards), get_replica_monitor()
+        )
+    if batcher:
+        repo = PublishingGlobalStateRepository(repo, batcher)
+    return CachedGlobalStateRepository(repo, cache) if cache else repo
 
 
 def get_profile_repository(
-    db: Annotated[Session, Depends(get_db_session)],
-) -> ProfileRepository:
+    db: Annotated["Session | None", Depends(get_db_session)],
+    async_db: Annotated["AsyncSession | None", Depends(get_async_db_session)],
+) -> ProfileRepository | AsyncProfileRepository:
     """Provide profile repository instance based on REPOSITORY_MODE setting"""
     if settings.repository_mode == "postgres":
-        return PostgresProfileRepository(db)
+        return _postgres_profile_repository(db, async_db)
     if settings.repository_mode == "inmemory":
-        return _profile_repo
+        return _inmemory_repositories()[0]
     raise ValueError(
         f"Invalid REPOSITORY_MODE: {settings.repository_mode}. "
         f"Must be 'inmemory' or 'postgres'"
@@ -40,36 +357,301 @@ def get_profile_repository(
 
 
 def get_global_repository(
-    db: Annotated[Session, Depends(get_db_session)],
-) -> GlobalStateRepository:
+    db: Annotated["Session | None", Depends(get_db_session)],
+    async_db: Annotated["AsyncSession | None", Depends(get_async_db_session)],
+) -> GlobalStateRepository | AsyncGlobalStateRepository:
     """Provide global state repository instance based on REPOSITORY_MODE setting"""
     if settings.repository_mode == "postgres":
-        return PostgresGlobalStateRepository(db)
+        return _postgres_global_repository(db, async_db)
     if settings.repository_mode == "inmemory":
-        return _global_repo
+        return _inmemory_repositories()[1]
     raise ValueError(
         f"Invalid REPOSITORY_MODE: {settings.repository_mode}. "
         f"Must be 'inmemory' or 'postgres'"
     )
 
 
+def get_read_profile_repository(
+    db: Annotated["Session | None", Depends(get_db_session)],
+    async_db: Annotated["AsyncSession | None", Depends(get_async_db_session)],
+    replica_db: Annotated["Session | None", Depends(get_replica_db_session)],
+    async_replica_db: Annotated["AsyncSession | None", Depends(get_async_replica_db_session)],
+) -> ProfileRepository | AsyncProfileRepository:
+    """Profile repository for read-only endpoints: reads the replica when one is usable"""
+    if settings.repository_mode == "postgres":
+        return _postgres_profile_repository(db, async_db, replica_db, async_replica_db)
+    return get_profile_repository(db, async_db)
+
+
+def get_read_global_repository(
+    db: Annotated["Session | None", Depends(get_db_session)],
+    async_db: Annotated["AsyncSession | None", Depends(get_async_db_session)],
+    replica_db: Annotated["Session | None", Depends(get_replica_db_session)],
+    async_replica_db: Annotated["AsyncSession | None", Depends(get_async_replica_db_session)],
+) -> GlobalStateRepository | AsyncGlobalStateRepository:
+    """Global state repository for read-only endpoints: reads the replica when one is usable"""
+    if settings.repository_mode == "postgres":
+        return _postgres_global_repository(db, async_db, replica_db, async_replica_db)
+    return get_global_repository(db, async_db)
+
+
+def get_click_repository(
+    db: Annotated["Session | None", Depends(get_db_session)],
+    async_db: Annotated["AsyncSession | None", Depends(get_async_db_session)],
+) -> "PostgresClickRepository | AsyncPostgresClickRepository | None":
+    """Provide the postgres click ledger repository (users + global_counter); None in inmemory mode"""
+    if settings.repository_mode != "postgres":
+        return None
+    from app.repositories.postgres.click_repo import (
+        AsyncPostgresClickRepository,
+        PostgresClickRepository,
+    )
+
+    if async_db is not None:
+        repo = AsyncPostgresClickRepository(async_db, shards=settings.global_counter_shards)
+        return _wrap_click_writer(repo, asynchronous=True)
+    return _wrap_click_writer(PostgresClickRepository(db, shards=settings.global_counter_shards))
+
+
+def _wrap_click_writer(writer, asynchronous: bool = False):
+    # Clicks bypass GlobalStateRepository.increment_clicks: announce and cache them here
+    if event_bus_enabled():
+        from app.events.publishing import AsyncPublishingClickWriter, PublishingClickWriter
+
+        writer_class = AsyncPublishingClickWriter if asynchronous else PublishingClickWriter
+        writer = writer_class(writer, get_counter_batcher())
+    if global_state_cache_enabled():
+        writer_class = AsyncCachedClickWriter if asynchronous else CachedClickWriter
+        writer = writer_class(writer, get_global_state_cache())
+    broadcaster = _global_broadcaster
+    if broadcaster is not None and broadcaster.subscriber_count:
+        writer_class = AsyncBroadcastingClickWriter if asynchronous else BroadcastingClickWriter
+        writer = writer_class(writer, broadcaster)
+    return writer
+
+
 def get_profile_service(
     profile_repo: Annotated[ProfileRepository, Depends(get_profile_repository)],
-) -> ProfileService:
+) -> ProfileService | AsyncProfileService:
     """Provide profile service instance"""
+    if async_db_enabled():
+        return AsyncProfileService(profile_repo)
     return ProfileService(profile_repo)
 
 
 def get_click_service(
     profile_repo: Annotated[ProfileRepository, Depends(get_profile_repository)],
     global_repo: Annotated[GlobalStateRepository, Depends(get_global_repository)],
-) -> ClickService:
+) -> ClickService | AsyncClickService:
     """Provide click service instance"""
+    if async_db_enabled():
+        return AsyncClickService(profile_repo, global_repo)
     return ClickService(profile_repo, global_repo)
 
 
+def get_read_profile_service(
+    profile_repo: Annotated[ProfileRepository, Depends(get_read_profile_repository)],
+) -> ProfileService | AsyncProfileService:
+    """Provide a profile service for read-only endpoints"""
+    return get_profile_service(profile_repo)
+
+
+def get_read_click_service(
+    profile_repo: Annotated[ProfileRepository, Depends(get_read_profile_repository)],
+    global_repo: Annotated[GlobalStateRepository, Depends(get_read_global_repository)],
+) -> ClickService | AsyncClickService:
+    """Provide a click service for read-only endpoints (global state reads)"""
+    return get_click_service(profile_repo, global_repo)
+
+
 def get_cosmetic_service(
     profile_repo: Annotated[ProfileRepository, Depends(get_profile_repository)],
-) -> CosmeticService:
+) -> CosmeticService | AsyncCosmeticService:
     """Provide cosmetic service instance"""
-    return CosmeticService(profile_repo)
\ No newline at end of file
+    if async_db_enabled():
+        return AsyncCosmeticService(profile_repo)
+    return CosmeticService(profile_repo)
+
+
+def get_click_aggregator() -> "WriteBehindClickAggregator":
+    """Provide the process-wide write-behind click aggregator"""
+    global _click_aggregator
+    if _click_aggregator is None:
+        from app.database import new_session
+        from app.services.click_aggregator import WriteBehindClickAggregator
+
+        _click_aggregator = WriteBehindClickAggregator(
+            new_session,
+            shards=settings.global_counter_shards,
+            flush_interval_ms=settings.click_flush_interval_ms,
+            flush_max_entries=settings.click_flush_max_entries,
+            max_pending_users=settings.click_buffer_max_users,
+            max_known_users=settings.click_known_users_max,
+        )
+    return _click_aggregator
+
+
+def get_group_commit_writer() -> "GroupCommitClickWriter":
+    """Provide the process-wide group-commit click writer"""
+    global _group_commit_writer
+    if _group_commit_writer is None:
+        from app.database import new_session
+        from app.services.group_commit import GroupCommitClickWriter
+
+        _group_commit_writer = GroupCommitClickWriter(
+            new_session,
+            shards=settings.global_counter_shards,
+            window_ms=settings.click_group_commit_window_ms,
+            max_batch=settings.click_group_commit_max_batch,
+        )
+    return _group_commit_writer
+
+
+def _load_global_state() -> GlobalState:
+    from app.database import new_session
+    from app.repositories.postgres.click_repo import PostgresClickRepository
+
+    # Postgres-mode clicks (every CLICK_WRITE_MODE) land in global_counter
+    with new_session() as session:
+        return GlobalState(global_clicks=PostgresClickRepository(session).get_global_total())
+
+
+def get_inmemory_journal() -> InMemoryJournal:
+    if not inmemory_journal_enabled():
+        raise RuntimeError("In-memory journal is disabled (INMEMORY_JOURNAL_DIR is empty)")
+    _inmemory_repositories()
+    return _inmemory_journal
+
+
+def recover_inmemory_state() -> RecoveryStats:
+    """Replay snapshot + journal into the (still empty) in-memory stores"""
+    journal = get_inmemory_journal()
+    return journal.recover(_profile_store, _global_store)
+
+
+def get_global_state_cache() -> GlobalStateCache:
+    """Provide the process-wide global state cache"""
+    global _global_state_cache
+    if _global_state_cache is None:
+        _global_state_cache = GlobalStateCache(
+            _load_global_state,
+            refresh_interval_ms=settings.global_state_cache_refresh_ms,
+        )
+    return _global_state_cache
+
+
+def _stream_global_state():
+    if settings.repository_mode == "inmemory":
+        return _inmemory_repositories()[1].get_state()
+    if global_state_cache_enabled():
+        state = get_global_state_cache().get()
+        if state is not None:
+            return state
+    return _load_global_state()
+
+
+def get_global_broadcaster() -> GlobalStateBroadcaster:
+    """Provide the process-wide global counter broadcaster"""
+    global _global_broadcaster
+    if _global_broadcaster is None:
+        _global_broadcaster = GlobalStateBroadcaster(
+            _stream_global_state,
+            max_rate_hz=settings.global_stream_max_rate_hz,
+        )
+    return _global_broadcaster
+
+
+def get_profile_cache() -> "ProfileCache":
+    """Provide the process-wide profile cache"""
+    global _profile_cache
+    if _profile_cache is None:
+        from app.repositories.cache.profile_repo import ProfileCache
+
+        _profile_cache = ProfileCache(
+            max_entries=settings.profile_cache_max_entries,
+            ttl_seconds=settings.profile_cache_ttl_s,
+        )
+    return _profile_cache
+
+
+def get_profile_tier() -> "TieredProfileRepository":
+    """Provide the process-wide tiered profile store"""
+    global _profile_tier
+    if _profile_tier is None:
+        from app.database import new_session
+        from app.repositories.tiered.profile_repo import TieredProfileRepository
+
+        _profile_tier = TieredProfileRepository(
+            new_session,
+            max_entries=settings.profile_tier_hot_max_entries,
+            flush_interval_ms=settings.profile_tier_flush_ms,
+            flush_batch_size=settings.profile_tier_flush_batch,
+        )
+    return _profile_tier
+
+
+def get_replica_monitor() -> "ReplicaMonitor":
+    """Provide the process-wide read replica lag checker"""
+    global _replica_monitor
+    if _replica_monitor is None:
+        from app.database import measure_replica_lag
+        from app.repositories.replica.monitor import ReplicaMonitor
+
+        _replica_monitor = ReplicaMonitor(
+            measure_replica_lag,
+            max_lag_ms=settings.replica_max_lag_ms,
+            check_interval_ms=settings.replica_check_interval_ms,
+        )
+    return _replica_monitor
+
+
+def get_event_bus() -> EventBus:
+    """Provide the process-wide event bus based on EVENT_BUS"""
+    global _event_bus
+    if _event_bus is None:
+        if settings.event_bus == "memory":
+            _event_bus = InMemoryEventBus()
+        elif settings.event_bus == "postgres":
+            if settings.db_pool_mode == "pooler":
+                raise ValueError(
+                    "EVENT_BUS=postgres needs a session connection for LISTEN, "
+                    "which a transaction-mode pooler (DB_POOL_MODE=pooler) cannot provide"
+                )
+            from app.database import get_engine
+            from app.events.postgres import PostgresEventBus
+
+            _event_bus = PostgresEventBus(get_engine(), channel=settings.event_bus_channel)
+        else:
+            raise ValueError(
+                f"Invalid EVENT_BUS: {settings.event_bus}. "
+                f"Must be 'none', 'memory' or 'postgres'"
+            )
+    return _event_bus
+
+
+def get_counter_batcher() -> CounterDeltaBatcher:
+    """Provide the process-wide counter delta batcher"""
+    global _counter_batcher
+    if _counter_batcher is None:
+        _counter_batcher = CounterDeltaBatcher(
+            get_event_bus(), interval_ms=settings.event_bus_flush_ms
+        )
+    return _counter_batcher
+
+
+def get_click_writer(
+    click_repo: Annotated["PostgresClickRepository | None", Depends(get_click_repository)],
+) -> ClickWriter | None:
+    """Provide the postgres-mode click writer based on CLICK_WRITE_MODE; None in inmemory mode"""
+    if click_repo is None:
+        return None
+    if settings.click_write_mode == "direct":
+        return click_repo  # already wrapped by get_click_repository
+    if settings.click_write_mode == "write_behind":
+        return _wrap_click_writer(get_click_aggregator())
+    if settings.click_write_mode == "group_commit":
+        return _wrap_click_writer(get_group_commit_writer())
+    raise ValueError(
+        f"Invalid CLICK_WRITE_MODE: {settings.click_write_mode}. "
+        f"Must be 'direct', 'write_behind' or 'group_commit'"
+    )
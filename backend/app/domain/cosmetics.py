@@ -0,0 +1,44 @@
+"""Cosmetic catalog registry: each cosmetic owns one bit of a profile's unlock mask"""
+from typing import Iterable, Optional
+
+# Mirrors the catalog in src/data/cosmetics.ts. Bit positions are persisted
+# (profiles.unlocked_mask): append new cosmetics, never reorder or reuse.
+COSMETIC_IDS: tuple[str, ...] = (
+    "default",
+    "neon",
+    "amber",
+    "violet",
+    "cyan",
+    "ember",
+    "hazard",
+    "prism",
+    "specter",
+)
+
+_BITS: dict[str, int] = {cosmetic_id: 1 << i for i, cosmetic_id in enumerate(COSMETIC_IDS)}
+
+# Every profile starts with "default" unlocked
+DEFAULT_MASK = _BITS["default"]
+
+
+def bit_of(cosmetic_id: str) -> Optional[int]:
+    """The cosmetic's bit, or None if it is not in the catalog"""
+    return _BITS.get(cosmetic_id)
+
+
+def is_unlocked(mask: int, cosmetic_id: str) -> bool:
+    bit = _BITS.get(cosmetic_id)
+    return bit is not None and mask & bit != 0
+
+
+def mask_of(cosmetic_ids: Iterable[str]) -> int:
+    """Mask for a list of ids (ids outside the catalog are ignored)"""
+    mask = 0
+    for cosmetic_id in cosmetic_ids:
+        mask |= _BITS.get(cosmetic_id, 0)
+    return mask
+
+
+def ids_of(mask: int) -> list[str]:
+    """Unlocked ids in catalog order"""
+    return [cosmetic_id for cosmetic_id, bit in _BITS.items() if mask & bit]
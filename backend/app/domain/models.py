@@ -1,6 +1,9 @@
 """Core domain models"""
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain import cosmetics
 
 
 def utc_now() -> datetime:
@@ -18,6 +21,11 @@ class Profile:
     created_at: datetime = field(default_factory=utc_now)
     updated_at: datetime = field(default_factory=utc_now)
     schema_version: int = 1
+    unlocked_mask: Optional[int] = None  # Bit per cosmetic (app.domain.cosmetics)
+
+    def __post_init__(self):
+        if self.unlocked_mask is None:
+            self.unlocked_mask = cosmetics.mask_of(self.unlocked_cosmetics)
 
 
 @dataclass
@@ -0,0 +1 @@
+"""Cross-replica event bus (counter deltas, profile changes)"""
@@ -0,0 +1,164 @@
+"""Event types, the EventBus interface and the counter delta batcher"""
+import json
+import logging
+import threading
+import uuid
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, ClassVar, Protocol, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CounterDelta:
+    """Global clicks added by one replica since its previous CounterDelta"""
+    delta: int
+    global_clicks: int  # Global total seen by the publisher's latest write
+    origin: str = ""
+    type: ClassVar[str] = "counter_delta"
+
+
+@dataclass
+class ProfileChanged:
+    """A profile was created or modified; cached copies are out of date"""
+    device_id: str
+    origin: str = ""
+    type: ClassVar[str] = "profile_changed"
+
+
+Event = Union[CounterDelta, ProfileChanged]
+EventHandler = Callable[[Event], None]
+
+EVENT_TYPES: dict[str, type] = {
+    CounterDelta.type: CounterDelta,
+    ProfileChanged.type: ProfileChanged,
+}
+
+
+def new_origin() -> str:
+    """Identifier stamped on events published by this process"""
+    return uuid.uuid4().hex[:12]
+
+
+def encode(event: Event) -> str:
+    return json.dumps({"type": event.type, **asdict(event)}, separators=(",", ":"))
+
+
+def decode(payload: str) -> Event:
+    data = json.loads(payload)
+    event_type = EVENT_TYPES[data.pop("type")]
+    return event_type(**data)
+
+
+class EventBus(Protocol):
+    """
+    Interface for publishing events to every replica.
+
+    Handlers receive all events, including this replica's own (compare
+    `event.origin` with `bus.origin` to tell them apart), and may be called
+    from a background thread.
+    """
+
+    origin: str
+
+    def publish(self, event: Event) -> None:
+        """Send an event to all subscribers; must not block on I/O"""
+        ...
+
+    def subscribe(self, handler: EventHandler) -> Callable[[], None]:
+        """Register a handler; returns a function that unregisters it"""
+        ...
+
+    def start(self) -> None:
+        """Begin delivering events"""
+        ...
+
+    def stop(self) -> None:
+        """Stop delivering events and flush pending publishes"""
+        ...
+
+
+class HandlerSet:
+    """Subscriber bookkeeping shared by the bus implementations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: list[EventHandler] = []
+
+    def add(self, handler: EventHandler) -> Callable[[], None]:
+        with self._lock:
+            self._handlers.append(handler)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if handler in self._handlers:
+                    self._handlers.remove(handler)
+
+        return unsubscribe
+
+    def dispatch(self, event: Event) -> None:
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Event handler failed for %s", event.type)
+
+
+def stamp(event: Event, origin: str) -> Event:
+    return event if event.origin else replace(event, origin=origin)
+
+
+class CounterDeltaBatcher:
+    """
+    Coalesces global counter increments into one CounterDelta per interval,
+    so a busy replica publishes a few events per second instead of one per
+    click.
+    """
+
+    def __init__(self, bus: EventBus, interval_ms: int = 100):
+        self._bus = bus
+        self._interval = interval_ms / 1000
+        self._lock = threading.Lock()
+        self._delta = 0
+        self._global_clicks = 0
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, delta: int, global_clicks: int) -> None:
+        """Record an increment and the global total it produced"""
+        with self._lock:
+            self._delta += delta
+            self._global_clicks = max(self._global_clicks, global_clicks)
+
+    def flush(self) -> None:
+        """Publish the pending delta, if any"""
+        with self._lock:
+            delta, self._delta = self._delta, 0
+            global_clicks = self._global_clicks
+        if delta:
+            self._bus.publish(CounterDelta(delta=delta, global_clicks=global_clicks))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="counter-delta-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Counter delta publish failed")
@@ -0,0 +1,24 @@
+"""In-process event bus (tests and single-replica deployments)"""
+from typing import Callable
+
+from app.events.bus import Event, EventHandler, HandlerSet, new_origin, stamp
+
+
+class InMemoryEventBus:
+    """EventBus that delivers synchronously to handlers in this process"""
+
+    def __init__(self, origin: str | None = None):
+        self.origin = origin or new_origin()
+        self._handlers = HandlerSet()
+
+    def publish(self, event: Event) -> None:
+        self._handlers.dispatch(stamp(event, self.origin))
+
+    def subscribe(self, handler: EventHandler) -> Callable[[], None]:
+        return self._handlers.add(handler)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
@@ -0,0 +1,143 @@
+"""PostgreSQL LISTEN/NOTIFY event bus"""
+import logging
+import queue
+import re
+import select
+import threading
+from typing import Callable
+
+from sqlalchemy import func
+from sqlalchemy import select as sql_select
+from sqlalchemy.engine import Engine
+
+from app.events.bus import Event, EventHandler, HandlerSet, decode, encode, new_origin, stamp
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+class PostgresEventBus:
+    """
+    EventBus over Postgres NOTIFY, so replicas need nothing beyond the
+    database they already share.
+
+    publish() only queues the event; a sender thread issues the NOTIFYs
+    (one transaction per drained batch). A listener thread holds one
+    dedicated connection in LISTEN mode and dispatches what arrives,
+    including this replica's own events. The listener reconnects after
+    connection errors; events sent while it was down are lost, so
+    consumers should keep a periodic refresh as a backstop.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str = "button0_events",
+        origin: str | None = None,
+        poll_interval: float = 1.0,
+    ):
+        if not _CHANNEL_RE.match(channel):
+            raise ValueError(f"Invalid event channel name: {channel!r}")
+        self.origin = origin or new_origin()
+        self.channel = channel
+        self._engine = engine
+        self._poll_interval = poll_interval
+        self._handlers = HandlerSet()
+        self._outbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self._listen_conn = None
+        self._threads: list[threading.Thread] = []
+
+    def publish(self, event: Event) -> None:
+        self._outbox.put(encode(stamp(event, self.origin)))
+
+    def subscribe(self, handler: EventHandler) -> Callable[[], None]:
+        return self._handlers.add(handler)
+
+    def start(self) -> None:
+        """LISTEN before returning, then run the listener and sender threads"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        self._listen_conn = self._listen()
+        self._threads = [
+            threading.Thread(target=self._listen_loop, name="event-bus-listener", daemon=True),
+            threading.Thread(target=self._send_loop, name="event-bus-sender", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._send_pending()
+        self._close_listener()
+
+    def _listen(self):
+        raw = self._engine.raw_connection()
+        raw.driver_connection.autocommit = True
+        with raw.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return raw
+
+    def _close_listener(self) -> None:
+        if self._listen_conn is not None:
+            try:
+                # Dedicated LISTEN connection: never return it to the pool
+                self._listen_conn.invalidate()
+            except Exception:
+                pass
+            self._listen_conn = None
+
+    def _listen_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if self._listen_conn is None:
+                    self._listen_conn = self._listen()
+                self._receive(self._listen_conn.driver_connection)
+            except Exception:
+                logger.exception("Event bus listener failed; reconnecting")
+                self._close_listener()
+                self._stopping.wait(self._poll_interval)
+
+    def _receive(self, conn) -> None:
+        ready, _, _ = select.select([conn], [], [], self._poll_interval)
+        if not ready:
+            return
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                event = decode(notify.payload)
+            except Exception:
+                logger.warning("Ignoring malformed event payload: %r", notify.payload)
+                continue
+            self._handlers.dispatch(event)
+
+    def _send_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                payload = self._outbox.get(timeout=self._poll_interval)
+            except queue.Empty:
+                continue
+            self._send_pending([payload])
+
+    def _send_pending(self, payloads: list[str] | None = None) -> None:
+        payloads = payloads or []
+        while True:
+            try:
+                payloads.append(self._outbox.get_nowait())
+            except queue.Empty:
+                break
+        if not payloads:
+            return
+        try:
+            with self._engine.connect() as conn:
+                for payload in payloads:
+                    conn.execute(sql_select(func.pg_notify(self.channel, payload)))
+                conn.commit()
+        except Exception:
+            logger.exception("Failed to publish %d events", len(payloads))
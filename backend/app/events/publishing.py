@@ -0,0 +1,185 @@
+"""Repository wrappers that announce writes on the event bus"""
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+from app.domain.models import GlobalState, Profile
+from app.events.bus import CounterDeltaBatcher, EventBus, ProfileChanged
+from app.repositories.interfaces import (
+    AsyncGlobalStateRepository,
+    AsyncProfileRepository,
+    ClickWriter,
+    GlobalStateRepository,
+    ProfileRepository,
+)
+
+
+def after_commit(repo, callback: Callable[[], None]) -> None:
+    """
+    Run callback once the repository's transaction commits (never, if it
+    rolls back), so other replicas never react to uncommitted writes.
+    Repositories without a session run it immediately.
+    """
+    # Look through wrapper repositories (cache, publishing) to the real one
+    while not hasattr(repo, "session") and hasattr(repo, "inner"):
+        repo = repo.inner
+    session = getattr(repo, "session", None)
+    if session is None:
+        callback()
+        return
+    session = getattr(session, "sync_session", session)  # AsyncSession
+    event.listen(session, "after_commit", lambda _session: callback(), once=True)
+
+
+class PublishingGlobalStateRepository:
+    """Feeds every global increment into a CounterDeltaBatcher"""
+
+    def __init__(self, inner: GlobalStateRepository, batcher: CounterDeltaBatcher):
+        self.inner = inner
+        self.batcher = batcher
+
+    def get_state(self) -> GlobalState:
+        return self.inner.get_state()
+
+    def increment_clicks(self, delta: int) -> GlobalState:
+        state = self.inner.increment_clicks(delta)
+        after_commit(self.inner, lambda: self.batcher.add(delta, state.global_clicks))
+        return state
+
+
+class AsyncPublishingGlobalStateRepository:
+    """Async variant of PublishingGlobalStateRepository"""
+
+    def __init__(self, inner: AsyncGlobalStateRepository, batcher: CounterDeltaBatcher):
+        self.inner = inner
+        self.batcher = batcher
+
+    async def get_state(self) -> GlobalState:
+        return await self.inner.get_state()
+
+    async def increment_clicks(self, delta: int) -> GlobalState:
+        state = await self.inner.increment_clicks(delta)
+        after_commit(self.inner, lambda: self.batcher.add(delta, state.global_clicks))
+        return state
+
+
+class PublishingClickWriter:
+    """
+    Feeds every postgres-mode click into a CounterDeltaBatcher: single clicks
+    from any ClickWriter and batches from the click repository's increment_many
+    """
+
+    def __init__(self, inner: ClickWriter, batcher: CounterDeltaBatcher):
+        self.inner = inner
+        self.batcher = batcher
+        if hasattr(inner, "increment_many"):
+            self.increment_many = self._increment_many
+
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        my_clicks, global_clicks = self.inner.increment(user_id, delta)
+        # Writers without a session (write-behind, group commit) announce right away
+        after_commit(self.inner, lambda: self.batcher.add(delta, global_clicks))
+        return my_clicks, global_clicks
+
+    def _increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        user_totals, global_clicks = self.inner.increment_many(deltas)
+        total = sum(deltas.values())
+        after_commit(self.inner, lambda: self.batcher.add(total, global_clicks))
+        return user_totals, global_clicks
+
+
+class AsyncPublishingClickWriter:
+    """Async variant of PublishingClickWriter (direct writes on the asyncio engine)"""
+
+    def __init__(self, inner, batcher: CounterDeltaBatcher):
+        self.inner = inner
+        self.batcher = batcher
+
+    async def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        my_clicks, global_clicks = await self.inner.increment(user_id, delta)
+        after_commit(self.inner, lambda: self.batcher.add(delta, global_clicks))
+        return my_clicks, global_clicks
+
+    async def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        user_totals, global_clicks = await self.inner.increment_many(deltas)
+        total = sum(deltas.values())
+        after_commit(self.inner, lambda: self.batcher.add(total, global_clicks))
+        return user_totals, global_clicks
+
+
+class PublishingProfileRepository:
+    """Publishes ProfileChanged after each profile write"""
+
+    def __init__(self, inner: ProfileRepository, bus: EventBus):
+        self.inner = inner
+        self.bus = bus
+        if hasattr(inner, "increment_clicks"):
+            self.increment_clicks = self._increment_clicks
+        if hasattr(inner, "unlock_cosmetic"):
+            self.unlock_cosmetic = self._unlock_cosmetic
+        if hasattr(inner, "select_cosmetic"):
+            self.select_cosmetic = self._select_cosmetic
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        return self.inner.get_by_device_id(device_id)
+
+    def create(self, profile: Profile) -> Profile:
+        return self._published(self.inner.create(profile))
+
+    def update(self, profile: Profile) -> Profile:
+        return self._published(self.inner.update(profile))
+
+    def _increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        return self._published(self.inner.increment_clicks(device_id, amount))
+
+    def _unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        profile = self.inner.unlock_cosmetic(device_id, cosmetic_id)
+        return self._published(profile) if profile else None
+
+    def _select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        profile = self.inner.select_cosmetic(device_id, cosmetic_id)
+        return self._published(profile) if profile else None
+
+    def _published(self, profile: Profile) -> Profile:
+        changed = ProfileChanged(device_id=profile.device_id)
+        after_commit(self.inner, lambda: self.bus.publish(changed))
+        return profile
+
+
+class AsyncPublishingProfileRepository:
+    """Async variant of PublishingProfileRepository"""
+
+    def __init__(self, inner: AsyncProfileRepository, bus: EventBus):
+        self.inner = inner
+        self.bus = bus
+        if hasattr(inner, "increment_clicks"):
+            self.increment_clicks = self._increment_clicks
+        if hasattr(inner, "unlock_cosmetic"):
+            self.unlock_cosmetic = self._unlock_cosmetic
+        if hasattr(inner, "select_cosmetic"):
+            self.select_cosmetic = self._select_cosmetic
+
+    async def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        return await self.inner.get_by_device_id(device_id)
+
+    async def create(self, profile: Profile) -> Profile:
+        return self._published(await self.inner.create(profile))
+
+    async def update(self, profile: Profile) -> Profile:
+        return self._published(await self.inner.update(profile))
+
+    async def _increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        return self._published(await self.inner.increment_clicks(device_id, amount))
+
+    async def _unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        profile = await self.inner.unlock_cosmetic(device_id, cosmetic_id)
+        return self._published(profile) if profile else None
+
+    async def _select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        profile = await self.inner.select_cosmetic(device_id, cosmetic_id)
+        return self._published(profile) if profile else None
+
+    def _published(self, profile: Profile) -> Profile:
+        changed = ProfileChanged(device_id=profile.device_id)
+        after_commit(self.inner, lambda: self.bus.publish(changed))
+        return profile
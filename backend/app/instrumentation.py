@@ -0,0 +1,213 @@
+"""Request, database statement and connection pool metrics"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+from app.config import settings
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency per route", labelnames=("method", "route")
+)
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Requests per route and status", labelnames=("method", "route", "status")
+)
+IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests being handled")
+REQUEST_STATEMENTS = REGISTRY.histogram(
+    "http_request_db_statements",
+    "Statements per request, for requests that used the database",
+    buckets=(1, 2, 3, 4, 5, 8, 13, 21, 50, 100),
+    labelnames=("method", "route"),
+)
+REQUEST_DB_TIME = REGISTRY.histogram(
+    "http_request_db_seconds",
+    "Database time per request, for requests that used the database",
+    labelnames=("method", "route"),
+)
+STATEMENT_DURATION = REGISTRY.histogram(
+    "db_statement_duration_seconds",
+    "Database statement latency per route (background work: route=\"background\")",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    labelnames=("route",),
+)
+SLOW_STATEMENTS = REGISTRY.counter(
+    "db_slow_statements_total", "Statements slower than DB_SLOW_STATEMENT_MS", labelnames=("route",)
+)
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+    labelnames=("pool",),
+)
+POOL_SIZE = REGISTRY.gauge("db_pool_size", "Connections the pool keeps open", labelnames=("pool",))
+POOL_CHECKED_OUT = REGISTRY.gauge("db_pool_checked_out", "Connections in use", labelnames=("pool",))
+POOL_OVERFLOW = REGISTRY.gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", labelnames=("pool",)
+)
+POOL_SATURATION = REGISTRY.gauge(
+    "db_pool_saturation",
+    "Connections in use / (pool size + max overflow); at 1 checkouts queue",
+    labelnames=("pool",),
+)
+POOL_CHECKOUT_TIMEOUTS = REGISTRY.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_S",
+    labelnames=("pool",),
+)
+
+
+class _Request:
+    """The request being handled: its ASGI scope (the router adds the matched route) and DB usage"""
+
+    __slots__ = ("scope", "statements", "db_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Copied into threadpool calls along with the rest of the context
+_current_request: ContextVar[_Request | None] = ContextVar("current_request", default=None)
+
+
+def _route_of(scope: dict) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label: raw paths would make label values unbounded
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status counts, in-flight
+    requests and DB usage per request. DEBUG=true adds a Server-Timing header;
+    with METRICS_ENABLED=false that header is all it does.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        request = _Request(scope)
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.debug:
+                    message = _with_server_timing(message, request, time.perf_counter() - started)
+            await send(message)
+
+        token = _current_request.set(request)
+        recording = settings.metrics_enabled
+        if recording:
+            IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            if recording:
+                self._record(scope, request, status, time.perf_counter() - started)
+
+    @staticmethod
+    def _record(scope: dict, request: _Request, status: int, elapsed: float) -> None:
+        IN_FLIGHT.dec()
+        method, route = scope["method"], _route_of(scope)
+        REQUEST_DURATION.labels(method, route).observe(elapsed)
+        REQUESTS.labels(method, route, str(status)).inc()
+        if request.statements:
+            REQUEST_STATEMENTS.labels(method, route).observe(request.statements)
+            REQUEST_DB_TIME.labels(method, route).observe(request.db_seconds)
+
+
+def _with_server_timing(message: dict, request: _Request, elapsed: float) -> dict:
+    timing = (
+        f'db;dur={request.db_seconds * 1000:.2f};desc="{request.statements} statements", '
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+    return {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+
+
+class _TimedCheckout:
+    """Pool mixin: records how long each checkout waits for a connection"""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception as error:
+            from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+            if isinstance(error, PoolTimeout):
+                POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(time.perf_counter() - started)
+
+
+def timed_pool_class(pool_class: type, label: str) -> type:
+    """`pool_class` with checkout wait timing, for create_engine(poolclass=...)"""
+    return type(f"Timed{pool_class.__name__}", (_TimedCheckout, pool_class), {"metrics_label": label})
+
+
+def instrument_engine(engine, label: str) -> Callable[[], None]:
+    """
+    Time every statement per route and per request, log slow ones, and
+    expose the pool's size on scrape. With METRICS_ENABLED=false only the
+    per-request totals (for Server-Timing) and the slow statement log remain.
+    Returns a function that removes the instrumentation again.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.pool import QueuePool
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        request = _current_request.get()
+        route = "background" if request is None else _route_of(request.scope)
+        if settings.metrics_enabled:
+            STATEMENT_DURATION.labels(route).observe(elapsed)
+        if request is not None:
+            request.statements += 1
+            request.db_seconds += elapsed
+        slow_ms = settings.db_slow_statement_ms
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            if settings.metrics_enabled:
+                SLOW_STATEMENTS.labels(route).inc()
+            logger.warning("Slow statement (%.1f ms, route %s): %s", elapsed * 1000, route, statement[:500])
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    def record_pool():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            POOL_SIZE.labels(label).set(pool.size())
+            POOL_CHECKED_OUT.labels(label).set(pool.checkedout())
+            # QueuePool counts overflow from -size while below the pool size
+            POOL_OVERFLOW.labels(label).set(max(0, pool.overflow()))
+            max_overflow = pool._max_overflow  # no public accessor; -1 = unbounded
+            if max_overflow >= 0 and pool.size() + max_overflow > 0:
+                POOL_SATURATION.labels(label).set(pool.checkedout() / (pool.size() + max_overflow))
+
+    if settings.metrics_enabled:
+        REGISTRY.on_collect(record_pool)
+
+    def remove():
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+        REGISTRY.remove_collect_hook(record_pool)
+
+    return remove
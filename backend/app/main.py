@@ -1,10 +1,104 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import settings
 from app.api.v1.router import router as v1_router
+from app.deps import (
+    event_bus_enabled,
+    get_click_aggregator,
+    get_counter_batcher,
+    get_event_bus,
+    get_global_state_cache,
+    get_inmemory_journal,
+    get_profile_cache,
+    get_profile_tier,
+    get_replica_monitor,
+    global_state_cache_enabled,
+    inmemory_journal_enabled,
+    prepare_database,
+    prepare_inmemory_stores,
+    profile_cache_enabled,
+    profile_tiering_enabled,
+    recover_inmemory_state,
+    replica_enabled,
+)
+from app.instrumentation import MetricsMiddleware
+from app.metrics import REGISTRY, render_prometheus
+from app.repositories.interfaces import ProfileStoreFull, UnsupportedDeviceId
+
+logger = logging.getLogger(__name__)
+
+
+def write_behind_enabled() -> bool:
+    return settings.repository_mode == "postgres" and settings.click_write_mode == "write_behind"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Postgres mode: import SQLAlchemy and build the engine before serving, not on the first click
+    if settings.repository_mode == "postgres":
+        await asyncio.to_thread(prepare_database)
+    # In-memory mode: open the stores (shared memory segments included) up front
+    if settings.repository_mode == "inmemory":
+        await asyncio.to_thread(prepare_inmemory_stores)
+    # Durable in-memory mode: replay snapshot + journal before serving
+    journal = get_inmemory_journal() if inmemory_journal_enabled() else None
+    if journal is not None:
+        stats = await asyncio.to_thread(recover_inmemory_state)
+        logger.info(
+            "Recovered %d profiles from %d snapshot + %d journal records in %.2fs",
+            stats.profiles, stats.snapshot_records, stats.journal_records, stats.seconds,
+        )
+        journal.start()
+    # Write-behind clicks: start the flusher, and drain the buffer on shutdown
+    aggregator = get_click_aggregator() if write_behind_enabled() else None
+    if aggregator is not None:
+        aggregator.start()
+    # Tiered profiles: write dirty profiles back periodically, and all of them on shutdown
+    tier = get_profile_tier() if profile_tiering_enabled() else None
+    if tier is not None:
+        tier.start()
+    # Cached global state: first load + background refresher
+    state_cache = get_global_state_cache() if global_state_cache_enabled() else None
+    if state_cache is not None:
+        await asyncio.to_thread(state_cache.start)
+    # Read replica: read-only endpoints use it while its lag checks pass
+    replica_monitor = get_replica_monitor() if replica_enabled() else None
+    if replica_monitor is not None:
+        await asyncio.to_thread(replica_monitor.start)
+    # Event bus: announce writes to other replicas and apply theirs
+    bus = get_event_bus() if event_bus_enabled() else None
+    if bus is not None:
+        await asyncio.to_thread(bus.start)
+        get_counter_batcher().start()
+        if state_cache is not None:
+            bus.subscribe(state_cache.on_event)
+        if profile_cache_enabled():
+            get_profile_cache().attach(bus)
+    try:
+        yield
+    finally:
+        if bus is not None:
+            await asyncio.to_thread(get_counter_batcher().stop)
+            await asyncio.to_thread(bus.stop)
+        if state_cache is not None:
+            await asyncio.to_thread(state_cache.stop)
+        if replica_monitor is not None:
+            await asyncio.to_thread(replica_monitor.stop)
+        if aggregator is not None:
+            await asyncio.to_thread(aggregator.stop)
+        if tier is not None:
+            await asyncio.to_thread(tier.stop)
+        if journal is not None:
+            await asyncio.to_thread(journal.stop)
+
 
-app = FastAPI(title="Button0 API", version="0.1.0")
+app = FastAPI(title="Button0 API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,9 +107,30 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.metrics_enabled or settings.debug:
+    # Outermost, so the timing includes CORS handling
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(v1_router, prefix="/api/v1")
 
+
+# Limits of fixed-capacity profile stores (shared memory mode) are request or capacity errors, not 500s
+@app.exception_handler(UnsupportedDeviceId)
+async def unsupported_device_id(request: Request, exc: UnsupportedDeviceId) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(ProfileStoreFull)
+async def profile_store_full(request: Request, exc: ProfileStoreFull) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": "Profile store is full"})
+
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(render_prometheus(REGISTRY), media_type="text/plain; version=0.0.4")
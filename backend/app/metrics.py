@@ -0,0 +1,243 @@
+"""Lightweight in-process metrics (counters, gauges, histograms)"""
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterator, Sequence
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class _Labelled:
+    """Children per label values: metric.labels("GET", "/x") returns a child of the same type"""
+
+    def __init__(self, labelnames: Sequence[str]):
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], "_Labelled"] = {}
+        self._children_lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._children_lock:
+                child = self._children.setdefault(values, self._child())
+        return child
+
+    def children(self) -> Iterator[tuple[dict[str, str], "_Labelled"]]:
+        """(labels, metric) pairs to expose: the children, or the metric itself when unlabelled"""
+        if not self.labelnames:
+            yield {}, self
+            return
+        for values, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, values)), child
+
+    def _child(self):
+        raise NotImplementedError
+
+
+class _PerThread:
+    """
+    Per-thread accumulator cells. Each thread only ever writes its own
+    cell, so recording takes no lock; readers sum the cells (a scrape may
+    see one thread's update half-applied, never lose it).
+    """
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._cells: list[list[float]] = []
+        self._cells_lock = threading.Lock()  # only when a thread creates its cell
+
+    def cell(self) -> list[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0] * self._width
+            with self._cells_lock:
+                self._cells.append(cell)  # kept after the thread exits: totals never go down
+            return cell
+
+    def totals(self) -> list[float]:
+        with self._cells_lock:
+            cells = list(self._cells)
+        return [sum(column) for column in zip(*cells)] if cells else [0] * self._width
+
+
+class Counter(_Labelled):
+    """Monotonically increasing counter"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(labelnames)
+        self.name = name
+        self.documentation = documentation
+        self._cells = _PerThread(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+    def _child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+
+class Gauge(_Labelled):
+    """Value that can go up and down"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(labelnames)
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def _child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+
+class Histogram(_Labelled):
+    """Cumulative-bucket histogram (Prometheus semantics)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(labelnames)
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # Per-thread cells: one count per bucket, +Inf, then the sum
+        self._cells = _PerThread(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, sum and count"""
+        totals = self._cells.totals()
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), totals):
+            running += count
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "sum": totals[-1], "count": running}
+
+    def _child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, self.buckets)
+
+
+class MetricsRegistry:
+    """Named metric registry; metrics are created once and reused"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._collect_hooks: list[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, documentation, buckets, labelnames))
+
+    def get(self, name: str) -> Counter | Gauge | Histogram | None:
+        return self._metrics.get(name)
+
+    def on_collect(self, hook: Callable[[], None]) -> None:
+        """Run `hook` before every collect, e.g. to set gauges read from elsewhere"""
+        with self._lock:
+            self._collect_hooks.append(hook)
+
+    def remove_collect_hook(self, hook: Callable[[], None]) -> None:
+        with self._lock:
+            if hook in self._collect_hooks:
+                self._collect_hooks.remove(hook)
+
+    def collect(self) -> list[Counter | Gauge | Histogram]:
+        with self._lock:
+            hooks = list(self._collect_hooks)
+        for hook in hooks:
+            hook()
+        with self._lock:
+            return list(self._metrics.values())
+
+    def _get_or_create(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus(registry: MetricsRegistry) -> str:
+    """The registry in Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for metric in registry.collect():
+        kind = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}[type(metric)]
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {kind}")
+        for labels, child in metric.children():
+            if isinstance(child, Histogram):
+                snapshot = child.snapshot()
+                for bound, count in snapshot["buckets"]:
+                    lines.append(f"{metric.name}_bucket{_label_text({**labels, 'le': _number(bound)})} {count}")
+                lines.append(f"{metric.name}_sum{_label_text(labels)} {_number(snapshot['sum'])}")
+                lines.append(f"{metric.name}_count{_label_text(labels)} {snapshot['count']}")
+            else:
+                lines.append(f"{metric.name}{_label_text(labels)} {_number(child.value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
@@ -2,6 +2,7 @@
 from datetime import datetime, timezone
 from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, UniqueConstraint, Index, DateTime
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
@@ -11,6 +12,21 @@ def utc_now():
     return datetime.now(timezone.utc)
 
 
+class UTCDateTime(TypeDecorator):
+    """
+    TIMESTAMP WITHOUT TIME ZONE holding UTC.
+    Aware datetimes are converted to naive UTC before binding (asyncpg rejects
+    aware values for naive columns; psycopg2 would shift them by the server TZ).
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class ProfileORM(Base):
     """User profile model"""
     __tablename__ = "profiles"
@@ -18,10 +34,12 @@ class ProfileORM(Base):
     device_id = Column(String(255), primary_key=True, nullable=False)
     my_clicks = Column(Integer, default=0, nullable=False)
     selected_cosmetic = Column(String(255), nullable=False, default="default")
-    created_at = Column(DateTime, default=utc_now, nullable=False)
-    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+    # Unlocked cosmetics, one bit each (see app.domain.cosmetics); 1 = "default"
+    unlocked_mask = Column(BigInteger, nullable=False, default=1, server_default="1")
+    created_at = Column(UTCDateTime, default=utc_now, nullable=False)
+    updated_at = Column(UTCDateTime, default=utc_now, onupdate=utc_now, nullable=False)
     
-    # Relationship to unlocked cosmetics
+    # Relationship to unlocked cosmetics (legacy rows, see UnlockedCosmeticORM)
     unlocked_cosmetics = relationship(
         "UnlockedCosmeticORM",
         back_populates="profile",
@@ -33,13 +51,18 @@ class ProfileORM(Base):
 
 
 class UnlockedCosmeticORM(Base):
-    """Cosmetic unlock tracking"""
+    """
+    Cosmetic unlock tracking (legacy).
+
+    Superseded by profiles.unlocked_mask and no longer read or written by
+    the app; kept so the bitmask migration can be rolled back.
+    """
     __tablename__ = "unlocked_cosmetics"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     device_id = Column(String(255), ForeignKey("profiles.device_id"), nullable=False)
     cosmetic_id = Column(String(255), nullable=False)
-    created_at = Column(DateTime, default=utc_now, nullable=False)
+    created_at = Column(UTCDateTime, default=utc_now, nullable=False)
     
     # Relationship back to profile
     profile = relationship("ProfileORM", back_populates="unlocked_cosmetics")
@@ -55,12 +78,12 @@ class UnlockedCosmeticORM(Base):
 
 
 class GlobalStateORM(Base):
-    """Global application state (singleton, id=1)"""
+    """Global application state (slot rows id=1..N, summed on read)"""
     __tablename__ = "global_state"
     
     id = Column(Integer, primary_key=True, default=1)
     global_clicks = Column(BigInteger, default=0, nullable=False)
-    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+    updated_at = Column(UTCDateTime, default=utc_now, onupdate=utc_now, nullable=False)
     
     def __repr__(self):
         return f"<GlobalState global_clicks={self.global_clicks}>"
@@ -78,6 +101,6 @@ class UserORM(Base):
 class GlobalCounterORM(Base):
     __tablename__ = "global_counter"
 
-    # constant single row with id=1
+    # counter slots id=1..N (GLOBAL_COUNTER_SHARDS); the total is their sum
     id = Column(Integer, primary_key=True)
-    total_clicks = Column(Integer, nullable=False, default=0)
\ No newline at end of file
+    total_clicks = Column(BigInteger, nullable=False, default=0)
\ No newline at end of file
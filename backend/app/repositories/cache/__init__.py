@@ -0,0 +1 @@
+"""Caching repository package."""
@@ -0,0 +1,186 @@
+"""Cached global state: in-process view refreshed in the background"""
+import logging
+import threading
+import time
+from dataclasses import replace
+from typing import Callable, Optional
+
+from app.domain.models import GlobalState
+from app.events.bus import CounterDelta, Event
+from app.repositories.interfaces import AsyncGlobalStateRepository, GlobalStateRepository
+
+logger = logging.getLogger(__name__)
+
+
+class GlobalStateCache:
+    """
+    Process-wide cached copy of the global state.
+
+    A background thread reloads it every `refresh_interval_ms`; increments
+    made by this process are observed as soon as they are written. Reads never touch the
+    database once the first value is loaded. `staleness_ms()` is the age
+    of the last successful reload, i.e. the bound on how far behind other
+    replicas' increments the cached value may be.
+    """
+
+    def __init__(self, loader: Callable[[], GlobalState], refresh_interval_ms: int = 250):
+        self._loader = loader
+        self._interval = refresh_interval_ms / 1000
+        self._lock = threading.Lock()
+        self._state: GlobalState | None = None
+        self._refreshed_at: float | None = None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def get(self) -> Optional[GlobalState]:
+        """Return a copy of the cached state, or None before the first load"""
+        with self._lock:
+            return replace(self._state) if self._state is not None else None
+
+    def observe(self, state: GlobalState) -> None:
+        """Record a known-good state (e.g. from a write or a reload)"""
+        with self._lock:
+            # The counter only grows: never move the cached value backwards
+            if self._state is None or state.global_clicks >= self._state.global_clicks:
+                self._state = replace(state)
+
+    def on_event(self, event: Event) -> None:
+        """Event bus handler: take other replicas' totals without a reload"""
+        if isinstance(event, CounterDelta):
+            self.observe(GlobalState(global_clicks=event.global_clicks))
+
+    def refresh(self) -> None:
+        """Reload the authoritative state"""
+        state = self._loader()
+        self.observe(state)
+        self._refreshed_at = time.monotonic()
+
+    def staleness_ms(self) -> Optional[int]:
+        """Age of the last successful reload in ms (None before the first)"""
+        if self._refreshed_at is None:
+            return None
+        return int((time.monotonic() - self._refreshed_at) * 1000)
+
+    def start(self) -> None:
+        """Load once and start the background refresher"""
+        if self._thread is not None:
+            return
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Initial global state load failed")
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="global-state-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresher"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last value; staleness_ms() keeps growing
+                logger.exception("Global state refresh failed")
+
+
+class CachedGlobalStateRepository:
+    """GlobalStateRepository that reads from a GlobalStateCache"""
+
+    def __init__(self, inner: GlobalStateRepository, cache: GlobalStateCache):
+        self.inner = inner
+        self.cache = cache
+
+    def get_state(self) -> GlobalState:
+        state = self.cache.get()
+        if state is None:
+            state = self.inner.get_state()
+            self.cache.observe(state)
+        return state
+
+    def increment_clicks(self, delta: int) -> GlobalState:
+        state = self.inner.increment_clicks(delta)
+        self.cache.observe(state)
+        return state
+
+    def staleness_ms(self) -> Optional[int]:
+        return self.cache.staleness_ms()
+
+
+class AsyncCachedGlobalStateRepository:
+    """AsyncGlobalStateRepository that reads from a GlobalStateCache"""
+
+    def __init__(self, inner: AsyncGlobalStateRepository, cache: GlobalStateCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def get_state(self) -> GlobalState:
+        state = self.cache.get()
+        if state is None:
+            state = await self.inner.get_state()
+            self.cache.observe(state)
+        return state
+
+    async def increment_clicks(self, delta: int) -> GlobalState:
+        state = await self.inner.increment_clicks(delta)
+        self.cache.observe(state)
+        return state
+
+    def staleness_ms(self) -> Optional[int]:
+        return self.cache.staleness_ms()
+
+
+def _observe_after_commit(writer, cache: GlobalStateCache, global_clicks: int) -> None:
+    # Imported here: the publishing module pulls in SQLAlchemy, which inmemory mode never loads
+    from app.events.publishing import after_commit
+
+    state = GlobalState(global_clicks=global_clicks)
+    after_commit(writer, lambda: cache.observe(state))
+
+
+class CachedClickWriter:
+    """
+    ClickWriter that shows each click's global total to a GlobalStateCache
+    once it commits, so postgres-mode clicks are visible without a reload
+    """
+
+    def __init__(self, inner, cache: GlobalStateCache):
+        self.inner = inner
+        self.cache = cache
+        if hasattr(inner, "increment_many"):
+            self.increment_many = self._increment_many
+
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        my_clicks, global_clicks = self.inner.increment(user_id, delta)
+        _observe_after_commit(self.inner, self.cache, global_clicks)
+        return my_clicks, global_clicks
+
+    def _increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        user_totals, global_clicks = self.inner.increment_many(deltas)
+        _observe_after_commit(self.inner, self.cache, global_clicks)
+        return user_totals, global_clicks
+
+
+class AsyncCachedClickWriter:
+    """Async variant of CachedClickWriter (direct writes on the asyncio engine)"""
+
+    def __init__(self, inner, cache: GlobalStateCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        my_clicks, global_clicks = await self.inner.increment(user_id, delta)
+        _observe_after_commit(self.inner, self.cache, global_clicks)
+        return my_clicks, global_clicks
+
+    async def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        user_totals, global_clicks = await self.inner.increment_many(deltas)
+        _observe_after_commit(self.inner, self.cache, global_clicks)
+        return user_totals, global_clicks
@@ -0,0 +1,226 @@
+"""Read-through profile cache (bounded LRU with TTL)"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Callable, Optional
+
+from app.domain.models import Profile
+from app.events.bus import EventBus, ProfileChanged
+from app.events.publishing import after_commit
+from app.metrics import REGISTRY
+from app.repositories.interfaces import AsyncProfileRepository, ProfileRepository
+
+HITS = REGISTRY.counter("profile_cache_hits_total", "Profile reads served from the cache")
+MISSES = REGISTRY.counter("profile_cache_misses_total", "Profile reads that went to the repository")
+EVICTIONS = REGISTRY.counter(
+    "profile_cache_evictions_total", "Profiles dropped to stay within the size bound"
+)
+EXPIRATIONS = REGISTRY.counter(
+    "profile_cache_expirations_total", "Profiles dropped because their TTL ran out"
+)
+SIZE = REGISTRY.gauge("profile_cache_entries", "Profiles currently cached")
+
+
+def _copy(profile: Profile) -> Profile:
+    # Callers mutate profiles (e.g. unlocked_cosmetics.append): never share them
+    return replace(profile, unlocked_cosmetics=list(profile.unlocked_cosmetics))
+
+
+class ProfileCache:
+    """
+    Process-wide LRU of profiles keyed by device_id.
+
+    Holds at most `max_entries` profiles, each for at most `ttl_seconds`
+    (the bound on staleness when another replica writes the profile and no
+    event bus is attached). Entries are copies in both directions.
+
+    Every write and invalidation bumps a generation. A read-through put
+    passes the generation taken before its read and is dropped if the
+    profile was written or invalidated since, so a slow reader cannot put
+    back a profile that a committed write already replaced.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Profile]] = OrderedDict()
+        self._generation = 0
+        # Generation of the last write per device_id, bounded like the entries;
+        # reads older than _floor may have missed a forgotten write and are not cached
+        self._written: OrderedDict[str, int] = OrderedDict()
+        self._floor = 0
+
+    def generation(self) -> int:
+        """Token to pass to put() for a profile read from the repository after this call"""
+        with self._lock:
+            return self._generation
+
+    def get(self, device_id: str) -> Optional[Profile]:
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is None:
+                MISSES.inc()
+                return None
+            expires_at, profile = entry
+            if expires_at <= time.monotonic():
+                del self._entries[device_id]
+                EXPIRATIONS.inc()
+                MISSES.inc()
+                SIZE.set(len(self._entries))
+                return None
+            self._entries.move_to_end(device_id)
+            HITS.inc()
+            return _copy(profile)
+
+    def put(self, profile: Profile, generation: Optional[int] = None) -> None:
+        """Store a written profile, or with `generation` a read one unless written since"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is None:
+                self._bump(profile.device_id)
+            elif generation < self._floor or self._written.get(profile.device_id, 0) > generation:
+                return
+            self._entries[profile.device_id] = (
+                time.monotonic() + self.ttl_seconds,
+                _copy(profile),
+            )
+            self._entries.move_to_end(profile.device_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                EVICTIONS.inc()
+            SIZE.set(len(self._entries))
+
+    def invalidate(self, device_id: str) -> None:
+        with self._lock:
+            self._bump(device_id)
+            self._entries.pop(device_id, None)
+            SIZE.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._written.clear()
+            self._floor = self._generation
+            self._entries.clear()
+            SIZE.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attach(self, bus: EventBus) -> Callable[[], None]:
+        """Drop profiles that other replicas report as changed"""
+        def handle(event) -> None:
+            if isinstance(event, ProfileChanged) and event.origin != bus.origin:
+                self.invalidate(event.device_id)
+
+        return bus.subscribe(handle)
+
+    def _bump(self, device_id: str) -> None:
+        self._generation += 1
+        self._written[device_id] = self._generation
+        self._written.move_to_end(device_id)
+        while len(self._written) > max(self.max_entries, 1):
+            _, self._floor = self._written.popitem(last=False)
+
+
+class CachedProfileRepository:
+    """
+    ProfileRepository with read-through caching.
+
+    Writes drop the cached entry immediately and store the written profile
+    once the transaction commits, so a rolled-back write is never served.
+    """
+
+    def __init__(self, inner: ProfileRepository, cache: ProfileCache):
+        self.inner = inner
+        self.cache = cache
+        if hasattr(inner, "increment_clicks"):
+            self.increment_clicks = self._increment_clicks
+        if hasattr(inner, "unlock_cosmetic"):
+            self.unlock_cosmetic = self._unlock_cosmetic
+        if hasattr(inner, "select_cosmetic"):
+            self.select_cosmetic = self._select_cosmetic
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        profile = self.cache.get(device_id)
+        if profile is None:
+            generation = self.cache.generation()
+            profile = self.inner.get_by_device_id(device_id)
+            if profile is not None:
+                self.cache.put(profile, generation)
+        return profile
+
+    def create(self, profile: Profile) -> Profile:
+        return self._written(profile.device_id, lambda: self.inner.create(profile))
+
+    def update(self, profile: Profile) -> Profile:
+        return self._written(profile.device_id, lambda: self.inner.update(profile))
+
+    def _increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        return self._written(device_id, lambda: self.inner.increment_clicks(device_id, amount))
+
+    def _unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        return self._written(device_id, lambda: self.inner.unlock_cosmetic(device_id, cosmetic_id))
+
+    def _select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        return self._written(device_id, lambda: self.inner.select_cosmetic(device_id, cosmetic_id))
+
+    def _written(self, device_id: str, write: Callable[[], Optional[Profile]]) -> Optional[Profile]:
+        self.cache.invalidate(device_id)
+        profile = write()
+        if profile is not None:
+            stored = _copy(profile)
+            after_commit(self.inner, lambda: self.cache.put(stored))
+        return profile
+
+
+class AsyncCachedProfileRepository:
+    """AsyncProfileRepository with read-through caching (see above)"""
+
+    def __init__(self, inner: AsyncProfileRepository, cache: ProfileCache):
+        self.inner = inner
+        self.cache = cache
+        if hasattr(inner, "increment_clicks"):
+            self.increment_clicks = self._increment_clicks
+        if hasattr(inner, "unlock_cosmetic"):
+            self.unlock_cosmetic = self._unlock_cosmetic
+        if hasattr(inner, "select_cosmetic"):
+            self.select_cosmetic = self._select_cosmetic
+
+    async def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        profile = self.cache.get(device_id)
+        if profile is None:
+            generation = self.cache.generation()
+            profile = await self.inner.get_by_device_id(device_id)
+            if profile is not None:
+                self.cache.put(profile, generation)
+        return profile
+
+    async def create(self, profile: Profile) -> Profile:
+        self.cache.invalidate(profile.device_id)
+        return self._written(await self.inner.create(profile))
+
+    async def update(self, profile: Profile) -> Profile:
+        self.cache.invalidate(profile.device_id)
+        return self._written(await self.inner.update(profile))
+
+    async def _increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        self.cache.invalidate(device_id)
+        return self._written(await self.inner.increment_clicks(device_id, amount))
+
+    async def _unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        self.cache.invalidate(device_id)
+        return self._written(await self.inner.unlock_cosmetic(device_id, cosmetic_id))
+
+    async def _select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        self.cache.invalidate(device_id)
+        return self._written(await self.inner.select_cosmetic(device_id, cosmetic_id))
+
+    def _written(self, profile: Optional[Profile]) -> Optional[Profile]:
+        if profile is not None:
+            stored = _copy(profile)
+            after_commit(self.inner, lambda: self.cache.put(stored))
+        return profile
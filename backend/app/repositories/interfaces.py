@@ -29,4 +29,55 @@ class GlobalStateRepository(Protocol):
     
     def increment_clicks(self, delta: int) -> GlobalState:
         """Increment global clicks by delta"""
+        ...
+
+
+class ClickBufferFull(RuntimeError):
+    """Raised by a ClickWriter when its buffer is full and cannot be drained"""
+
+
+class ClickBatchFailed(RuntimeError):
+    """Raised to every caller whose clicks were in a shared transaction that failed"""
+
+
+class ProfileStoreFull(RuntimeError):
+    """Raised by a fixed-capacity profile store with no room for a new profile"""
+
+
+class UnsupportedDeviceId(ValueError):
+    """Raised by a profile store that cannot hold this device id (e.g. too long)"""
+
+
+class ClickWriter(Protocol):
+    """Interface for the postgres-mode click write path"""
+    
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        """Add delta to a user's clicks; returns (my_clicks, global_clicks); may raise ClickBufferFull"""
+        ...
+
+    def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        """Add many per-user deltas together; returns ({user_id: my_clicks}, global_clicks)"""
+        ...
+
+
+class AsyncProfileRepository(Protocol):
+    """Interface for profile data access on an asyncio session"""
+    
+    async def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        ...
+    
+    async def create(self, profile: Profile) -> Profile:
+        ...
+    
+    async def update(self, profile: Profile) -> Profile:
+        ...
+
+
+class AsyncGlobalStateRepository(Protocol):
+    """Interface for global state data access on an asyncio session"""
+    
+    async def get_state(self) -> GlobalState:
+        ...
+    
+    async def increment_clicks(self, delta: int) -> GlobalState:
         ...
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""Columnar in-memory profile repository for very large device populations"""
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain import cosmetics
+from app.domain.models import Profile, utc_now
+
+_COSMETIC_INDEX = {cosmetic_id: i for i, cosmetic_id in enumerate(cosmetics.COSMETIC_IDS)}
+
+
+def _to_epoch(value: datetime) -> float:
+    return value.timestamp()
+
+
+def _from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+class CompactInMemoryProfileRepository:
+    """
+    In-memory Profile repository storing each field in a parallel typed
+    array, indexed by a device id -> row table.
+
+    A profile costs its dict entry plus 33 bytes of array storage instead
+    of a dataclass instance with its own list and datetimes. Profile
+    objects are only built on the way out (and read back on update), so
+    nothing handed to callers aliases the store. Timestamps are kept as
+    epoch seconds (float) and the selected cosmetic as its catalog index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        self._clicks = array("q")
+        self._masks = array("Q")
+        self._selected = array("B")
+        self._created_at = array("d")
+        self._updated_at = array("d")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        with self._lock:
+            row = self._rows.get(device_id)
+            return None if row is None else self._load(device_id, row)
+
+    def create(self, profile: Profile) -> Profile:
+        with self._lock:
+            row = self._rows.get(profile.device_id)
+            if row is None:
+                row = self._append(profile.device_id)
+            self._store(row, profile)
+            return self._load(profile.device_id, row)
+
+    def update(self, profile: Profile) -> Profile:
+        with self._lock:
+            row = self._rows.get(profile.device_id)
+            if row is None:
+                raise ValueError(f"Profile {profile.device_id} not found")
+            profile.updated_at = utc_now()
+            self._store(row, profile)
+            return self._load(profile.device_id, row)
+
+    def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        """Atomically increment profile clicks, creating the profile if missing."""
+        with self._lock:
+            row = self._rows.get(device_id)
+            if row is None:
+                row = self._append(device_id)
+            self._clicks[row] += amount
+            self._updated_at[row] = _to_epoch(utc_now())
+            return self._load(device_id, row)
+
+    def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically set a cosmetic's unlock bit; None if the profile is missing."""
+        bit = cosmetics.bit_of(cosmetic_id)
+        if bit is None:
+            raise ValueError(f"Unknown cosmetic {cosmetic_id}")
+        with self._lock:
+            row = self._rows.get(device_id)
+            if row is None:
+                return None
+            if not self._masks[row] & bit:
+                self._masks[row] |= bit
+                self._updated_at[row] = _to_epoch(utc_now())
+            return self._load(device_id, row)
+
+    def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically select a cosmetic if it is unlocked; None if the profile is missing."""
+        with self._lock:
+            row = self._rows.get(device_id)
+            if row is None:
+                return None
+            if cosmetics.is_unlocked(self._masks[row], cosmetic_id):
+                self._selected[row] = _COSMETIC_INDEX[cosmetic_id]
+                self._updated_at[row] = _to_epoch(utc_now())
+            return self._load(device_id, row)
+
+    def _append(self, device_id: str) -> int:
+        row = len(self._rows)
+        now = _to_epoch(utc_now())
+        self._rows[device_id] = row
+        self._clicks.append(0)
+        self._masks.append(cosmetics.DEFAULT_MASK)
+        self._selected.append(0)
+        self._created_at.append(now)
+        self._updated_at.append(now)
+        return row
+
+    def _store(self, row: int, profile: Profile) -> None:
+        self._clicks[row] = profile.my_clicks
+        self._masks[row] = profile.unlocked_mask | cosmetics.DEFAULT_MASK
+        self._selected[row] = _COSMETIC_INDEX.get(profile.selected_cosmetic, 0)
+        self._created_at[row] = _to_epoch(profile.created_at)
+        self._updated_at[row] = _to_epoch(profile.updated_at)
+
+    def _load(self, device_id: str, row: int) -> Profile:
+        mask = self._masks[row]
+        return Profile(
+            device_id=device_id,
+            my_clicks=self._clicks[row],
+            unlocked_cosmetics=cosmetics.ids_of(mask),
+            selected_cosmetic=cosmetics.COSMETIC_IDS[self._selected[row]],
+            created_at=_from_epoch(self._created_at[row]),
+            updated_at=_from_epoch(self._updated_at[row]),
+            schema_version=1,
+            unlocked_mask=mask,
+        )
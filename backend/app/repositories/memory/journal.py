@@ -0,0 +1,329 @@
+"""Durable in-memory mode: append-only journal plus periodic snapshots"""
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.domain import cosmetics
+from app.domain.models import GlobalState, Profile
+from app.repositories.interfaces import GlobalStateRepository, ProfileRepository
+
+logger = logging.getLogger(__name__)
+
+_FILE_RE = re.compile(r"^(journal|snapshot)-(\d{12})\.log$")
+
+# Record layouts (one JSON array per line):
+#   ["p", device_id, my_clicks, unlocked_mask, selected_cosmetic, created_ts, updated_ts]
+#   ["g", global_clicks]
+# Records hold state *after* a write, and merge by max (counters), OR
+# (unlocks) and newest updated_ts (selection), so replaying one twice or
+# slightly out of order gives the same result.
+_P_CLICKS, _P_MASK, _P_SELECTED, _P_CREATED, _P_UPDATED = range(5)
+
+
+def profile_record(profile: Profile) -> list:
+    return [
+        "p",
+        profile.device_id,
+        profile.my_clicks,
+        profile.unlocked_mask,
+        profile.selected_cosmetic,
+        profile.created_at.timestamp(),
+        profile.updated_at.timestamp(),
+    ]
+
+
+@dataclass
+class RecoveryStats:
+    snapshot_records: int = 0
+    journal_records: int = 0
+    profiles: int = 0
+    global_clicks: int = 0
+    seconds: float = 0.0
+
+
+class JournalState:
+    """Merged view of snapshot and journal records"""
+
+    def __init__(self):
+        self.profiles: dict[str, list] = {}
+        self.global_clicks = 0
+
+    def apply(self, record: list) -> None:
+        if record[0] == "g":
+            self.global_clicks = max(self.global_clicks, record[1])
+            return
+        values = record[2:]
+        current = self.profiles.get(record[1])
+        if current is None:
+            self.profiles[record[1]] = values
+            return
+        current[_P_CLICKS] = max(current[_P_CLICKS], values[_P_CLICKS])
+        current[_P_MASK] |= values[_P_MASK]
+        current[_P_CREATED] = min(current[_P_CREATED], values[_P_CREATED])
+        if values[_P_UPDATED] >= current[_P_UPDATED]:
+            current[_P_SELECTED] = values[_P_SELECTED]
+            current[_P_UPDATED] = values[_P_UPDATED]
+
+    def records(self) -> Iterator[list]:
+        yield ["g", self.global_clicks]
+        for device_id, values in self.profiles.items():
+            yield ["p", device_id, *values]
+
+    def load_into(self, profile_repo: ProfileRepository, global_repo: GlobalStateRepository) -> None:
+        for device_id, values in self.profiles.items():
+            profile_repo.create(Profile(
+                device_id=device_id,
+                my_clicks=values[_P_CLICKS],
+                unlocked_cosmetics=cosmetics.ids_of(values[_P_MASK]),
+                selected_cosmetic=values[_P_SELECTED],
+                created_at=datetime.fromtimestamp(values[_P_CREATED], timezone.utc),
+                updated_at=datetime.fromtimestamp(values[_P_UPDATED], timezone.utc),
+                unlocked_mask=values[_P_MASK],
+            ))
+        if self.global_clicks:
+            global_repo.increment_clicks(self.global_clicks)
+
+
+def read_records(path: Path) -> Iterator[list]:
+    """Records in a journal or snapshot file (memory-mapped); a torn last line is skipped"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable journal record in %s", path.name)
+
+
+class InMemoryJournal:
+    """
+    Crash recovery for the in-memory repositories.
+
+    Writes append a record to an in-process buffer; a flusher thread
+    writes and fsyncs the buffer every `flush_interval_ms` (group flush),
+    so a crash loses at most that window. Every `snapshot_interval_s` the
+    current segment is closed and all closed segments are folded into a
+    compact snapshot, which replaces them. Recovery loads the newest
+    snapshot and replays only the segments written after it.
+
+    Files in `directory`: journal-<seq>.log segments and snapshot-<seq>.log,
+    which covers every segment numbered below <seq>.
+    """
+
+    def __init__(self, directory: str, flush_interval_ms: int = 50, snapshot_interval_s: float = 60):
+        self.directory = Path(directory)
+        self._flush_interval = flush_interval_ms / 1000
+        self._snapshot_interval = snapshot_interval_s
+        self._lock = threading.Lock()  # Guards the buffer
+        self._file_lock = threading.Lock()  # Guards the open segment
+        self._snapshot_lock = threading.Lock()
+        self._buffer: list[bytes] = []
+        self._segment = None
+        self._segment_seq = 0
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def append(self, record: list) -> None:
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            self._buffer.append(line)
+
+    def flush(self) -> None:
+        """Write and fsync buffered records"""
+        if self._segment is None:
+            return  # Not recovered yet; keep buffering
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        with self._file_lock:
+            self._segment.write(b"".join(lines))
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+
+    def recover(
+        self, profile_repo: ProfileRepository, global_repo: GlobalStateRepository
+    ) -> RecoveryStats:
+        """Load snapshot + journal tail into empty repositories, then open a new segment"""
+        started = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stats = RecoveryStats()
+        state = JournalState()
+        snapshot_seq, segments = self._scan()
+        if snapshot_seq is not None:
+            for record in read_records(self._path("snapshot", snapshot_seq)):
+                state.apply(record)
+                stats.snapshot_records += 1
+        for seq in segments:
+            for record in read_records(self._path("journal", seq)):
+                state.apply(record)
+                stats.journal_records += 1
+        state.load_into(profile_repo, global_repo)
+
+        # Never append to an old segment: it may end in a torn record
+        last = max([snapshot_seq or 0, *segments], default=0)
+        self._open_segment(last + 1)
+        stats.profiles = len(state.profiles)
+        stats.global_clicks = state.global_clicks
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def snapshot(self) -> None:
+        """Close the current segment and fold closed segments into a new snapshot"""
+        with self._snapshot_lock:
+            self.flush()
+            with self._file_lock:
+                covered = self._segment_seq + 1
+                self._segment.close()
+                self._open_segment(covered)
+
+            snapshot_seq, segments = self._scan()
+            closed = [seq for seq in segments if seq < covered]
+            state = JournalState()
+            if snapshot_seq is not None:
+                for record in read_records(self._path("snapshot", snapshot_seq)):
+                    state.apply(record)
+            for seq in closed:
+                for record in read_records(self._path("journal", seq)):
+                    state.apply(record)
+
+            target = self._path("snapshot", covered)
+            tmp = target.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                for record in state.records():
+                    f.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+            self._fsync_directory()
+
+            if snapshot_seq is not None:
+                self._path("snapshot", snapshot_seq).unlink(missing_ok=True)
+            for seq in closed:
+                self._path("journal", seq).unlink(missing_ok=True)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._run_flusher, name="journal-flusher", daemon=True),
+            threading.Thread(target=self._run_snapshots, name="journal-snapshots", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._segment is not None:
+            self.flush()
+            with self._file_lock:
+                self._segment.close()
+                self._segment = None
+
+    def _run_flusher(self) -> None:
+        while not self._stopping.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Journal flush failed")
+
+    def _run_snapshots(self) -> None:
+        while not self._stopping.wait(self._snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception:
+                logger.exception("Journal snapshot failed")
+
+    def _open_segment(self, seq: int) -> None:
+        self._segment_seq = seq
+        self._segment = open(self._path("journal", seq), "ab")
+        self._fsync_directory()
+
+    def _path(self, kind: str, seq: int) -> Path:
+        return self.directory / f"{kind}-{seq:012d}.log"
+
+    def _scan(self) -> tuple[Optional[int], list[int]]:
+        """(newest snapshot seq, journal segment seqs it does not cover)"""
+        snapshots, segments = [], []
+        for path in self.directory.iterdir():
+            match = _FILE_RE.match(path.name)
+            if match:
+                (snapshots if match[1] == "snapshot" else segments).append(int(match[2]))
+        snapshot_seq = max(snapshots, default=None)
+        floor = snapshot_seq or 0
+        return snapshot_seq, sorted(seq for seq in segments if seq >= floor)
+
+    def _fsync_directory(self) -> None:
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class JournaledProfileRepository:
+    """Records every profile write in an InMemoryJournal"""
+
+    def __init__(self, inner: ProfileRepository, journal: InMemoryJournal):
+        self.inner = inner
+        self.journal = journal
+        if hasattr(inner, "increment_clicks"):
+            self.increment_clicks = self._increment_clicks
+        if hasattr(inner, "unlock_cosmetic"):
+            self.unlock_cosmetic = self._unlock_cosmetic
+        if hasattr(inner, "select_cosmetic"):
+            self.select_cosmetic = self._select_cosmetic
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        return self.inner.get_by_device_id(device_id)
+
+    def create(self, profile: Profile) -> Profile:
+        return self._journaled(self.inner.create(profile))
+
+    def update(self, profile: Profile) -> Profile:
+        return self._journaled(self.inner.update(profile))
+
+    def _increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        return self._journaled(self.inner.increment_clicks(device_id, amount))
+
+    def _unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        profile = self.inner.unlock_cosmetic(device_id, cosmetic_id)
+        return self._journaled(profile) if profile else None
+
+    def _select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        profile = self.inner.select_cosmetic(device_id, cosmetic_id)
+        return self._journaled(profile) if profile else None
+
+    def _journaled(self, profile: Profile) -> Profile:
+        self.journal.append(profile_record(profile))
+        return profile
+
+
+class JournaledGlobalStateRepository:
+    """Records the global total after every increment in an InMemoryJournal"""
+
+    def __init__(self, inner: GlobalStateRepository, journal: InMemoryJournal):
+        self.inner = inner
+        self.journal = journal
+
+    def get_state(self) -> GlobalState:
+        return self.inner.get_state()
+
+    def increment_clicks(self, delta: int) -> GlobalState:
+        state = self.inner.increment_clicks(delta)
+        self.journal.append(["g", state.global_clicks])
+        return state
@@ -2,6 +2,7 @@
 import threading
 from typing import Optional
 
+from app.domain import cosmetics
 from app.domain.models import Profile, utc_now
 from app.repositories.interfaces import ProfileRepository
 
@@ -44,4 +45,106 @@ class InMemoryProfileRepository(ProfileRepository):
                 profile.selected_cosmetic = "default"
             profile.updated_at = utc_now()
             self._profiles[profile.device_id] = profile
-            return profile
\ No newline at end of file
+            return profile
+
+
+def _with_defaults(profile: Profile) -> Profile:
+    if not profile.unlocked_cosmetics:
+        profile.unlocked_cosmetics = ["default"]
+    if not profile.selected_cosmetic:
+        profile.selected_cosmetic = "default"
+    return profile
+
+
+def _snapshot(profile: Profile) -> Profile:
+    # Positional constructor: several times cheaper than dataclasses.replace
+    return Profile(
+        profile.device_id,
+        profile.my_clicks,
+        profile.unlocked_cosmetics,
+        profile.selected_cosmetic,
+        profile.created_at,
+        profile.updated_at,
+        profile.schema_version,
+        profile.unlocked_mask,
+    )
+
+
+class StripedInMemoryProfileRepository:
+    """
+    In-memory Profile repository split into `stripes` independent
+    lock+dict shards keyed by device id hash, so requests for different
+    devices rarely wait on each other. Stripe locks are real locks, so this
+    stays correct on free-threaded builds.
+
+    Unlike InMemoryProfileRepository it also offers atomic increment_clicks,
+    unlock_cosmetic and select_cosmetic, so concurrent clicks on one device
+    are never lost.
+    """
+
+    def __init__(self, stripes: int = 64):
+        self._stripes = [(threading.Lock(), {}) for _ in range(max(1, stripes))]
+
+    def _stripe(self, device_id: str) -> tuple[threading.Lock, dict[str, Profile]]:
+        return self._stripes[hash(device_id) % len(self._stripes)]
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        lock, profiles = self._stripe(device_id)
+        with lock:
+            profile = profiles.get(device_id)
+            return _with_defaults(profile) if profile else None
+
+    def create(self, profile: Profile) -> Profile:
+        lock, profiles = self._stripe(profile.device_id)
+        with lock:
+            profiles[profile.device_id] = _with_defaults(profile)
+            return profile
+
+    def update(self, profile: Profile) -> Profile:
+        lock, profiles = self._stripe(profile.device_id)
+        with lock:
+            if profile.device_id not in profiles:
+                raise ValueError(f"Profile {profile.device_id} not found")
+            profile.updated_at = utc_now()
+            profiles[profile.device_id] = _with_defaults(profile)
+            return profile
+
+    def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        """Atomically increment profile clicks, creating the profile if missing."""
+        lock, profiles = self._stripe(device_id)
+        with lock:
+            profile = profiles.get(device_id)
+            if profile is None:
+                profile = profiles[device_id] = Profile(device_id=device_id)
+            profile.my_clicks += amount
+            profile.updated_at = utc_now()
+            # Snapshot: the caller sees this increment's count, not a later one
+            return _snapshot(profile)
+
+    def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically set a cosmetic's unlock bit; None if the profile is missing."""
+        bit = cosmetics.bit_of(cosmetic_id)
+        if bit is None:
+            raise ValueError(f"Unknown cosmetic {cosmetic_id}")
+        lock, profiles = self._stripe(device_id)
+        with lock:
+            profile = profiles.get(device_id)
+            if profile is None:
+                return None
+            if not profile.unlocked_mask & bit:
+                profile.unlocked_mask |= bit
+                profile.unlocked_cosmetics = cosmetics.ids_of(profile.unlocked_mask)
+                profile.updated_at = utc_now()
+            return _snapshot(profile)
+
+    def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically select a cosmetic if it is unlocked; None if the profile is missing."""
+        lock, profiles = self._stripe(device_id)
+        with lock:
+            profile = profiles.get(device_id)
+            if profile is None:
+                return None
+            if cosmetics.is_unlocked(profile.unlocked_mask, cosmetic_id):
+                profile.selected_cosmetic = cosmetic_id
+                profile.updated_at = utc_now()
+            return _snapshot(profile)
@@ -0,0 +1,99 @@
+"""Global counter shared by all worker processes on a host (shared memory)"""
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+from app.domain.models import GlobalState
+from app.repositories.memory.shared_memory import (
+    SETUP_LOCK,
+    SegmentLocks,
+    close_segment,
+    open_segment,
+)
+
+_MAGIC = 0x42304743_00000001  # "B0GC", layout version 1
+_HEADER_WORDS = 8  # magic, slots, updated_at (epoch microseconds), reserved
+_MAGIC_WORD, _SLOTS_WORD, _UPDATED_WORD = range(3)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedMemoryGlobalStateRepository:
+    """
+    GlobalState repository whose count is shared by every worker process.
+
+    The segment holds one (owner pid, count) slot per worker. A worker
+    claims a free slot (or one left by a dead process, keeping its count)
+    once, under a host-wide file lock, and from then on adds only into its
+    own slot under a process-local lock, so clicks never contend across
+    processes. Reads sum all slots.
+
+    The segment outlives the workers (until `unlink_segment` or a reboot),
+    so worker restarts keep the count.
+    """
+
+    def __init__(self, name: str = "button0-global", slots: int = 256):
+        self.name = name
+        self._locks = SegmentLocks(name, 1)
+        size = (_HEADER_WORDS + 2 * slots) * 8
+
+        def initialize(buf: memoryview) -> None:
+            words = buf.cast("q")
+            words[_MAGIC_WORD] = _MAGIC
+            words[_SLOTS_WORD] = slots
+            words[_UPDATED_WORD] = time.time_ns() // 1000
+            words.release()
+
+        self._segment = open_segment(name, size, self._locks, initialize)
+        self._words = self._segment.buf.cast("q")
+        if self._words[_MAGIC_WORD] != _MAGIC or self._words[_SLOTS_WORD] != slots:
+            raise ValueError(f"Shared memory segment {name} has an incompatible layout")
+        self._pids = self._words[_HEADER_WORDS:_HEADER_WORDS + slots]
+        self._counts = self._words[_HEADER_WORDS + slots:_HEADER_WORDS + 2 * slots]
+        self._lock = threading.Lock()
+        self._slot: int | None = None
+        self._slot_pid = 0
+        # Views must be released before the mapping closes, also at interpreter exit
+        self._finalizer = weakref.finalize(
+            self, close_segment, [self._pids, self._counts, self._words], self._segment, self._locks
+        )
+
+    def _claim_slot(self) -> int:
+        pid = os.getpid()
+        if self._slot is not None and self._slot_pid == pid:
+            return self._slot
+        # First use in this process (or we were forked): claim a slot
+        with self._locks.hold(SETUP_LOCK):
+            for slot, owner in enumerate(self._pids):
+                if owner == 0 or owner == pid or not _pid_alive(owner):
+                    self._pids[slot] = pid
+                    self._slot, self._slot_pid = slot, pid
+                    return slot
+        raise RuntimeError(f"All {len(self._pids)} worker slots in {self.name} are in use")
+
+    def get_state(self) -> GlobalState:
+        updated_us = self._words[_UPDATED_WORD]
+        return GlobalState(
+            global_clicks=sum(self._counts),
+            updated_at=datetime.fromtimestamp(updated_us / 1e6, timezone.utc),
+        )
+
+    def increment_clicks(self, delta: int) -> GlobalState:
+        with self._lock:
+            slot = self._claim_slot()
+            self._counts[slot] += delta
+        self._words[_UPDATED_WORD] = time.time_ns() // 1000
+        return self.get_state()
+
+    def close(self) -> None:
+        self._finalizer()
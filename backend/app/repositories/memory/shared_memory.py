@@ -0,0 +1,96 @@
+"""Named shared-memory segments and cross-process locks for multi-worker in-memory mode"""
+import fcntl
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Callable, Iterator, Sequence
+
+SETUP_LOCK = 0  # Lock index reserved for segment creation and slot allocation
+
+
+def _attach(name: str, create: bool, size: int) -> SharedMemory:
+    # Workers come and go; the segment must not be unlinked when one exits
+    try:
+        return SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:  # Python < 3.13
+        segment = SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _lock_path(name: str) -> Path:
+    return Path(tempfile.gettempdir()) / f"{name}.lock"
+
+
+class SegmentLocks:
+    """
+    Numbered exclusive locks shared by every process on the host.
+
+    Each lock is a one-byte POSIX record lock on a file next to the
+    segment, paired with a process-local mutex (record locks don't
+    exclude threads of the same process). The kernel drops a process's
+    record locks when it dies, so a crashed worker never wedges the rest.
+    """
+
+    def __init__(self, name: str, count: int):
+        self.path = _lock_path(name)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._mutexes = [threading.Lock() for _ in range(count)]
+
+    @contextmanager
+    def hold(self, index: int) -> Iterator[None]:
+        with self._mutexes[index]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, index)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, index)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_segment(
+    name: str, size: int, locks: SegmentLocks, initialize: Callable[[memoryview], None]
+) -> SharedMemory:
+    """Attach to segment `name`, creating and initializing it if this is the first process"""
+    with locks.hold(SETUP_LOCK):
+        try:
+            segment = _attach(name, create=True, size=size)
+        except FileExistsError:
+            segment = _attach(name, create=False, size=0)
+            if segment.size < size:
+                segment.close()
+                raise ValueError(
+                    f"Shared memory segment {name} is {segment.size} bytes, expected {size}: "
+                    f"it was created with different settings"
+                )
+        else:
+            initialize(segment.buf)
+    return segment
+
+
+def close_segment(views: Sequence[memoryview], segment: SharedMemory, locks: SegmentLocks) -> None:
+    """Release views into a segment, then detach (the segment itself stays)"""
+    for view in views:
+        view.release()
+    segment.close()
+    locks.close()
+
+
+def unlink_segment(name: str) -> None:
+    """Remove a segment (all state is lost); a no-op if it doesn't exist"""
+    try:
+        segment = _attach(name, create=False, size=0)
+    except FileNotFoundError:
+        return
+    finally:
+        _lock_path(name).unlink(missing_ok=True)
+    segment.close()
+    if not hasattr(segment, "_track"):  # Python < 3.13 unregisters on unlink
+        resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
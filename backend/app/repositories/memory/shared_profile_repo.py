@@ -0,0 +1,174 @@
+"""Profile table shared by all worker processes on a host (shared memory)"""
+import struct
+import weakref
+import zlib
+from typing import Optional
+
+from app.domain import cosmetics
+from app.domain.models import Profile, utc_now
+from app.repositories.interfaces import ProfileStoreFull, UnsupportedDeviceId
+from app.repositories.memory.compact_profile_repo import _COSMETIC_INDEX, _from_epoch, _to_epoch
+from app.repositories.memory.shared_memory import SegmentLocks, close_segment, open_segment
+
+MAX_DEVICE_ID_BYTES = 128
+
+_MAGIC = 0x42305054_00000001  # "B0PT", layout version 1
+_HEADER = struct.Struct("<qqq")  # magic, capacity, stripes
+_HEADER_BYTES = 64
+# key length (0 = empty slot), key, clicks, unlocked mask, selected index, created, updated
+_RECORD = struct.Struct(f"<H{MAX_DEVICE_ID_BYTES}sqQBdd")
+_KEY_LEN = struct.Struct("<H")
+
+
+class SharedMemoryProfileRepository:
+    """
+    Fixed-capacity profile hash table in shared memory, usable from every
+    worker process at once.
+
+    The table is split into `stripes` independent open-addressing regions;
+    a device id hashes (crc32, identical in every process) to one region
+    and probes linearly within it. Each region has its own host-wide lock,
+    so workers only contend on the same region. Records are fixed-size
+    (device ids up to MAX_DEVICE_ID_BYTES of UTF-8), fields are stored the
+    way CompactInMemoryProfileRepository stores them, and Profile objects
+    are built on the way out. Profiles are never deleted; a full region
+    raises ProfileStoreFull, so size `capacity` for the device population.
+    Longer device ids raise UnsupportedDeviceId.
+    """
+
+    def __init__(self, name: str = "button0-profiles", capacity: int = 100_000, stripes: int = 64):
+        self.name = name
+        self._per_stripe = max(1, -(-capacity // stripes))
+        self._stripes = stripes
+        self.capacity = self._per_stripe * stripes
+        # Lock 0 is the setup lock; region i uses lock i + 1
+        self._locks = SegmentLocks(name, stripes + 1)
+        size = _HEADER_BYTES + self.capacity * _RECORD.size
+
+        def initialize(buf: memoryview) -> None:
+            _HEADER.pack_into(buf, 0, _MAGIC, self.capacity, stripes)
+
+        self._segment = open_segment(name, size, self._locks, initialize)
+        self._buf = self._segment.buf
+        if _HEADER.unpack_from(self._buf, 0) != (_MAGIC, self.capacity, stripes):
+            raise ValueError(f"Shared memory segment {name} has an incompatible layout")
+        self._finalizer = weakref.finalize(self, close_segment, [self._buf], self._segment, self._locks)
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        key, stripe = self._key(device_id)
+        with self._locks.hold(stripe + 1):
+            offset, found = self._find(key, stripe)
+            return self._load(offset) if found else None
+
+    def create(self, profile: Profile) -> Profile:
+        key, stripe = self._key(profile.device_id)
+        with self._locks.hold(stripe + 1):
+            offset, _ = self._find(key, stripe, insert=True)
+            self._store(offset, key, profile)
+            return self._load(offset)
+
+    def update(self, profile: Profile) -> Profile:
+        key, stripe = self._key(profile.device_id)
+        with self._locks.hold(stripe + 1):
+            offset, found = self._find(key, stripe)
+            if not found:
+                raise ValueError(f"Profile {profile.device_id} not found")
+            profile.updated_at = utc_now()
+            self._store(offset, key, profile)
+            return self._load(offset)
+
+    def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        """Atomically increment profile clicks, creating the profile if missing."""
+        key, stripe = self._key(device_id)
+        with self._locks.hold(stripe + 1):
+            offset, found = self._find(key, stripe, insert=True)
+            if not found:
+                self._store(offset, key, Profile(device_id=device_id))
+            record = list(_RECORD.unpack_from(self._buf, offset))
+            record[2] += amount
+            record[6] = _to_epoch(utc_now())
+            _RECORD.pack_into(self._buf, offset, *record)
+            return self._load(offset)
+
+    def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically set a cosmetic's unlock bit; None if the profile is missing."""
+        bit = cosmetics.bit_of(cosmetic_id)
+        if bit is None:
+            raise ValueError(f"Unknown cosmetic {cosmetic_id}")
+        key, stripe = self._key(device_id)
+        with self._locks.hold(stripe + 1):
+            offset, found = self._find(key, stripe)
+            if not found:
+                return None
+            record = list(_RECORD.unpack_from(self._buf, offset))
+            if not record[3] & bit:
+                record[3] |= bit
+                record[6] = _to_epoch(utc_now())
+                _RECORD.pack_into(self._buf, offset, *record)
+            return self._load(offset)
+
+    def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically select a cosmetic if it is unlocked; None if the profile is missing."""
+        key, stripe = self._key(device_id)
+        with self._locks.hold(stripe + 1):
+            offset, found = self._find(key, stripe)
+            if not found:
+                return None
+            record = list(_RECORD.unpack_from(self._buf, offset))
+            if cosmetics.is_unlocked(record[3], cosmetic_id):
+                record[4] = _COSMETIC_INDEX[cosmetic_id]
+                record[6] = _to_epoch(utc_now())
+                _RECORD.pack_into(self._buf, offset, *record)
+            return self._load(offset)
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def _key(self, device_id: str) -> tuple[bytes, int]:
+        key = device_id.encode()
+        if not key or len(key) > MAX_DEVICE_ID_BYTES:
+            raise UnsupportedDeviceId(
+                f"Device ids must be 1-{MAX_DEVICE_ID_BYTES} bytes in shared memory mode"
+            )
+        return key, zlib.crc32(key) % self._stripes
+
+    def _find(self, key: bytes, stripe: int, insert: bool = False) -> tuple[int, bool]:
+        """(record offset, found); with insert, the offset of the free slot when not found"""
+        base = stripe * self._per_stripe
+        start = zlib.adler32(key) % self._per_stripe
+        for probe in range(self._per_stripe):
+            offset = _HEADER_BYTES + (base + (start + probe) % self._per_stripe) * _RECORD.size
+            (length,) = _KEY_LEN.unpack_from(self._buf, offset)
+            if length == 0:
+                return offset, False
+            if length == len(key) and self._buf[offset + 2:offset + 2 + length] == key:
+                return offset, True
+        if insert:
+            raise ProfileStoreFull(f"Shared profile table {self.name} is full (capacity {self.capacity})")
+        return -1, False
+
+    def _store(self, offset: int, key: bytes, profile: Profile) -> None:
+        _RECORD.pack_into(
+            self._buf,
+            offset,
+            len(key),
+            key,
+            profile.my_clicks,
+            profile.unlocked_mask | cosmetics.DEFAULT_MASK,
+            _COSMETIC_INDEX.get(profile.selected_cosmetic, 0),
+            _to_epoch(profile.created_at),
+            _to_epoch(profile.updated_at),
+        )
+
+    def _load(self, offset: int) -> Profile:
+        length, key, clicks, mask, selected, created_at, updated_at = _RECORD.unpack_from(self._buf, offset)
+        return Profile(
+            device_id=key[:length].decode(),
+            my_clicks=clicks,
+            unlocked_cosmetics=cosmetics.ids_of(mask),
+            selected_cosmetic=cosmetics.COSMETIC_IDS[selected],
+            created_at=_from_epoch(created_at),
+            updated_at=_from_epoch(updated_at),
+            schema_version=1,
+            unlocked_mask=mask,
+        )
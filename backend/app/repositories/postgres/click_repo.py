@@ -0,0 +1,198 @@
+"""PostgreSQL click ledger repository (users + global_counter tables)"""
+import random
+from typing import Iterable
+
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import GlobalCounterORM, UserORM, utc_now
+
+
+def _increment_stmt(user_id: str, delta: int, slot: int, shards: int):
+    """
+    Single statement: data-modifying CTEs upsert the user and the counter
+    slot, and the outer SELECT returns both new totals.
+    """
+    now = utc_now()
+    user_upsert = insert(UserORM).values(
+        user_id=user_id, total_clicks=delta, created_at=now, last_seen=now
+    )
+    user_row = user_upsert.on_conflict_do_update(
+        index_elements=[UserORM.user_id],
+        set_={
+            "total_clicks": UserORM.total_clicks + user_upsert.excluded.total_clicks,
+            "last_seen": user_upsert.excluded.last_seen,
+        },
+    ).returning(UserORM.total_clicks).cte("user_row")
+
+    slot_row = _slot_upsert(slot, delta).cte("slot_row")
+
+    global_total = slot_row.c.total_clicks
+    if shards > 1:
+        # Other slots as of the statement snapshot; our slot comes from RETURNING
+        global_total = global_total + _other_slots_total(slot)
+
+    return select(
+        user_row.c.total_clicks.label("my_clicks"),
+        global_total.label("global_clicks"),
+    ).select_from(user_row.join(slot_row, true()))
+
+
+def _batch_upsert_stmt(deltas: dict[str, int]):
+    now = utc_now()
+    # Sorted rows give concurrent batches a consistent row-lock order
+    rows = [
+        {"user_id": user_id, "total_clicks": delta, "created_at": now, "last_seen": now}
+        for user_id, delta in sorted(deltas.items())
+    ]
+    stmt = insert(UserORM).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[UserORM.user_id],
+        set_={
+            "total_clicks": UserORM.total_clicks + stmt.excluded.total_clicks,
+            "last_seen": stmt.excluded.last_seen,
+        },
+    ).returning(UserORM.user_id, UserORM.total_clicks)
+
+
+def _user_total_stmt(user_id: str):
+    return select(UserORM.total_clicks).where(UserORM.user_id == user_id)
+
+
+def _user_totals_stmt(user_ids: list[str]):
+    return select(UserORM.user_id, UserORM.total_clicks).where(UserORM.user_id.in_(user_ids))
+
+
+def _global_total_stmt():
+    return select(func.coalesce(func.sum(GlobalCounterORM.total_clicks), 0))
+
+
+def _slot_upsert(slot: int, delta: int):
+    stmt = insert(GlobalCounterORM).values(id=slot, total_clicks=delta)
+    return stmt.on_conflict_do_update(
+        index_elements=[GlobalCounterORM.id],
+        set_={"total_clicks": GlobalCounterORM.total_clicks + stmt.excluded.total_clicks},
+    ).returning(GlobalCounterORM.total_clicks)
+
+
+def _other_slots_total(slot: int):
+    return _global_total_stmt().where(GlobalCounterORM.id != slot).scalar_subquery()
+
+
+def _pick_slot(shards: int) -> int:
+    if shards == 1:
+        return 1
+    return random.randint(1, shards)
+
+
+class PostgresClickRepository:
+    """
+    Per-user click totals plus the sharded global counter.
+
+    The global counter is spread over `shards` slot rows (id=1..shards);
+    each increment updates one random slot and reads return the sum.
+    """
+
+    def __init__(self, session: Session, shards: int = 1):
+        self.session = session
+        self.shards = max(1, shards)
+
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        """
+        Increment a user's clicks (creating the user if missing) and the
+        global counter in one statement. Returns (user_total, global_total).
+        """
+        stmt = _increment_stmt(user_id, delta, _pick_slot(self.shards), self.shards)
+        row = self.session.execute(stmt).one()
+        return row.my_clicks, row.global_clicks
+
+    def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        """
+        Apply many per-user deltas in one statement set: a multi-row upsert
+        into users plus one global counter update.
+        Returns ({user_id: user_total}, global_total).
+        """
+        if not deltas:
+            return {}, self.get_global_total()
+
+        result = self.session.execute(_batch_upsert_stmt(deltas))
+        user_totals = {row.user_id: row.total_clicks for row in result}
+
+        global_total = self.increment_global(sum(deltas.values()))
+        return user_totals, global_total
+
+    def get_user_total(self, user_id: str) -> int:
+        """Return a user's durable click total (0 if the user does not exist)."""
+        total = self.session.execute(_user_total_stmt(user_id)).scalar_one_or_none()
+        return total or 0
+
+    def get_user_totals(self, user_ids: Iterable[str]) -> dict[str, int]:
+        """Return many users' durable click totals in one statement (0 for missing users)."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        totals = dict.fromkeys(user_ids, 0)
+        totals.update(self.session.execute(_user_totals_stmt(user_ids)).all())
+        return totals
+
+    def increment_global(self, delta: int) -> int:
+        """Add delta to one counter slot and return the new global total."""
+        slot = _pick_slot(self.shards)
+        slot_total = self.session.execute(_slot_upsert(slot, delta)).scalar_one()
+
+        if self.shards == 1:
+            return slot_total
+        return slot_total + self.session.execute(select(_other_slots_total(slot))).scalar_one()
+
+    def get_global_total(self) -> int:
+        """Return the global click total (sum of all counter slots)."""
+        return self.session.execute(_global_total_stmt()).scalar_one()
+
+
+class AsyncPostgresClickRepository:
+    """Click ledger on an asyncio session (same statements as above)"""
+
+    def __init__(self, session: AsyncSession, shards: int = 1):
+        self.session = session
+        self.shards = max(1, shards)
+
+    async def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        stmt = _increment_stmt(user_id, delta, _pick_slot(self.shards), self.shards)
+        row = (await self.session.execute(stmt)).one()
+        return row.my_clicks, row.global_clicks
+
+    async def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        if not deltas:
+            return {}, await self.get_global_total()
+
+        result = await self.session.execute(_batch_upsert_stmt(deltas))
+        user_totals = {row.user_id: row.total_clicks for row in result}
+
+        global_total = await self.increment_global(sum(deltas.values()))
+        return user_totals, global_total
+
+    async def get_user_total(self, user_id: str) -> int:
+        total = (await self.session.execute(_user_total_stmt(user_id))).scalar_one_or_none()
+        return total or 0
+
+    async def get_user_totals(self, user_ids: Iterable[str]) -> dict[str, int]:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        totals = dict.fromkeys(user_ids, 0)
+        totals.update((await self.session.execute(_user_totals_stmt(user_ids))).all())
+        return totals
+
+    async def increment_global(self, delta: int) -> int:
+        slot = _pick_slot(self.shards)
+        slot_total = (await self.session.execute(_slot_upsert(slot, delta))).scalar_one()
+
+        if self.shards == 1:
+            return slot_total
+        others = await self.session.execute(select(_other_slots_total(slot)))
+        return slot_total + others.scalar_one()
+
+    async def get_global_total(self) -> int:
+        return (await self.session.execute(_global_total_stmt())).scalar_one()
@@ -1,50 +1,88 @@
 """PostgreSQL global state repository implementation"""
-from sqlalchemy import update
+import random
+
+from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import GlobalStateORM, utc_now
 from app.domain.models import GlobalState
 
 
+def _state_stmt():
+    return select(
+        func.count(GlobalStateORM.id).label("slots"),
+        func.coalesce(func.sum(GlobalStateORM.global_clicks), 0).label("global_clicks"),
+        func.max(GlobalStateORM.updated_at).label("updated_at"),
+    )
+
+
+def _slot_upsert(slot: int, delta: int):
+    # Upsert into the chosen slot; creates the row on first use
+    stmt = insert(GlobalStateORM).values(id=slot, global_clicks=delta, updated_at=utc_now())
+    return stmt.on_conflict_do_update(
+        index_elements=[GlobalStateORM.id],
+        set_={
+            "global_clicks": GlobalStateORM.global_clicks + stmt.excluded.global_clicks,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(
+        GlobalStateORM.global_clicks,
+        GlobalStateORM.updated_at,
+    )
+
+
+def _other_slots_stmt(slot: int):
+    return (
+        select(func.coalesce(func.sum(GlobalStateORM.global_clicks), 0))
+        .where(GlobalStateORM.id != slot)
+    )
+
+
+def _pick_slot(shards: int) -> int:
+    if shards == 1:
+        return 1
+    return random.randint(1, shards)
+
+
 class PostgresGlobalStateRepository:
-    """PostgreSQL global state storage"""
+    """
+    PostgreSQL global state storage.
+
+    The global count is spread over `shards` slot rows (id=1..shards) so that
+    concurrent increments do not serialize on a single row lock. Each
+    increment lands on one random slot; reads return the sum of all rows.
+    """
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, shards: int = 1):
         self.session = session
+        self.shards = max(1, shards)
 
     def get_state(self) -> GlobalState:
-        model = self.session.get(GlobalStateORM, 1)
-        if not model:
+        row = self.session.execute(_state_stmt()).one()
+        if not row.slots:
             model = GlobalStateORM(id=1, global_clicks=0, updated_at=utc_now())
             self.session.add(model)
             self.session.flush()
-        return self._model_to_domain(model)
+            return self._model_to_domain(model)
 
-    def increment_clicks(self, delta: int) -> GlobalState:
-        # Ensure the singleton row exists
-        self.session.execute(
-            insert(GlobalStateORM)
-            .values(id=1, global_clicks=0, updated_at=utc_now())
-            .on_conflict_do_nothing(index_elements=[GlobalStateORM.id])
+        return GlobalState(
+            global_clicks=int(row.global_clicks),
+            updated_at=row.updated_at,
+            schema_version=1,
         )
 
-        stmt = (
-            update(GlobalStateORM)
-            .where(GlobalStateORM.id == 1)
-            .values(
-                global_clicks=GlobalStateORM.global_clicks + delta,
-                updated_at=utc_now(),
-            )
-            .returning(
-                GlobalStateORM.global_clicks,
-                GlobalStateORM.updated_at,
-            )
-        )
-        result = self.session.execute(stmt).one()
+    def increment_clicks(self, delta: int) -> GlobalState:
+        slot = _pick_slot(self.shards)
+        result = self.session.execute(_slot_upsert(slot, delta)).one()
+
+        global_clicks = result.global_clicks
+        if self.shards > 1:
+            global_clicks += self.session.execute(_other_slots_stmt(slot)).scalar_one()
 
         return GlobalState(
-            global_clicks=result.global_clicks,
+            global_clicks=int(global_clicks),
             updated_at=result.updated_at,
             schema_version=1,
         )
@@ -54,4 +92,44 @@ class PostgresGlobalStateRepository:
             global_clicks=model.global_clicks,
             updated_at=model.updated_at,
             schema_version=1,
-        )
\ No newline at end of file
+        )
+
+
+class AsyncPostgresGlobalStateRepository:
+    """PostgreSQL global state storage on an asyncio session (sharded as above)"""
+
+    def __init__(self, session: AsyncSession, shards: int = 1):
+        self.session = session
+        self.shards = max(1, shards)
+
+    async def get_state(self) -> GlobalState:
+        row = (await self.session.execute(_state_stmt())).one()
+        if not row.slots:
+            model = GlobalStateORM(id=1, global_clicks=0, updated_at=utc_now())
+            self.session.add(model)
+            await self.session.flush()
+            return GlobalState(
+                global_clicks=model.global_clicks,
+                updated_at=model.updated_at,
+                schema_version=1,
+            )
+
+        return GlobalState(
+            global_clicks=int(row.global_clicks),
+            updated_at=row.updated_at,
+            schema_version=1,
+        )
+
+    async def increment_clicks(self, delta: int) -> GlobalState:
+        slot = _pick_slot(self.shards)
+        result = (await self.session.execute(_slot_upsert(slot, delta))).one()
+
+        global_clicks = result.global_clicks
+        if self.shards > 1:
+            global_clicks += (await self.session.execute(_other_slots_stmt(slot))).scalar_one()
+
+        return GlobalState(
+            global_clicks=int(global_clicks),
+            updated_at=result.updated_at,
+            schema_version=1,
+        )
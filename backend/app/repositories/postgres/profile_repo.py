@@ -1,136 +1,229 @@
 """PostgreSQL profile repository implementation"""
-from typing import Optional
-from sqlalchemy import update
+from typing import Iterable, Optional
+from sqlalchemy import case, func, select, update
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import ProfileORM, UnlockedCosmeticORM, utc_now
+from app.models import ProfileORM, utc_now
+from app.domain import cosmetics
 from app.domain.models import Profile
 
+# Columns returned by profile SELECT and INSERT/UPDATE ... RETURNING statements
+_RETURNING = (
+    ProfileORM.device_id,
+    ProfileORM.my_clicks,
+    ProfileORM.selected_cosmetic,
+    ProfileORM.created_at,
+    ProfileORM.updated_at,
+    ProfileORM.unlocked_mask,
+)
+
+
+def _load_stmt(device_ids: Iterable[str]):
+    return select(*_RETURNING).where(ProfileORM.device_id.in_(list(device_ids)))
+
+
+def _create_stmt(profile: Profile):
+    now = utc_now()
+    return (
+        insert(ProfileORM)
+        .values(
+            device_id=profile.device_id,
+            my_clicks=profile.my_clicks,
+            selected_cosmetic=profile.selected_cosmetic or "default",
+            unlocked_mask=profile.unlocked_mask | cosmetics.DEFAULT_MASK,
+            created_at=now,
+            updated_at=now,
+        )
+        .returning(*_RETURNING)
+    )
+
+
+def _update_stmt(profile: Profile):
+    return (
+        update(ProfileORM)
+        .where(ProfileORM.device_id == profile.device_id)
+        .values(
+            my_clicks=profile.my_clicks,
+            selected_cosmetic=profile.selected_cosmetic,
+            # Unlocks only accumulate: a stale copy can't revoke a concurrent unlock
+            unlocked_mask=ProfileORM.unlocked_mask.op("|")(profile.unlocked_mask),
+            updated_at=profile.updated_at,
+        )
+        .returning(*_RETURNING)
+    )
+
+
+def _unlock_stmt(device_id: str, cosmetic_id: str):
+    bit = cosmetics.bit_of(cosmetic_id)
+    if bit is None:
+        raise ValueError(f"Unknown cosmetic {cosmetic_id}")
+    already = ProfileORM.unlocked_mask.op("&")(bit) != 0
+    return (
+        update(ProfileORM)
+        .where(ProfileORM.device_id == device_id)
+        .values(
+            unlocked_mask=ProfileORM.unlocked_mask.op("|")(bit),
+            updated_at=case((already, ProfileORM.updated_at), else_=utc_now()),
+        )
+        .returning(*_RETURNING)
+    )
+
+
+def _select_stmt(device_id: str, cosmetic_id: str):
+    # Only touches selected_cosmetic, and only if the cosmetic's bit is set:
+    # no row back means the profile is missing or the cosmetic is locked
+    bit = cosmetics.bit_of(cosmetic_id) or 0
+    return (
+        update(ProfileORM)
+        .where(ProfileORM.device_id == device_id, ProfileORM.unlocked_mask.op("&")(bit) != 0)
+        .values(selected_cosmetic=cosmetic_id, updated_at=utc_now())
+        .returning(*_RETURNING)
+    )
+
+
+def _increment_stmt(device_id: str, amount: int):
+    # Upsert-increment: creates the profile on first click, in one statement
+    now = utc_now()
+    stmt = insert(ProfileORM).values(
+        device_id=device_id,
+        my_clicks=amount,
+        selected_cosmetic="default",
+        created_at=now,
+        updated_at=now,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[ProfileORM.device_id],
+        set_={
+            "my_clicks": ProfileORM.my_clicks + stmt.excluded.my_clicks,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(*_RETURNING)
+
+
+def _write_back_stmt(profiles: Iterable[Profile]):
+    # Multi-row upsert of absolute values (ids must be unique within a batch).
+    # Counters and unlocks never move backwards, even if a stale copy lands late.
+    stmt = insert(ProfileORM).values([
+        {
+            "device_id": profile.device_id,
+            "my_clicks": profile.my_clicks,
+            "selected_cosmetic": profile.selected_cosmetic or "default",
+            "unlocked_mask": profile.unlocked_mask | cosmetics.DEFAULT_MASK,
+            "created_at": profile.created_at,
+            "updated_at": profile.updated_at,
+        }
+        for profile in profiles
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[ProfileORM.device_id],
+        set_={
+            "my_clicks": func.greatest(ProfileORM.my_clicks, stmt.excluded.my_clicks),
+            "selected_cosmetic": stmt.excluded.selected_cosmetic,
+            "unlocked_mask": ProfileORM.unlocked_mask.op("|")(stmt.excluded.unlocked_mask),
+            "updated_at": func.greatest(ProfileORM.updated_at, stmt.excluded.updated_at),
+        },
+    )
+
+
+def _to_domain(row) -> Profile:
+    return Profile(
+        device_id=row.device_id,
+        my_clicks=row.my_clicks,
+        unlocked_cosmetics=cosmetics.ids_of(row.unlocked_mask),
+        selected_cosmetic=row.selected_cosmetic or "default",
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        schema_version=1,
+        unlocked_mask=row.unlocked_mask,
+    )
+
 
 class PostgresProfileRepository:
-    """PostgreSQL profile storage"""
+    """
+    PostgreSQL profile storage.
+
+    Every method is a single statement: unlocked cosmetics live in the
+    profile row as a bitmask, so no other table is read.
+    """
 
     def __init__(self, session: Session):
         self.session = session
 
     def get_by_device_id(self, device_id: str) -> Optional[Profile]:
-        model = self.session.get(ProfileORM, device_id)
-        if not model:
-            return None
-        return self._model_to_domain(model)
+        row = self.session.execute(_load_stmt([device_id])).one_or_none()
+        return _to_domain(row) if row else None
+
+    def get_many(self, device_ids: Iterable[str]) -> dict[str, Profile]:
+        """Load many profiles in one statement; missing ids are left out"""
+        device_ids = list(device_ids)
+        if not device_ids:
+            return {}
+        rows = self.session.execute(_load_stmt(device_ids))
+        return {row.device_id: _to_domain(row) for row in rows}
 
     def create(self, profile: Profile) -> Profile:
-        model = ProfileORM(
-            device_id=profile.device_id,
-            my_clicks=profile.my_clicks,
-            selected_cosmetic=profile.selected_cosmetic or "default",
-        )
-        self.session.add(model)
-        self.session.flush()
-        return self._model_to_domain(model)
+        return _to_domain(self.session.execute(_create_stmt(profile)).one())
 
     def update(self, profile: Profile) -> Profile:
-        current = self.session.get(ProfileORM, profile.device_id)
-        if not current:
+        row = self.session.execute(_update_stmt(profile)).one_or_none()
+        if row is None:
             raise ValueError(f"Profile {profile.device_id} not found")
-        stmt = (
-            update(ProfileORM)
-            .where(ProfileORM.device_id == profile.device_id)
-            .values(
-                my_clicks=profile.my_clicks,
-                selected_cosmetic=profile.selected_cosmetic,
-                updated_at=profile.updated_at,
-            )
-            .returning(
-                ProfileORM.device_id,
-                ProfileORM.my_clicks,
-                ProfileORM.selected_cosmetic,
-                ProfileORM.created_at,
-                ProfileORM.updated_at,
-            )
-        )
-        row = self.session.execute(stmt).one()
-        unlocked = (
-            self.session.query(UnlockedCosmeticORM.cosmetic_id)
-            .filter(UnlockedCosmeticORM.device_id == profile.device_id)
-            .all()
-        )
-        unlocked_ids = [u[0] for u in unlocked]
-
-        return Profile(
-            device_id=row.device_id,
-            my_clicks=row.my_clicks,
-            unlocked_cosmetics=unlocked_ids if unlocked_ids else ["default"],
-            selected_cosmetic=row.selected_cosmetic or "default",
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-            schema_version=1,
-        )
+        return _to_domain(row)
 
     def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
         """Atomically increment profile clicks, creating the profile if missing."""
-        # Ensure the profile row exists
-        self.session.execute(
-            insert(ProfileORM)
-            .values(
-                device_id=device_id,
-                my_clicks=0,
-                selected_cosmetic="default",
-                created_at=utc_now(),
-                updated_at=utc_now(),
-            )
-            .on_conflict_do_nothing(index_elements=[ProfileORM.device_id])
-        )
+        return _to_domain(self.session.execute(_increment_stmt(device_id, amount)).one())
 
-        stmt = (
-            update(ProfileORM)
-            .where(ProfileORM.device_id == device_id)
-            .values(
-                my_clicks=ProfileORM.my_clicks + amount,
-                updated_at=utc_now(),
-            )
-            .returning(
-                ProfileORM.device_id,
-                ProfileORM.my_clicks,
-                ProfileORM.selected_cosmetic,
-                ProfileORM.created_at,
-                ProfileORM.updated_at,
-            )
-        )
-        row = self.session.execute(stmt).one()
+    def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically set a cosmetic's unlock bit; None if the profile is missing."""
+        row = self.session.execute(_unlock_stmt(device_id, cosmetic_id)).one_or_none()
+        return _to_domain(row) if row else None
 
-        unlocked = (
-            self.session.query(UnlockedCosmeticORM.cosmetic_id)
-            .filter(UnlockedCosmeticORM.device_id == device_id)
-            .all()
-        )
-        unlocked_ids = [u[0] for u in unlocked]
-
-        return Profile(
-            device_id=row.device_id,
-            my_clicks=row.my_clicks,
-            unlocked_cosmetics=unlocked_ids if unlocked_ids else ["default"],
-            selected_cosmetic=row.selected_cosmetic or "default",
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-            schema_version=1,
-        )
+    def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically select an unlocked cosmetic; None if the profile is missing."""
+        row = self.session.execute(_select_stmt(device_id, cosmetic_id)).one_or_none()
+        return _to_domain(row) if row else self.get_by_device_id(device_id)
 
-    def _model_to_domain(self, model: ProfileORM) -> Profile:
-        unlocked_models = (
-            self.session.query(UnlockedCosmeticORM)
-            .filter(UnlockedCosmeticORM.device_id == model.device_id)
-            .all()
-        )
-        unlocked_ids = [uc.cosmetic_id for uc in unlocked_models]
-
-        return Profile(
-            device_id=model.device_id,
-            my_clicks=model.my_clicks,
-            unlocked_cosmetics=unlocked_ids if unlocked_ids else ["default"],
-            selected_cosmetic=model.selected_cosmetic or "default",
-            created_at=model.created_at,
-            updated_at=model.updated_at,
-            schema_version=1,
-        )
\ No newline at end of file
+
+class AsyncPostgresProfileRepository:
+    """PostgreSQL profile storage on an asyncio session (same statements as above)"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        row = (await self.session.execute(_load_stmt([device_id]))).one_or_none()
+        return _to_domain(row) if row else None
+
+    async def get_many(self, device_ids: Iterable[str]) -> dict[str, Profile]:
+        device_ids = list(device_ids)
+        if not device_ids:
+            return {}
+        rows = await self.session.execute(_load_stmt(device_ids))
+        return {row.device_id: _to_domain(row) for row in rows}
+
+    async def create(self, profile: Profile) -> Profile:
+        return _to_domain((await self.session.execute(_create_stmt(profile))).one())
+
+    async def update(self, profile: Profile) -> Profile:
+        row = (await self.session.execute(_update_stmt(profile))).one_or_none()
+        if row is None:
+            raise ValueError(f"Profile {profile.device_id} not found")
+        return _to_domain(row)
+
+    async def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        """Atomically increment profile clicks, creating the profile if missing."""
+        row = (await self.session.execute(_increment_stmt(device_id, amount))).one()
+        return _to_domain(row)
+
+    async def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically set a cosmetic's unlock bit; None if the profile is missing."""
+        row = (await self.session.execute(_unlock_stmt(device_id, cosmetic_id))).one_or_none()
+        return _to_domain(row) if row else None
+
+    async def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Atomically select an unlocked cosmetic; None if the profile is missing."""
+        row = (await self.session.execute(_select_stmt(device_id, cosmetic_id))).one_or_none()
+        return _to_domain(row) if row else await self.get_by_device_id(device_id)
@@ -0,0 +1 @@
+"""Read replica routing repository package."""
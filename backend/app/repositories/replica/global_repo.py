@@ -0,0 +1,69 @@
+"""Global state reads from the read replica, increments on the primary"""
+from typing import Optional
+
+from app.domain.models import GlobalState
+from app.repositories.interfaces import AsyncGlobalStateRepository, GlobalStateRepository
+from app.repositories.replica.monitor import READ_ERRORS, REPLICA_READS, ReplicaMonitor
+
+
+class ReplicaGlobalStateRepository:
+    """
+    GlobalStateRepository for read-only endpoints: get_state() reads the
+    replica, or the primary when that fails (including before the counter
+    row exists: the replica cannot insert it). `staleness_ms()` is the
+    replication lag when the replica answered.
+    """
+
+    def __init__(
+        self, primary: GlobalStateRepository, replica: GlobalStateRepository, monitor: ReplicaMonitor
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+        self._from_replica = False
+
+    def get_state(self) -> GlobalState:
+        try:
+            state = self.replica.get_state()
+        except READ_ERRORS as error:
+            self.monitor.read_failed(error)
+            self._from_replica = False
+            return self.primary.get_state()
+        REPLICA_READS.inc()
+        self._from_replica = True
+        return state
+
+    def increment_clicks(self, delta: int) -> GlobalState:
+        return self.primary.increment_clicks(delta)
+
+    def staleness_ms(self) -> Optional[int]:
+        return self.monitor.lag_ms() if self._from_replica else None
+
+
+class AsyncReplicaGlobalStateRepository:
+    """AsyncGlobalStateRepository twin of ReplicaGlobalStateRepository"""
+
+    def __init__(
+        self, primary: AsyncGlobalStateRepository, replica: AsyncGlobalStateRepository, monitor: ReplicaMonitor
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+        self._from_replica = False
+
+    async def get_state(self) -> GlobalState:
+        try:
+            state = await self.replica.get_state()
+        except READ_ERRORS as error:
+            self.monitor.read_failed(error)
+            self._from_replica = False
+            return await self.primary.get_state()
+        REPLICA_READS.inc()
+        self._from_replica = True
+        return state
+
+    async def increment_clicks(self, delta: int) -> GlobalState:
+        return await self.primary.increment_clicks(delta)
+
+    def staleness_ms(self) -> Optional[int]:
+        return self.monitor.lag_ms() if self._from_replica else None
@@ -0,0 +1,107 @@
+"""Read replica health: reachable and within the tolerated replication lag"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LAG = REGISTRY.gauge("db_replica_lag_seconds", "Replication lag at the last successful check")
+USABLE = REGISTRY.gauge("db_replica_usable", "1 while read-only endpoints may read from the replica")
+REPLICA_READS = REGISTRY.counter("db_replica_reads_total", "Reads served by the replica")
+FALLBACKS = REGISTRY.counter(
+    "db_replica_fallbacks_total",
+    "Reads sent to the primary instead (lagging, unavailable, error, miss)",
+    labelnames=("reason",),
+)
+
+# Replica reads that fail with these are retried on the primary. asyncpg
+# connect failures (refused, unreachable, timed out) are not wrapped by SQLAlchemy.
+READ_ERRORS = (SQLAlchemyError, OSError, asyncio.TimeoutError)
+
+
+class ReplicaMonitor:
+    """
+    Decides whether read-only endpoints may use the replica.
+
+    A background thread measures replication lag every `check_interval_ms`.
+    The replica is used while the last check succeeded recently and found
+    at most `max_lag_ms` of lag; a failed read takes it out of rotation
+    until the next good check.
+    """
+
+    def __init__(
+        self,
+        measure_lag: Callable[[], float],
+        max_lag_ms: int = 1000,
+        check_interval_ms: int = 1000,
+    ):
+        self._measure_lag = measure_lag
+        self._max_lag = max_lag_ms / 1000
+        self._interval = check_interval_ms / 1000
+        self._lag: float | None = None
+        self._checked_at: float | None = None
+        self._failed = False
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def state(self) -> str:
+        """"ok", "lagging" or "unavailable" (down, failing, or not checked lately)"""
+        checked_at = self._checked_at
+        if self._failed or checked_at is None:
+            return "unavailable"
+        # A stalled checker must not keep an old verdict alive
+        if time.monotonic() - checked_at > 3 * self._interval:
+            return "unavailable"
+        return "ok" if self._lag <= self._max_lag else "lagging"
+
+    def usable(self) -> bool:
+        return self.state() == "ok"
+
+    def lag_ms(self) -> Optional[int]:
+        """Lag at the last successful check in ms (None before the first)"""
+        return None if self._lag is None else int(self._lag * 1000)
+
+    def check(self) -> None:
+        """Measure the lag now"""
+        try:
+            lag = self._measure_lag()
+        except Exception:
+            logger.warning("Replica lag check failed", exc_info=True)
+            self._failed = True
+        else:
+            self._lag, self._checked_at, self._failed = lag, time.monotonic(), False
+            LAG.set(lag)
+        USABLE.set(1 if self.usable() else 0)
+
+    def read_failed(self, error: Exception) -> None:
+        """A read on the replica raised: serve from the primary until the next good check"""
+        logger.warning("Replica read failed, falling back to the primary: %s", error)
+        self._failed = True
+        USABLE.set(0)
+        FALLBACKS.labels("error").inc()
+
+    def start(self) -> None:
+        """Check once and start the background checker"""
+        if self._thread is not None:
+            return
+        self.check()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background checker"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._interval):
+            self.check()
@@ -0,0 +1,66 @@
+"""Profile reads from the read replica, writes to the primary"""
+from typing import Optional
+
+from app.domain.models import Profile
+from app.repositories.interfaces import AsyncProfileRepository, ProfileRepository
+from app.repositories.replica.monitor import FALLBACKS, READ_ERRORS, REPLICA_READS, ReplicaMonitor
+
+
+class ReplicaProfileRepository:
+    """
+    ProfileRepository for read-only endpoints. Lookups go to the replica;
+    a profile it does not have (yet: it may have just been created) or a
+    failed read is looked up on the primary. Writes go to the primary.
+    """
+
+    def __init__(self, primary: ProfileRepository, replica: ProfileRepository, monitor: ReplicaMonitor):
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        try:
+            profile = self.replica.get_by_device_id(device_id)
+        except READ_ERRORS as error:
+            self.monitor.read_failed(error)
+            return self.primary.get_by_device_id(device_id)
+        if profile is None:
+            FALLBACKS.labels("miss").inc()
+            return self.primary.get_by_device_id(device_id)
+        REPLICA_READS.inc()
+        return profile
+
+    def create(self, profile: Profile) -> Profile:
+        return self.primary.create(profile)
+
+    def update(self, profile: Profile) -> Profile:
+        return self.primary.update(profile)
+
+
+class AsyncReplicaProfileRepository:
+    """AsyncProfileRepository twin of ReplicaProfileRepository"""
+
+    def __init__(
+        self, primary: AsyncProfileRepository, replica: AsyncProfileRepository, monitor: ReplicaMonitor
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+
+    async def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        try:
+            profile = await self.replica.get_by_device_id(device_id)
+        except READ_ERRORS as error:
+            self.monitor.read_failed(error)
+            return await self.primary.get_by_device_id(device_id)
+        if profile is None:
+            FALLBACKS.labels("miss").inc()
+            return await self.primary.get_by_device_id(device_id)
+        REPLICA_READS.inc()
+        return profile
+
+    async def create(self, profile: Profile) -> Profile:
+        return await self.primary.create(profile)
+
+    async def update(self, profile: Profile) -> Profile:
+        return await self.primary.update(profile)
@@ -0,0 +1 @@
+"""Tiered (memory + Postgres) repository package."""
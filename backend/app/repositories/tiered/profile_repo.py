@@ -0,0 +1,297 @@
+"""Tiered profile repository: hot profiles in memory, cold ones in Postgres"""
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.domain import cosmetics
+from app.domain.models import Profile, utc_now
+from app.metrics import REGISTRY
+from app.repositories.postgres.profile_repo import PostgresProfileRepository, _write_back_stmt
+
+logger = logging.getLogger(__name__)
+
+HITS = REGISTRY.counter("profile_tier_hits_total", "Profile accesses served from the hot set")
+MISSES = REGISTRY.counter("profile_tier_misses_total", "Profile accesses loaded from Postgres")
+EVICTIONS = REGISTRY.counter(
+    "profile_tier_evictions_total", "Profiles moved out of the hot set to stay within its bound"
+)
+WRITTEN_BACK = REGISTRY.counter(
+    "profile_tier_written_back_total", "Dirty profiles written back to Postgres"
+)
+WRITE_BACK_ERRORS = REGISTRY.counter(
+    "profile_tier_write_back_errors_total", "Write-backs that failed and were re-queued"
+)
+HOT = REGISTRY.gauge("profile_tier_hot_entries", "Profiles in the hot set")
+DIRTY = REGISTRY.gauge("profile_tier_dirty_entries", "Profiles with changes not yet in Postgres")
+
+_NOT_LOADED = object()
+
+
+def _copy(profile: Profile) -> Profile:
+    # Callers mutate profiles (e.g. unlocked_cosmetics.append): never share them
+    return replace(profile, unlocked_cosmetics=list(profile.unlocked_cosmetics))
+
+
+class TieredProfileRepository:
+    """
+    Process-wide profile store with a bounded hot set in front of Postgres.
+
+    Reads and writes touch only the hot set (LRU on last access) once a
+    profile is resident; a miss loads it from Postgres. Writes mark the
+    profile dirty, and a background thread writes dirty profiles back every
+    `flush_interval_ms` in multi-row upserts of `flush_batch_size`. A dirty
+    profile evicted from the hot set is parked until its write-back commits,
+    so a reload never reads an older row.
+
+    The hot set owns the profiles it holds: this assumes one writer per
+    device (a single replica, or sticky routing). Up to one flush interval
+    of writes is lost if the process dies.
+
+    Clicks do not pass through the tier: in postgres mode /clicks/increment
+    writes users/global_counter through the ClickWriter, not profiles.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_entries: int = 100_000,
+        flush_interval_ms: int = 500,
+        flush_batch_size: int = 1000,
+    ):
+        self._session_factory = session_factory
+        self.max_entries = max_entries
+        self._flush_interval = flush_interval_ms / 1000
+        self._flush_batch_size = flush_batch_size
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._hot: OrderedDict[str, Profile] = OrderedDict()
+        self._dirty: set[str] = set()
+        self._flushing: set[str] = set()
+        # Evicted while dirty or being flushed; dropped once durable
+        self._parked: dict[str, Profile] = {}
+
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._hot)
+
+    def is_resident(self, device_id: str) -> bool:
+        """True if the profile can be served without a database read"""
+        return device_id in self._hot or device_id in self._parked
+
+    def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        return self._access(device_id, _copy, write=False)
+
+    def create(self, profile: Profile) -> Profile:
+        now = utc_now()
+        created = _copy(profile)
+        created.selected_cosmetic = created.selected_cosmetic or "default"
+        created.created_at = created.updated_at = now
+        with self._lock:
+            self._parked.pop(profile.device_id, None)
+            self._hot[profile.device_id] = created
+            self._hot.move_to_end(profile.device_id)
+            self._mark_dirty(profile.device_id)
+            self._evict()
+            return _copy(created)
+
+    def update(self, profile: Profile) -> Profile:
+        def apply(current: Profile) -> Profile:
+            current.my_clicks = profile.my_clicks
+            current.selected_cosmetic = profile.selected_cosmetic
+            current.unlocked_mask |= profile.unlocked_mask
+            current.unlocked_cosmetics = cosmetics.ids_of(current.unlocked_mask)
+            current.updated_at = utc_now()
+            return _copy(current)
+
+        updated = self._access(profile.device_id, apply, write=True)
+        if updated is None:
+            raise ValueError(f"Profile {profile.device_id} not found")
+        return updated
+
+    def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        """Increment profile clicks in the hot set, creating the profile if missing."""
+        def apply(current: Profile) -> Profile:
+            current.my_clicks += amount
+            current.updated_at = utc_now()
+            return _copy(current)
+
+        return self._access(device_id, apply, write=True, create=True)
+
+    def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Set a cosmetic's unlock bit in the hot set; None if the profile is missing."""
+        bit = cosmetics.bit_of(cosmetic_id)
+        if bit is None:
+            raise ValueError(f"Unknown cosmetic {cosmetic_id}")
+
+        def apply(current: Profile) -> Profile:
+            if not current.unlocked_mask & bit:
+                current.unlocked_mask |= bit
+                current.unlocked_cosmetics = cosmetics.ids_of(current.unlocked_mask)
+                current.updated_at = utc_now()
+            return _copy(current)
+
+        return self._access(device_id, apply, write=True)
+
+    def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        """Select a cosmetic in the hot set if it is unlocked; None if the profile is missing."""
+        def apply(current: Profile) -> Profile:
+            if cosmetics.is_unlocked(current.unlocked_mask, cosmetic_id):
+                current.selected_cosmetic = cosmetic_id
+                current.updated_at = utc_now()
+            return _copy(current)
+
+        return self._access(device_id, apply, write=True)
+
+    def flush(self) -> int:
+        """Write dirty profiles back to Postgres; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                device_ids = list(self._dirty)
+                self._dirty.clear()
+                self._flushing.update(device_ids)
+                rows = [
+                    _copy(self._hot.get(device_id) or self._parked[device_id])
+                    for device_id in device_ids
+                ]
+                DIRTY.set(0)
+            if not rows:
+                return 0
+            try:
+                with self._session_factory() as session:
+                    for start in range(0, len(rows), self._flush_batch_size):
+                        session.execute(_write_back_stmt(rows[start:start + self._flush_batch_size]))
+                    session.commit()
+            except Exception:
+                WRITE_BACK_ERRORS.inc()
+                with self._lock:
+                    self._dirty.update(device_ids)
+                    self._flushing.clear()
+                    DIRTY.set(len(self._dirty))
+                raise
+            with self._lock:
+                self._flushing.clear()
+                for device_id in device_ids:
+                    if device_id not in self._dirty:
+                        self._parked.pop(device_id, None)
+            WRITTEN_BACK.inc(len(rows))
+            return len(rows)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="profile-tier-writeback", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the write-back thread and write back everything still dirty"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Profile write-back failed; will retry")
+
+    def _access(
+        self,
+        device_id: str,
+        apply: Callable[[Profile], Optional[Profile]],
+        write: bool,
+        create: bool = False,
+    ) -> Optional[Profile]:
+        loaded = _NOT_LOADED
+        while True:
+            with self._lock:
+                profile = self._resident(device_id)
+                if profile is not None:
+                    HITS.inc()
+                elif loaded is not _NOT_LOADED:
+                    profile = loaded
+                    if profile is None and create:
+                        now = utc_now()
+                        profile = Profile(device_id=device_id, created_at=now, updated_at=now)
+                    if profile is not None:
+                        self._hot[device_id] = profile
+                if profile is not None or loaded is not _NOT_LOADED:
+                    if profile is None:
+                        return None
+                    result = apply(profile)
+                    if write:
+                        self._mark_dirty(device_id)
+                    self._evict()
+                    return result
+            # Not resident: read Postgres without holding the lock, then retry
+            MISSES.inc()
+            with self._session_factory() as session:
+                loaded = PostgresProfileRepository(session).get_by_device_id(device_id)
+
+    def _resident(self, device_id: str) -> Optional[Profile]:
+        profile = self._hot.get(device_id)
+        if profile is not None:
+            self._hot.move_to_end(device_id)
+            return profile
+        profile = self._parked.pop(device_id, None)
+        if profile is not None:
+            self._hot[device_id] = profile
+        return profile
+
+    def _mark_dirty(self, device_id: str) -> None:
+        self._dirty.add(device_id)
+        DIRTY.set(len(self._dirty))
+
+    def _evict(self) -> None:
+        while len(self._hot) > self.max_entries:
+            device_id, profile = self._hot.popitem(last=False)
+            if device_id in self._dirty or device_id in self._flushing:
+                self._parked[device_id] = profile
+            EVICTIONS.inc()
+        HOT.set(len(self._hot))
+
+
+class AsyncTieredProfileRepository:
+    """
+    Async view of a TieredProfileRepository.
+
+    Resident profiles are served inline (a dict lookup under a lock); only
+    misses, which read Postgres, run in a worker thread.
+    """
+
+    def __init__(self, tier: TieredProfileRepository):
+        self.tier = tier
+
+    async def get_by_device_id(self, device_id: str) -> Optional[Profile]:
+        return await self._call(device_id, self.tier.get_by_device_id, device_id)
+
+    async def create(self, profile: Profile) -> Profile:
+        return self.tier.create(profile)
+
+    async def update(self, profile: Profile) -> Profile:
+        return await self._call(profile.device_id, self.tier.update, profile)
+
+    async def increment_clicks(self, device_id: str, amount: int = 1) -> Profile:
+        return await self._call(device_id, self.tier.increment_clicks, device_id, amount)
+
+    async def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        return await self._call(device_id, self.tier.unlock_cosmetic, device_id, cosmetic_id)
+
+    async def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Optional[Profile]:
+        return await self._call(device_id, self.tier.select_cosmetic, device_id, cosmetic_id)
+
+    async def _call(self, device_id: str, method, *args):
+        if self.tier.is_resident(device_id):
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
@@ -34,4 +34,27 @@ class ClickIncrementResponse(BaseModel):
     selected_cosmetic: str
     unlocked_cosmetics: list[str]
     occurred_at: datetime
+    schema_version: int = Field(default=1)
+
+
+class ClickBatchRequest(BaseModel):
+    """Request to increment clicks for many users at once"""
+    clicks: list[ClickIncrementRequest] = Field(min_length=1)
+    include_results: bool = True  # False returns only the summary
+
+
+class ClickBatchResult(BaseModel):
+    """Per-user outcome of a batch increment"""
+    device_id: str
+    my_clicks: int
+
+
+class ClickBatchResponse(BaseModel):
+    """Response after applying a batch of clicks"""
+    applied: int
+    users: int
+    total_delta: int
+    global_clicks: int
+    results: list[ClickBatchResult] | None = None
+    occurred_at: datetime
     schema_version: int = Field(default=1)
\ No newline at end of file
@@ -8,6 +8,7 @@ class GlobalStateResponse(BaseModel):
     global_clicks: int
     updated_at: datetime
     schema_version: int = Field(default=1)
+    max_staleness_ms: int | None = None  # Set when served from the in-process cache
     
     class Config:
         from_attributes = True
\ No newline at end of file
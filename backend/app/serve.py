@@ -0,0 +1,108 @@
+"""
+Production server entry point.
+
+    python -m app.serve
+
+Runs uvicorn with workers sized from the container's CPU quota, uvloop and
+httptools when installed, and keep-alive / backlog / shutdown settings
+from app.config.Settings (SERVER_* variables).
+"""
+import importlib.util
+import logging
+import math
+import os
+from pathlib import Path
+
+import uvicorn
+
+from app.config import settings
+from app.deps import profile_tiering_enabled
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> float | None:
+    """CPUs allowed by the cgroup CPU quota (v2 or v1); None when unlimited"""
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]  # v2: "50000 100000"
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())  # v1: -1 = unlimited
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> float:
+    """CPUs this process may actually use: the affinity mask, capped by the cgroup quota"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    return min(cpus, limit) if limit else cpus
+
+
+def worker_count(cpus: float) -> int:
+    """SERVER_WORKERS if set, else one worker per whole CPU (at least one)"""
+    if settings.server_workers > 0:
+        return settings.server_workers
+    workers = max(1, math.floor(cpus))
+    if workers > 1 and profile_tiering_enabled():
+        # Each worker would keep its own hot copy of a device and write it back
+        logger.warning(
+            "PROFILE_TIERING=true: running 1 worker instead of %d "
+            "(the hot profile set needs a single writer per device)",
+            workers,
+        )
+        return 1
+    if workers > 1 and not _inmemory_state_is_shared():
+        # Each worker would have its own profiles and global count
+        logger.warning(
+            "In-memory mode without shared stores: running 1 worker instead of %d "
+            "(set INMEMORY_PROFILE_SHARED=true and INMEMORY_GLOBAL_COUNTER=shared)",
+            workers,
+        )
+        return 1
+    return workers
+
+
+def _inmemory_state_is_shared() -> bool:
+    if settings.repository_mode != "inmemory":
+        return True
+    return settings.inmemory_profile_shared and settings.inmemory_global_counter == "shared"
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    workers = worker_count(available_cpus())
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+    logger.info("Starting %d worker(s), loop=%s, http=%s", workers, loop, http)
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keep_alive_s,
+        # SIGTERM: stop accepting, finish in-flight requests, then run the
+        # lifespan shutdown (flushes buffered clicks and write-backs)
+        timeout_graceful_shutdown=settings.server_graceful_shutdown_s,
+        limit_concurrency=settings.server_limit_concurrency or None,
+        access_log=settings.server_access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()
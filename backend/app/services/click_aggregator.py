@@ -0,0 +1,291 @@
+"""Write-behind click aggregator - buffers clicks and flushes them in batches"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.metrics import REGISTRY
+from app.repositories.interfaces import ClickBufferFull
+from app.repositories.postgres.click_repo import PostgresClickRepository
+
+logger = logging.getLogger(__name__)
+
+FLUSH_LAG = REGISTRY.histogram(
+    "click_flush_lag_seconds",
+    "Age of the oldest buffered click when its batch was flushed",
+)
+FLUSH_DURATION = REGISTRY.histogram(
+    "click_flush_duration_seconds",
+    "Time spent writing one write-behind batch to the database",
+)
+FLUSH_USERS = REGISTRY.histogram(
+    "click_flush_batch_users",
+    "Distinct users per write-behind flush",
+    buckets=(1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
+FLUSH_ERRORS = REGISTRY.counter(
+    "click_flush_errors_total",
+    "Write-behind flushes that failed and were re-queued",
+)
+PENDING_USERS = REGISTRY.gauge(
+    "click_buffer_pending_users",
+    "Users with buffered, not yet durable clicks",
+)
+
+
+class WriteBehindClickAggregator:
+    """
+    Buffers per-user click deltas in memory and writes them to Postgres in
+    batches (one multi-row upsert plus one global counter update).
+
+    Responses get projected counts: the last durable total plus any deltas
+    that are buffered or being flushed. A background thread flushes every
+    `flush_interval_ms`, or sooner once `flush_max_entries` users are
+    pending. The buffer is bounded by `max_pending_users`; when full, the
+    caller flushes synchronously before its click is accepted.
+
+    Durable per-user totals are remembered for up to `max_known_users`
+    users; a user's first click after that costs one SELECT (one per
+    batch for increment_many).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        shards: int = 1,
+        flush_interval_ms: int = 250,
+        flush_max_entries: int = 1000,
+        max_pending_users: int = 100_000,
+        max_known_users: int = 100_000,
+    ):
+        self._session_factory = session_factory
+        self._shards = shards
+        self._flush_interval = flush_interval_ms / 1000
+        self._flush_max_entries = flush_max_entries
+        self._max_pending_users = max_pending_users
+        self._max_known_users = max_known_users
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[str, int] = {}
+        self._pending_since: float | None = None
+        self._inflight: dict[str, int] = {}
+        # Sums of the two dicts above, kept so a click never walks them
+        self._pending_total = 0
+        self._inflight_total = 0
+        # Last durable totals seen by this process (bounded, LRU order)
+        self._known: OrderedDict[str, int] = OrderedDict()
+        self._known_global: int | None = None
+        # Bumped when a flush takes a batch and when it finishes: a durable
+        # read that saw it change may or may not include the in-flight batch
+        self._flush_generation = 0
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the background flush thread"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="click-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write out everything still buffered"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        """Buffer a click; returns projected (my_clicks, global_clicks)"""
+        user_totals, global_clicks = self.increment_many({user_id: delta})
+        return user_totals[user_id], global_clicks
+
+    def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        """Buffer many users' clicks at once; returns projected ({user_id: my_clicks}, global_clicks)"""
+        bases = self._known_totals(deltas)
+        global_base = self._known_global_total()
+
+        with self._lock:
+            full = not self._fits(deltas)
+            if not full:
+                self._buffer_all(deltas)
+
+        if full:
+            # Backpressure: drain the buffer in the caller before accepting more
+            self.flush()
+            with self._lock:
+                if not self._fits(deltas):
+                    raise ClickBufferFull("click buffer is full")
+                self._buffer_all(deltas)
+
+        with self._lock:
+            user_totals = {
+                user_id: self._known.get(user_id, bases[user_id])
+                + self._inflight.get(user_id, 0)
+                + self._pending.get(user_id, 0)
+                for user_id in deltas
+            }
+            global_clicks = (
+                (self._known_global if self._known_global is not None else global_base)
+                + self._inflight_total
+                + self._pending_total
+            )
+        return user_totals, global_clicks
+
+    def flush(self) -> int:
+        """Write buffered deltas to the database; returns users flushed"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                since = self._pending_since
+                self._pending = {}
+                self._pending_since = None
+                self._inflight = batch
+                self._inflight_total, self._pending_total = self._pending_total, 0
+                self._flush_generation += 1
+                PENDING_USERS.set(0)
+
+            started = time.monotonic()
+            try:
+                with self._session_factory() as session:
+                    repo = PostgresClickRepository(session, shards=self._shards)
+                    user_totals, global_total = repo.increment_many(batch)
+                    session.commit()
+            except Exception:
+                FLUSH_ERRORS.inc()
+                logger.exception("Write-behind flush of %d users failed; re-queued", len(batch))
+                with self._lock:
+                    for user_id, delta in self._inflight.items():
+                        self._pending[user_id] = self._pending.get(user_id, 0) + delta
+                    self._pending_since = since
+                    self._inflight = {}
+                    self._pending_total += self._inflight_total
+                    self._inflight_total = 0
+                    self._flush_generation += 1
+                    PENDING_USERS.set(len(self._pending))
+                raise
+
+            finished = time.monotonic()
+            FLUSH_DURATION.observe(finished - started)
+            FLUSH_USERS.observe(len(batch))
+            if since is not None:
+                FLUSH_LAG.observe(finished - since)
+
+            with self._lock:
+                self._inflight = {}
+                self._inflight_total = 0
+                self._flush_generation += 1
+                # Durable totals from this batch; deltas buffered meanwhile stay pending
+                for user_id, total in user_totals.items():
+                    self._remember(user_id, total)
+                self._known_global = global_total
+            return len(batch)
+
+    def _fits(self, deltas: dict[str, int]) -> bool:
+        new_users = sum(1 for user_id in deltas if user_id not in self._pending)
+        return not new_users or len(self._pending) + new_users <= self._max_pending_users
+
+    def _buffer_all(self, deltas: dict[str, int]) -> None:
+        for user_id, delta in deltas.items():
+            self._buffer(user_id, delta)
+
+    def _buffer(self, user_id: str, delta: int) -> None:
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending[user_id] = self._pending.get(user_id, 0) + delta
+        self._pending_total += delta
+        PENDING_USERS.set(len(self._pending))
+        if len(self._pending) >= self._flush_max_entries:
+            self._wake.set()
+
+    def _known_totals(self, user_ids) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        with self._lock:
+            for user_id in user_ids:
+                if user_id in self._known:
+                    self._known.move_to_end(user_id)
+                    totals[user_id] = self._known[user_id]
+            missing = [user_id for user_id in user_ids if user_id not in totals]
+            generation = self._flush_generation
+            clean = not any(user_id in self._inflight for user_id in missing)
+        if not missing:
+            return totals
+        if clean:
+            loaded = self._read_user_totals(missing)
+            with self._lock:
+                if generation == self._flush_generation:
+                    self._seed_known(loaded, totals)
+                    return totals
+        # A flush overlapped the read: its commit may already be in the rows
+        # while its deltas are still counted as in flight. Read between flushes.
+        with self._flush_lock:
+            loaded = self._read_user_totals(missing)
+            with self._lock:
+                self._seed_known(loaded, totals)
+        return totals
+
+    def _known_global_total(self) -> int:
+        with self._lock:
+            if self._known_global is not None:
+                return self._known_global
+            generation = self._flush_generation
+            clean = not self._inflight
+        if clean:
+            total = self._read_global_total()
+            with self._lock:
+                if self._known_global is None and generation == self._flush_generation:
+                    self._known_global = total
+                if self._known_global is not None:
+                    return self._known_global
+        with self._flush_lock:
+            total = self._read_global_total()
+            with self._lock:
+                if self._known_global is None:
+                    self._known_global = total
+                return self._known_global
+
+    def _read_user_totals(self, user_ids: list[str]) -> dict[str, int]:
+        with self._session_factory() as session:
+            return PostgresClickRepository(session).get_user_totals(user_ids)
+
+    def _read_global_total(self) -> int:
+        with self._session_factory() as session:
+            return PostgresClickRepository(session).get_global_total()
+
+    def _seed_known(self, loaded: dict[str, int], totals: dict[str, int]) -> None:
+        for user_id, total in loaded.items():
+            # A flush that finished meanwhile recorded a total at least as new
+            if user_id not in self._known:
+                self._remember(user_id, total)
+            totals[user_id] = self._known.get(user_id, total)
+
+    def _remember(self, user_id: str, total: int) -> None:
+        self._known[user_id] = total
+        self._known.move_to_end(user_id)
+        while len(self._known) > self._max_known_users:
+            self._known.popitem(last=False)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                self.flush()
+            except Exception:
+                # Already logged and re-queued; retry on the next tick
+                pass
@@ -1,9 +1,21 @@
 """Click service - business logic for click operations"""
 from app.domain.models import Profile, GlobalState, utc_now
-from app.repositories.interfaces import ProfileRepository, GlobalStateRepository
+from app.repositories.interfaces import (
+    AsyncGlobalStateRepository,
+    AsyncProfileRepository,
+    GlobalStateRepository,
+    ProfileRepository,
+)
 from app.schemas.global_state import GlobalStateResponse
 
 
+def _staleness_ms(global_repo) -> int | None:
+    # Cached repositories report how old their view of the counter may be
+    if hasattr(global_repo, "staleness_ms"):
+        return global_repo.staleness_ms()
+    return None
+
+
 class ClickService:
     """Service for click operations"""
     
@@ -20,30 +32,27 @@ class ClickService:
         Increment clicks for a user and globally.
         Returns updated profile and global state.
         """
-        # Get or create profile
-        profile = self.profile_repo.get_by_device_id(device_id)
-        if profile is None:
-            profile = Profile(
-                device_id=device_id,
-                my_clicks=0,
-                unlocked_cosmetics=["default"],
-                selected_cosmetic="default"
-            )
-            profile = self.profile_repo.create(profile)
-        
-        # Increment user clicks (prefer atomic repo method if available)
-        if hasattr(self.profile_repo, "increment_clicks"):
-            profile = self.profile_repo.increment_clicks(device_id, delta)
-        else:
-            profile.my_clicks += delta
-            profile.updated_at = utc_now()
-            profile = self.profile_repo.update(profile)
+        profile = self._increment_profile(device_id, delta)
         
         # Increment global clicks
         global_state = self.global_repo.increment_clicks(delta)
         
         return profile, global_state
 
+    def increment_clicks_batch(
+        self, deltas: dict[str, int]
+    ) -> tuple[dict[str, Profile], GlobalState]:
+        """
+        Increment clicks for many users, with one global increment.
+        Returns updated profiles keyed by device_id and the global state.
+        """
+        profiles: dict[str, Profile] = {}
+        for device_id, delta in deltas.items():
+            profiles[device_id] = self._increment_profile(device_id, delta)
+
+        global_state = self.global_repo.increment_clicks(sum(deltas.values()))
+        return profiles, global_state
+
     def get_global_state(self) -> GlobalStateResponse:
         """Return current global click state"""
         state = self.global_repo.get_state()
@@ -51,4 +60,65 @@ class ClickService:
             global_clicks=state.global_clicks,
             updated_at=state.updated_at,
             schema_version=state.schema_version,
-        )
\ No newline at end of file
+            max_staleness_ms=_staleness_ms(self.global_repo),
+        )
+
+    def _increment_profile(self, device_id: str, delta: int) -> Profile:
+        # Prefer the atomic repo method: it creates missing profiles itself
+        if hasattr(self.profile_repo, "increment_clicks"):
+            return self.profile_repo.increment_clicks(device_id, delta)
+        profile = self.profile_repo.get_by_device_id(device_id)
+        if profile is None:
+            profile = self.profile_repo.create(Profile(device_id=device_id))
+        profile.my_clicks += delta
+        profile.updated_at = utc_now()
+        return self.profile_repo.update(profile)
+
+
+class AsyncClickService:
+    """Click operations on async repositories (DATABASE_ASYNC=true)"""
+    
+    def __init__(
+        self,
+        profile_repo: AsyncProfileRepository,
+        global_repo: AsyncGlobalStateRepository
+    ):
+        self.profile_repo = profile_repo
+        self.global_repo = global_repo
+    
+    async def increment_clicks(self, device_id: str, delta: int) -> tuple[Profile, GlobalState]:
+        """Increment clicks for a user and globally (see ClickService)"""
+        profile = await self._increment_profile(device_id, delta)
+        global_state = await self.global_repo.increment_clicks(delta)
+        return profile, global_state
+
+    async def increment_clicks_batch(
+        self, deltas: dict[str, int]
+    ) -> tuple[dict[str, Profile], GlobalState]:
+        """Increment clicks for many users, with one global increment"""
+        profiles: dict[str, Profile] = {}
+        for device_id, delta in deltas.items():
+            profiles[device_id] = await self._increment_profile(device_id, delta)
+        global_state = await self.global_repo.increment_clicks(sum(deltas.values()))
+        return profiles, global_state
+
+    async def get_global_state(self) -> GlobalStateResponse:
+        """Return current global click state"""
+        state = await self.global_repo.get_state()
+        return GlobalStateResponse(
+            global_clicks=state.global_clicks,
+            updated_at=state.updated_at,
+            schema_version=state.schema_version,
+            max_staleness_ms=_staleness_ms(self.global_repo),
+        )
+
+    async def _increment_profile(self, device_id: str, delta: int) -> Profile:
+        if hasattr(self.profile_repo, "increment_clicks"):
+            # Atomic upsert-increment creates the profile when missing
+            return await self.profile_repo.increment_clicks(device_id, delta)
+        profile = await self.profile_repo.get_by_device_id(device_id)
+        if profile is None:
+            profile = await self.profile_repo.create(Profile(device_id=device_id))
+        profile.my_clicks += delta
+        profile.updated_at = utc_now()
+        return await self.profile_repo.update(profile)
@@ -1,8 +1,38 @@
 """Cosmetic service - business logic for cosmetic operations"""
+from typing import Optional
+
 from fastapi import HTTPException
 
+from app.domain import cosmetics
 from app.domain.models import Profile, utc_now
-from app.repositories.interfaces import ProfileRepository
+from app.repositories.interfaces import AsyncProfileRepository, ProfileRepository
+
+
+def _require_known(cosmetic_id: str) -> None:
+    if cosmetics.bit_of(cosmetic_id) is None:
+        raise HTTPException(status_code=404, detail=f"Cosmetic '{cosmetic_id}' not found")
+
+
+def _selected(profile: Optional[Profile], cosmetic_id: str) -> Profile:
+    """404 for a missing profile, 400 if the cosmetic is not unlocked on it"""
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not cosmetics.is_unlocked(profile.unlocked_mask, cosmetic_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cosmetic '{cosmetic_id}' is not unlocked"
+        )
+    return profile
+
+
+def _add_unlock(profile: Profile, cosmetic_id: str) -> bool:
+    """Set the cosmetic's bit on the profile; False if it was already set"""
+    if cosmetics.is_unlocked(profile.unlocked_mask, cosmetic_id):
+        return False
+    profile.unlocked_mask |= cosmetics.bit_of(cosmetic_id)
+    profile.unlocked_cosmetics = cosmetics.ids_of(profile.unlocked_mask)
+    profile.updated_at = utc_now()
+    return True
 
 
 class CosmeticService:
@@ -16,17 +46,11 @@ class CosmeticService:
         Select a cosmetic for a user.
         Validates that the cosmetic is unlocked.
         """
-        profile = self.profile_repo.get_by_device_id(device_id)
-        
-        if profile is None:
-            raise HTTPException(status_code=404, detail="Profile not found")
-        
-        if cosmetic_id not in profile.unlocked_cosmetics:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cosmetic '{cosmetic_id}' is not unlocked"
-            )
+        # Prefer the atomic repo method (only selected_cosmetic is written)
+        if hasattr(self.profile_repo, "select_cosmetic"):
+            return _selected(self.profile_repo.select_cosmetic(device_id, cosmetic_id), cosmetic_id)
         
+        profile = _selected(self.profile_repo.get_by_device_id(device_id), cosmetic_id)
         profile.selected_cosmetic = cosmetic_id
         profile.updated_at = utc_now()
         return self.profile_repo.update(profile)
@@ -36,15 +60,60 @@ class CosmeticService:
         Unlock a cosmetic for a user.
         Idempotent - does not add duplicates.
         """
+        _require_known(cosmetic_id)
+        
+        # Prefer the atomic repo method (mask | bit) if available
+        if hasattr(self.profile_repo, "unlock_cosmetic"):
+            profile = self.profile_repo.unlock_cosmetic(device_id, cosmetic_id)
+            if profile is None:
+                raise HTTPException(status_code=404, detail="Profile not found")
+            return profile
+        
         profile = self.profile_repo.get_by_device_id(device_id)
         
         if profile is None:
             raise HTTPException(status_code=404, detail="Profile not found")
         
         # Idempotent: only add if not already unlocked
-        if cosmetic_id not in profile.unlocked_cosmetics:
-            profile.unlocked_cosmetics.append(cosmetic_id)
-            profile.updated_at = utc_now()
+        if _add_unlock(profile, cosmetic_id):
             profile = self.profile_repo.update(profile)
         
-        return profile
\ No newline at end of file
+        return profile
+
+
+class AsyncCosmeticService:
+    """Cosmetic operations on an async repository (DATABASE_ASYNC=true)"""
+    
+    def __init__(self, profile_repo: AsyncProfileRepository):
+        self.profile_repo = profile_repo
+    
+    async def select_cosmetic(self, device_id: str, cosmetic_id: str) -> Profile:
+        """Select an unlocked cosmetic for a user (see CosmeticService)"""
+        if hasattr(self.profile_repo, "select_cosmetic"):
+            profile = await self.profile_repo.select_cosmetic(device_id, cosmetic_id)
+            return _selected(profile, cosmetic_id)
+        
+        profile = _selected(await self.profile_repo.get_by_device_id(device_id), cosmetic_id)
+        profile.selected_cosmetic = cosmetic_id
+        profile.updated_at = utc_now()
+        return await self.profile_repo.update(profile)
+    
+    async def unlock_cosmetic(self, device_id: str, cosmetic_id: str) -> Profile:
+        """Unlock a cosmetic for a user; idempotent (see CosmeticService)"""
+        _require_known(cosmetic_id)
+        
+        if hasattr(self.profile_repo, "unlock_cosmetic"):
+            profile = await self.profile_repo.unlock_cosmetic(device_id, cosmetic_id)
+            if profile is None:
+                raise HTTPException(status_code=404, detail="Profile not found")
+            return profile
+        
+        profile = await self.profile_repo.get_by_device_id(device_id)
+        
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        
+        if _add_unlock(profile, cosmetic_id):
+            profile = await self.profile_repo.update(profile)
+        
+        return profile
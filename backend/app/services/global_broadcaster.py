@@ -0,0 +1,145 @@
+"""Global counter broadcaster - one producer fanned out to all stream clients"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import AsyncIterator, Callable
+
+from app.domain.models import GlobalState
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBERS = REGISTRY.gauge(
+    "global_stream_subscribers", "Connected global counter stream clients"
+)
+DROPPED = REGISTRY.counter(
+    "global_stream_dropped_total", "Updates replaced before a slow client read them"
+)
+
+
+class GlobalStateBroadcaster:
+    """
+    Pushes global counter updates to every subscriber.
+
+    A single producer task reads the state at most `max_rate_hz` times per
+    second (however many clients are connected) and publishes it only when
+    the count changed, so bursts of clicks coalesce into one update. Each
+    subscriber holds at most one pending update: a slow consumer gets the
+    latest value and skips the ones it missed.
+
+    The producer runs while at least one client is subscribed. Writers may
+    also `offer()` a count as soon as it commits, from any thread.
+    """
+
+    def __init__(self, loader: Callable[[], GlobalState], max_rate_hz: float = 10):
+        self._loader = loader
+        self._interval = 1 / max_rate_hz
+        self._subscribers: set[asyncio.Queue] = set()
+        self._latest: GlobalState | None = None
+        self._producer: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def latest(self) -> GlobalState | None:
+        """Last published state (None before the first load)"""
+        return self._latest
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Register a subscriber; yields its single-slot update queue"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._loop = asyncio.get_running_loop()
+        if self._latest is not None:
+            queue.put_nowait(self._latest)
+        self._subscribers.add(queue)
+        SUBSCRIBERS.set(len(self._subscribers))
+        if self._producer is None or self._producer.done():
+            self._producer = asyncio.create_task(self._produce())
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            SUBSCRIBERS.set(len(self._subscribers))
+
+    def publish(self, state: GlobalState) -> None:
+        """Fan a state out to all subscribers (event loop thread only)"""
+        # The counter only grows: a late offer or load must not move clients backwards
+        if self._latest is not None and state.global_clicks <= self._latest.global_clicks:
+            return
+        self._latest = replace(state)
+        for queue in self._subscribers:
+            if queue.full():
+                # Drop the unread value: only the newest count matters
+                queue.get_nowait()
+                DROPPED.inc()
+            queue.put_nowait(self._latest)
+
+    def offer(self, state: GlobalState) -> None:
+        """Publish a state from any thread (e.g. a committed click); no-op without subscribers"""
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self.publish, state)
+        except RuntimeError:
+            pass  # The subscribers' loop has closed
+
+    async def _produce(self) -> None:
+        while self._subscribers:
+            try:
+                # Loaders may block (DB reads): keep them off the event loop
+                self.publish(await asyncio.to_thread(self._loader))
+            except Exception:
+                logger.exception("Global state broadcast load failed")
+            await asyncio.sleep(self._interval)
+
+
+def _offer_after_commit(writer, broadcaster: GlobalStateBroadcaster, global_clicks: int) -> None:
+    # Imported here: the publishing module pulls in SQLAlchemy, which inmemory mode never loads
+    from app.events.publishing import after_commit
+
+    state = GlobalState(global_clicks=global_clicks)
+    after_commit(writer, lambda: broadcaster.offer(state))
+
+
+class BroadcastingClickWriter:
+    """ClickWriter that pushes each click's global total to stream clients once it commits"""
+
+    def __init__(self, inner, broadcaster: GlobalStateBroadcaster):
+        self.inner = inner
+        self.broadcaster = broadcaster
+        if hasattr(inner, "increment_many"):
+            self.increment_many = self._increment_many
+
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        my_clicks, global_clicks = self.inner.increment(user_id, delta)
+        _offer_after_commit(self.inner, self.broadcaster, global_clicks)
+        return my_clicks, global_clicks
+
+    def _increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        user_totals, global_clicks = self.inner.increment_many(deltas)
+        _offer_after_commit(self.inner, self.broadcaster, global_clicks)
+        return user_totals, global_clicks
+
+
+class AsyncBroadcastingClickWriter:
+    """Async variant of BroadcastingClickWriter (direct writes on the asyncio engine)"""
+
+    def __init__(self, inner, broadcaster: GlobalStateBroadcaster):
+        self.inner = inner
+        self.broadcaster = broadcaster
+
+    async def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        my_clicks, global_clicks = await self.inner.increment(user_id, delta)
+        _offer_after_commit(self.inner, self.broadcaster, global_clicks)
+        return my_clicks, global_clicks
+
+    async def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        user_totals, global_clicks = await self.inner.increment_many(deltas)
+        _offer_after_commit(self.inner, self.broadcaster, global_clicks)
+        return user_totals, global_clicks
@@ -0,0 +1,135 @@
+"""Group-commit click writer - merges concurrent clicks into one transaction"""
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.metrics import REGISTRY
+from app.repositories.interfaces import ClickBatchFailed
+from app.repositories.postgres.click_repo import PostgresClickRepository
+
+BATCH_SIZE = REGISTRY.histogram(
+    "click_group_commit_batch_size",
+    "Clicks merged into one group-commit transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+WAIT_TIME = REGISTRY.histogram(
+    "click_group_commit_wait_seconds",
+    "Time from a click arriving to its batch being committed",
+)
+COMMIT_TIME = REGISTRY.histogram(
+    "click_group_commit_duration_seconds",
+    "Time spent executing and committing one group-commit batch",
+)
+
+
+class _Batch:
+    """Clicks collected for one transaction"""
+
+    def __init__(self):
+        self.entries: list[tuple[str, int]] = []
+        self.results: list[tuple[int, int]] = []
+        self.error: BaseException | None = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class GroupCommitClickWriter:
+    """
+    Durable click writer that commits concurrent clicks together.
+
+    The first click of a batch becomes its leader: it waits up to
+    `window_ms` (or until `max_batch` clicks have joined), then writes the
+    whole batch in one transaction. Only one batch commits at a time, so
+    clicks arriving during a commit collect into the next batch. Every
+    caller returns only after the commit, with the (my_clicks,
+    global_clicks) it would have seen had the batch run one click at a time.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        shards: int = 1,
+        window_ms: float = 3,
+        max_batch: int = 256,
+    ):
+        self._session_factory = session_factory
+        self._shards = shards
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._open: _Batch | None = None
+
+    def increment(self, user_id: str, delta: int) -> tuple[int, int]:
+        """Add a click to the current batch and wait for it to commit"""
+        user_totals, global_clicks = self.increment_many({user_id: delta})
+        return user_totals[user_id], global_clicks
+
+    def increment_many(self, deltas: dict[str, int]) -> tuple[dict[str, int], int]:
+        """Add many users' clicks to the current batch together and wait for it to commit"""
+        if not deltas:
+            with self._session_factory() as session:
+                return {}, PostgresClickRepository(session, shards=self._shards).get_global_total()
+        arrived = time.monotonic()
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                self._open = batch
+            first = len(batch.entries)
+            batch.entries.extend(deltas.items())
+            if len(batch.entries) >= self._max_batch:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self._window)
+            with self._commit_lock:
+                with self._lock:
+                    # Stop accepting clicks once this batch is about to run
+                    if self._open is batch:
+                        self._open = None
+                self._commit(batch)
+        else:
+            batch.done.wait()
+
+        WAIT_TIME.observe(time.monotonic() - arrived)
+        if batch.error is not None:
+            # One exception per caller: raising the shared one from many threads mixes tracebacks
+            failed = f"group commit of {len(batch.entries)} clicks failed"
+            raise ClickBatchFailed(failed) from batch.error
+        results = batch.results[first:first + len(deltas)]
+        user_totals = {user_id: my_clicks for user_id, (my_clicks, _) in zip(deltas, results)}
+        # Global total as of this call's last entry, so it includes all of its clicks
+        return user_totals, results[-1][1]
+
+    def _commit(self, batch: _Batch) -> None:
+        started = time.monotonic()
+        deltas: dict[str, int] = {}
+        for user_id, delta in batch.entries:
+            deltas[user_id] = deltas.get(user_id, 0) + delta
+
+        try:
+            with self._session_factory() as session:
+                repo = PostgresClickRepository(session, shards=self._shards)
+                user_totals, global_total = repo.increment_many(deltas)
+                session.commit()
+        except BaseException as exc:
+            batch.error = exc
+        else:
+            # Walk backwards so each click sees totals up to and including itself
+            results: list[tuple[int, int]] = [(0, 0)] * len(batch.entries)
+            for i in range(len(batch.entries) - 1, -1, -1):
+                user_id, delta = batch.entries[i]
+                results[i] = (user_totals[user_id], global_total)
+                user_totals[user_id] -= delta
+                global_total -= delta
+            batch.results = results
+        finally:
+            BATCH_SIZE.observe(len(batch.entries))
+            COMMIT_TIME.observe(time.monotonic() - started)
+            batch.done.set()
@@ -1,6 +1,9 @@
 """Profile service - business logic for profiles"""
 from app.domain.models import Profile
-from app.repositories.interfaces import ProfileRepository
+from app.metrics import REGISTRY
+from app.repositories.interfaces import AsyncProfileRepository, ProfileRepository
+
+PROFILES_CREATED = REGISTRY.counter("profiles_created_total", "Profiles created on first lookup")
 
 
 class ProfileService:
@@ -25,5 +28,29 @@ class ProfileService:
                 selected_cosmetic="default"
             )
             profile = self.profile_repo.create(profile)
+            PROFILES_CREATED.inc()
+        
+        return profile
+
+
+class AsyncProfileService:
+    """Profile operations on an async repository (DATABASE_ASYNC=true)"""
+    
+    def __init__(self, profile_repo: AsyncProfileRepository):
+        self.profile_repo = profile_repo
+    
+    async def get_or_create_profile(self, device_id: str) -> Profile:
+        """Get existing profile or create a new one with defaults"""
+        profile = await self.profile_repo.get_by_device_id(device_id)
+        
+        if profile is None:
+            profile = Profile(
+                device_id=device_id,
+                my_clicks=0,
+                unlocked_cosmetics=["default"],
+                selected_cosmetic="default"
+            )
+            profile = await self.profile_repo.create(profile)
+            PROFILES_CREATED.inc()
         
-        return profile
\ No newline at end of file
+        return profile
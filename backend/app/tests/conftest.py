@@ -1,20 +1,37 @@
 """Pytest configuration and fixtures"""
+import os
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
+from app.instrumentation import instrument_engine
 from app.main import app
+from app.config import Settings, settings
 from app.deps import (
+    get_async_db_session,
+    get_db_session,
     get_profile_repository,
     get_global_repository,
     get_profile_service,
     get_click_service,
     get_cosmetic_service,
+    get_read_click_service,
+    get_read_profile_service,
 )
 from app.repositories.memory.profile_repo import InMemoryProfileRepository
 from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
 from app.services.profile_service import ProfileService
 from app.services.click_service import ClickService
 from app.services.cosmetic_service import CosmeticService
+from app.models import Base
+
+# Postgres-backed tests run only when a throwaway database is provided
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
 
 
 @pytest.fixture
@@ -32,6 +49,8 @@ def client():
     app.dependency_overrides[get_click_service] = (
         lambda: ClickService(profile_repo, global_repo)
     )
+    app.dependency_overrides[get_read_profile_service] = app.dependency_overrides[get_profile_service]
+    app.dependency_overrides[get_read_click_service] = app.dependency_overrides[get_click_service]
     app.dependency_overrides[get_cosmetic_service] = (
         lambda: CosmeticService(profile_repo)
     )
@@ -46,4 +65,123 @@ def client():
 @pytest.fixture
 def test_device_id():
     """Test device ID"""
-    return "test-device-12345"
\ No newline at end of file
+    return "test-device-12345"
+
+
+@pytest.fixture
+def pg_engine():
+    """Engine on a fresh schema in TEST_DATABASE_URL (skipped if unset)"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_statements(pg_engine):
+    """List of SQL statements executed on the test engine, in order"""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(pg_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(pg_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def instrumented_pg_engine(pg_engine):
+    """The test engine with statement and pool instrumentation, removed on teardown"""
+    remove = instrument_engine(pg_engine, "test")
+    yield pg_engine
+    remove()
+
+
+@pytest.fixture
+def max_queries(pg_statements):
+    """
+    Statement budget: `with max_queries(2): ...` fails the test if the
+    block runs more than 2 statements on the test database
+    """
+    @contextmanager
+    def budget(limit: int):
+        start = len(pg_statements)
+        yield
+        ran = pg_statements[start:]
+        assert len(ran) <= limit, f"{len(ran)} statements, budget {limit}:\n" + "\n".join(ran)
+
+    return budget
+
+
+@pytest.fixture
+def pg_session_factory(pg_engine):
+    """Session factory bound to the test database"""
+    return sessionmaker(bind=pg_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def pg_session(pg_session_factory):
+    """Postgres session, committed at the end of the test"""
+    session = pg_session_factory()
+    yield session
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def pg_client(pg_session_factory, monkeypatch):
+    """Test client in postgres mode against the test database"""
+    monkeypatch.setattr(settings, "repository_mode", "postgres")
+
+    def override_db_session():
+        session = pg_session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db_session] = override_db_session
+
+    with TestClient(app) as c:
+        yield c
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def pg_async_session_factory(pg_engine):
+    """Asyncio session factory for the test database (asyncpg)"""
+    url = Settings(database_url=TEST_DATABASE_URL).get_async_database_url()
+    # NullPool: connections never outlive the event loop that opened them
+    engine = create_async_engine(url, poolclass=NullPool)
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def pg_async_client(pg_async_session_factory, monkeypatch):
+    """Test client in async postgres mode (DATABASE_ASYNC=true)"""
+    monkeypatch.setattr(settings, "repository_mode", "postgres")
+    monkeypatch.setattr(settings, "database_async", True)
+
+    async def override_async_db_session():
+        async with pg_async_session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_async_db_session] = override_async_db_session
+    # The sync session must not be used in async mode
+    app.dependency_overrides[get_db_session] = lambda: None
+
+    with TestClient(app) as c:
+        yield c
+
+    app.dependency_overrides.clear()
\ No newline at end of file
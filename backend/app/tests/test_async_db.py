@@ -0,0 +1,76 @@
+"""Async database stack tests (require TEST_DATABASE_URL and asyncpg)"""
+import pytest
+
+from app.repositories.postgres.click_repo import AsyncPostgresClickRepository
+from app.repositories.postgres.global_repo import AsyncPostgresGlobalStateRepository
+from app.repositories.postgres.profile_repo import AsyncPostgresProfileRepository
+from app.domain.models import Profile
+
+
+@pytest.mark.asyncio
+async def test_async_profile_repository(pg_async_session_factory):
+    """Test create, read, update and increment on the async profile repository"""
+    async with pg_async_session_factory() as session:
+        repo = AsyncPostgresProfileRepository(session)
+        assert await repo.get_by_device_id("device-a") is None
+
+        created = await repo.create(Profile(device_id="device-a"))
+        assert created.unlocked_cosmetics == ["default"]
+
+        created.selected_cosmetic = "default"
+        updated = await repo.update(created)
+        assert updated.device_id == "device-a"
+
+        incremented = await repo.increment_clicks("device-a", 3)
+        assert incremented.my_clicks == 3
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_async_global_and_click_repositories(pg_async_session_factory):
+    """Test that async counter repositories shard and sum like the sync ones"""
+    async with pg_async_session_factory() as session:
+        global_repo = AsyncPostgresGlobalStateRepository(session, shards=4)
+        for _ in range(10):
+            await global_repo.increment_clicks(2)
+        assert (await global_repo.get_state()).global_clicks == 20
+
+        click_repo = AsyncPostgresClickRepository(session, shards=4)
+        assert await click_repo.increment("user-a", 2) == (2, 2)
+        user_totals, global_total = await click_repo.increment_many({"user-a": 1, "user-b": 5})
+        assert user_totals == {"user-a": 3, "user-b": 5}
+        assert global_total == 8
+        await session.commit()
+
+
+def test_async_mode_endpoints(pg_async_client):
+    """Test profiles, clicks, cosmetics and global state in async mode"""
+    response = pg_async_client.get("/api/v1/profiles/device-a")
+    assert response.status_code == 200
+    assert response.json()["my_clicks"] == 0
+
+    response = pg_async_client.post("/api/v1/clicks/increment", json={"device_id": "device-a", "delta": 4})
+    assert response.status_code == 200
+    assert response.json()["my_clicks"] == 4
+    assert response.json()["global_clicks"] == 4
+
+    response = pg_async_client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"device_id": "device-a"}, {"device_id": "device-b"}]},
+    )
+    assert response.json()["global_clicks"] == 6
+
+    response = pg_async_client.put(
+        "/api/v1/cosmetics/selected",
+        json={"device_id": "device-a", "selected_cosmetic": "default"},
+    )
+    assert response.status_code == 200
+
+    response = pg_async_client.put(
+        "/api/v1/cosmetics/selected",
+        json={"device_id": "device-a", "selected_cosmetic": "neon"},
+    )
+    assert response.status_code == 400
+
+    response = pg_async_client.get("/api/v1/state/global")
+    assert response.status_code == 200
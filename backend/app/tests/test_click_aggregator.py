@@ -0,0 +1,154 @@
+"""Write-behind click aggregator tests (require TEST_DATABASE_URL)"""
+import threading
+
+import pytest
+
+from app import deps
+from app.config import settings
+from app.repositories.postgres.click_repo import PostgresClickRepository
+from app.services.click_aggregator import ClickBufferFull, WriteBehindClickAggregator
+
+
+def durable_totals(session_factory, *user_ids):
+    session = session_factory()
+    try:
+        repo = PostgresClickRepository(session)
+        return [repo.get_user_total(u) for u in user_ids], repo.get_global_total()
+    finally:
+        session.close()
+
+
+def test_projected_counts_before_flush(pg_session_factory):
+    """Test that responses project buffered clicks before they are durable"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory)
+
+    assert aggregator.increment("user-a", 3) == (3, 3)
+    assert aggregator.increment("user-a", 2) == (5, 5)
+    assert aggregator.increment("user-b", 1) == (1, 6)
+
+    assert durable_totals(pg_session_factory, "user-a", "user-b") == ([0, 0], 0)
+
+
+def test_flush_writes_batch(pg_session_factory):
+    """Test that a flush applies all buffered deltas in one batch"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory, shards=4)
+    for _ in range(10):
+        aggregator.increment("user-a", 1)
+    aggregator.increment("user-b", 7)
+
+    assert aggregator.flush() == 2
+    assert durable_totals(pg_session_factory, "user-a", "user-b") == ([10, 7], 17)
+
+    # Projections continue from the durable totals
+    assert aggregator.increment("user-a", 1) == (11, 18)
+    assert aggregator.flush() == 1
+    assert durable_totals(pg_session_factory, "user-a") == ([11], 18)
+
+
+def test_stop_drains_buffer(pg_session_factory):
+    """Test that stopping the aggregator flushes pending clicks"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory, flush_interval_ms=60_000)
+    aggregator.start()
+    aggregator.increment("user-a", 4)
+    aggregator.stop()
+
+    assert durable_totals(pg_session_factory, "user-a") == ([4], 4)
+
+
+def test_full_buffer_flushes_inline(pg_session_factory):
+    """Test that a full buffer is drained by the caller before accepting more"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory, max_pending_users=2)
+    aggregator.increment("user-a", 1)
+    aggregator.increment("user-b", 1)
+    assert durable_totals(pg_session_factory, "user-a")[1] == 0
+
+    assert aggregator.increment("user-c", 1) == (1, 3)
+    assert durable_totals(pg_session_factory, "user-a", "user-b") == ([1, 1], 2)
+
+
+def test_failed_flush_requeues(pg_session_factory):
+    """Test that deltas from a failed flush stay buffered"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory)
+    aggregator.increment("user-a", 2)
+
+    def broken_factory():
+        raise RuntimeError("db down")
+
+    aggregator._session_factory = broken_factory
+    with pytest.raises(RuntimeError):
+        aggregator.flush()
+
+    aggregator._session_factory = pg_session_factory
+    # Re-queued deltas still count toward the projected global total
+    assert aggregator.increment("user-b", 1) == (1, 3)
+    assert aggregator.flush() == 2
+    assert durable_totals(pg_session_factory, "user-a") == ([2], 3)
+
+
+def test_buffer_full_error_when_flush_cannot_make_room(pg_session_factory):
+    """Test that the bound holds when no room can be made"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory, max_pending_users=0)
+    with pytest.raises(ClickBufferFull):
+        aggregator.increment("user-a", 1)
+
+
+def test_known_totals_have_their_own_bound(pg_session_factory):
+    """Test that remembered durable totals are capped by max_known_users"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory, max_known_users=2)
+    for user_id in ("user-a", "user-b", "user-c"):
+        aggregator.increment(user_id, 1)
+
+    assert list(aggregator._known) == ["user-b", "user-c"]
+    assert aggregator.increment("user-a", 1) == (2, 4)
+
+
+def test_batches_go_through_the_buffer(pg_client, pg_session_factory, monkeypatch):
+    """Test that a batch after a click, then another click, never moves totals backwards"""
+    monkeypatch.setattr(settings, "click_write_mode", "write_behind")
+    monkeypatch.setattr(deps, "_click_aggregator", WriteBehindClickAggregator(pg_session_factory))
+
+    single = pg_client.post("/api/v1/clicks/increment", json={"user_id": "user-a", "delta": 2}).json()
+    batch = pg_client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"user_id": "user-a", "delta": 3}, {"user_id": "user-b", "delta": 4}]},
+    ).json()
+    after = pg_client.post("/api/v1/clicks/increment", json={"user_id": "user-a", "delta": 1}).json()
+
+    assert (single["my_clicks"], single["global_clicks"]) == (2, 2)
+    assert batch["results"] == [{"device_id": "user-a", "my_clicks": 5}, {"device_id": "user-b", "my_clicks": 4}]
+    assert batch["global_clicks"] == 9
+    assert (after["my_clicks"], after["global_clicks"]) == (6, 10)
+
+    # Nothing reached the database yet: the batch was buffered too
+    assert durable_totals(pg_session_factory, "user-a", "user-b") == ([0, 0], 0)
+    assert deps._click_aggregator.flush() == 2
+    assert durable_totals(pg_session_factory, "user-a", "user-b") == ([6, 4], 10)
+
+
+def test_cold_read_during_flush_is_not_double_counted(pg_session_factory):
+    """Test a click by a user with no known total that lands between a flush's commit and its bookkeeping"""
+    aggregator = WriteBehindClickAggregator(pg_session_factory, max_known_users=1)
+    aggregator.increment("user-a", 2)
+    aggregator.increment("user-b", 1)  # evicts user-a's known total
+    results = []
+    reader = threading.Thread(target=lambda: results.append(aggregator.increment("user-a", 1)))
+
+    def session_with_hook():
+        session = pg_session_factory()
+        commit = session.commit
+
+        def commit_then_read():
+            commit()
+            # user-a's 2 clicks are durable but still counted as in flight
+            reader.start()
+            reader.join(0.2)
+
+        session.commit = commit_then_read
+        return session
+
+    aggregator._session_factory = session_with_hook
+    assert aggregator.flush() == 2
+    aggregator._session_factory = pg_session_factory
+    reader.join()
+
+    assert results == [(3, 4)]
@@ -1,4 +1,5 @@
 """Click endpoint tests"""
+from app.config import settings
 
 
 def test_increment_clicks_default_delta(client, test_device_id):
@@ -79,4 +80,86 @@ def test_get_global_state(client):
     assert "global_clicks" in data
     assert data["global_clicks"] >= 0
     assert "updated_at" in data
-    assert data["schema_version"] == 1
\ No newline at end of file
+    assert data["schema_version"] == 1
+
+def test_increment_batch(client):
+    """Test applying a batch of clicks for several devices"""
+    response = client.post(
+        "/api/v1/clicks/increment-batch",
+        json={
+            "clicks": [
+                {"device_id": "device-a", "delta": 3},
+                {"user_id": "device-b", "delta": 10},
+                {"device_id": "device-a"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["applied"] == 3
+    assert data["users"] == 2
+    assert data["total_delta"] == 14
+    assert data["global_clicks"] == 14
+    assert data["results"] == [
+        {"device_id": "device-a", "my_clicks": 4},
+        {"device_id": "device-b", "my_clicks": 10},
+    ]
+
+    # Batch and single clicks share the same counters
+    response = client.post("/api/v1/clicks/increment", json={"device_id": "device-a"})
+    assert response.json()["my_clicks"] == 5
+    assert response.json()["global_clicks"] == 15
+
+
+def test_increment_batch_summary_only(client):
+    """Test that results can be omitted for a compact response"""
+    response = client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"device_id": "device-a"}], "include_results": False},
+    )
+    assert response.status_code == 200
+    assert response.json()["results"] is None
+
+
+def test_increment_batch_invalid_delta(client):
+    """Test that batch entries follow the single-click delta rules"""
+    response = client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"device_id": "device-a", "delta": 11}]},
+    )
+    assert response.status_code == 422
+
+
+def test_increment_batch_empty(client):
+    """Test that an empty batch is rejected"""
+    response = client.post("/api/v1/clicks/increment-batch", json={"clicks": []})
+    assert response.status_code == 422
+
+
+def test_increment_batch_too_large(client, monkeypatch):
+    """Test that batches above the configured maximum are rejected"""
+    monkeypatch.setattr(settings, "click_batch_max_size", 2)
+    response = client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"device_id": f"device-{i}"} for i in range(3)]},
+    )
+    assert response.status_code == 413
+
+
+def test_increment_batch_postgres(pg_client):
+    """Test that a postgres batch upserts users and the global counter"""
+    pg_client.post("/api/v1/clicks/increment", json={"device_id": "device-a", "delta": 2})
+
+    response = pg_client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"device_id": "device-a"}, {"device_id": "device-b", "delta": 4}]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["global_clicks"] == 7
+    assert data["results"] == [
+        {"device_id": "device-a", "my_clicks": 3},
+        {"device_id": "device-b", "my_clicks": 4},
+    ]
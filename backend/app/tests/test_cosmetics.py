@@ -1,4 +1,5 @@
 """Cosmetic endpoint tests"""
+from app.domain import cosmetics
 
 
 def test_select_cosmetic_success(client, test_device_id):
@@ -120,4 +121,49 @@ def test_select_after_unlock(client, test_device_id):
     )
     
     assert response.status_code == 200
-    assert response.json()["selected_cosmetic"] == "neon"
\ No newline at end of file
+    assert response.json()["selected_cosmetic"] == "neon"
+
+
+def test_unlock_unknown_cosmetic(client, test_device_id):
+    """Test that cosmetics outside the catalog cannot be unlocked"""
+    client.get(f"/api/v1/profiles/{test_device_id}")
+    
+    response = client.post(
+        "/api/v1/cosmetics/unlock",
+        json={
+            "device_id": test_device_id,
+            "cosmetic_id": "not-a-cosmetic"
+        }
+    )
+    
+    assert response.status_code == 404
+
+
+def test_cosmetic_registry_bits():
+    """Test mask encoding of unlocked cosmetic ids"""
+    mask = cosmetics.mask_of(["default", "prism", "unknown"])
+    
+    assert cosmetics.ids_of(mask) == ["default", "prism"]
+    assert cosmetics.is_unlocked(mask, "prism")
+    assert not cosmetics.is_unlocked(mask, "neon")
+    assert not cosmetics.is_unlocked(mask, "unknown")
+    assert len(set(map(cosmetics.bit_of, cosmetics.COSMETIC_IDS))) == len(cosmetics.COSMETIC_IDS)
+
+
+def test_unlock_and_select_postgres(pg_client, test_device_id):
+    """Test that unlocks persist in postgres mode"""
+    pg_client.get(f"/api/v1/profiles/{test_device_id}")
+    pg_client.post(
+        "/api/v1/cosmetics/unlock",
+        json={"device_id": test_device_id, "cosmetic_id": "neon"}
+    )
+    
+    response = pg_client.put(
+        "/api/v1/cosmetics/selected",
+        json={"device_id": test_device_id, "selected_cosmetic": "neon"}
+    )
+    
+    assert response.status_code == 200
+    profile = pg_client.get(f"/api/v1/profiles/{test_device_id}").json()
+    assert profile["unlocked_cosmetics"] == ["default", "neon"]
+    assert profile["selected_cosmetic"] == "neon"
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""Event bus tests (the Postgres backend requires TEST_DATABASE_URL)"""
+import queue
+
+from app import deps
+from app.config import settings
+from app.domain.models import GlobalState
+from app.events.bus import CounterDelta, CounterDeltaBatcher, ProfileChanged, decode, encode
+from app.events.memory import InMemoryEventBus
+from app.events.postgres import PostgresEventBus
+from app.events.publishing import PublishingGlobalStateRepository, PublishingProfileRepository
+from app.repositories.cache.global_repo import GlobalStateCache
+from app.repositories.postgres.global_repo import PostgresGlobalStateRepository
+from app.repositories.postgres.profile_repo import PostgresProfileRepository
+
+
+def test_event_encoding_round_trip():
+    """Test that events survive the JSON wire format"""
+    event = CounterDelta(delta=3, global_clicks=10, origin="replica-a")
+    assert decode(encode(event)) == event
+    assert decode(encode(ProfileChanged(device_id="d1"))) == ProfileChanged(device_id="d1")
+
+
+def test_memory_bus_delivers_and_unsubscribes():
+    """Test in-process delivery, origin stamping and unsubscribe"""
+    bus = InMemoryEventBus(origin="replica-a")
+    received = []
+    unsubscribe = bus.subscribe(received.append)
+
+    bus.publish(ProfileChanged(device_id="d1"))
+    unsubscribe()
+    bus.publish(ProfileChanged(device_id="d2"))
+
+    assert received == [ProfileChanged(device_id="d1", origin="replica-a")]
+
+
+def test_batcher_coalesces_deltas():
+    """Test that many increments become one CounterDelta per flush"""
+    bus = InMemoryEventBus()
+    received = []
+    bus.subscribe(received.append)
+    batcher = CounterDeltaBatcher(bus)
+
+    for total in range(1, 51):
+        batcher.add(1, total)
+    batcher.flush()
+    batcher.flush()
+
+    assert [(e.delta, e.global_clicks) for e in received] == [(50, 50)]
+
+
+def test_cache_applies_remote_totals():
+    """Test that a GlobalStateCache follows CounterDelta events"""
+    cache = GlobalStateCache(GlobalState)
+    cache.refresh()
+    bus = InMemoryEventBus()
+    bus.subscribe(cache.on_event)
+
+    bus.publish(CounterDelta(delta=5, global_clicks=42, origin="replica-b"))
+
+    assert cache.get().global_clicks == 42
+
+
+def test_publishes_only_after_commit(pg_session_factory):
+    """Test that writes are announced on commit and never on rollback"""
+    bus = InMemoryEventBus()
+    received = []
+    bus.subscribe(received.append)
+    batcher = CounterDeltaBatcher(bus)
+
+    with pg_session_factory() as session:
+        profiles = PublishingProfileRepository(PostgresProfileRepository(session), bus)
+        profiles.increment_clicks("device-a", 2)
+        session.rollback()
+    assert received == []
+
+    with pg_session_factory() as session:
+        profiles = PublishingProfileRepository(PostgresProfileRepository(session), bus)
+        counter = PublishingGlobalStateRepository(PostgresGlobalStateRepository(session), batcher)
+        profiles.increment_clicks("device-a", 2)
+        counter.increment_clicks(2)
+        assert received == []
+        session.commit()
+
+    batcher.flush()
+    assert [type(e) for e in received] == [ProfileChanged, CounterDelta]
+    assert received[1].global_clicks == 2
+
+
+def test_postgres_bus_between_replicas(pg_engine):
+    """Test LISTEN/NOTIFY delivery from one replica's bus to another's"""
+    sender = PostgresEventBus(pg_engine, channel="button0_test_events", poll_interval=0.05)
+    receiver = PostgresEventBus(pg_engine, channel="button0_test_events", poll_interval=0.05)
+    received: queue.Queue = queue.Queue()
+    receiver.subscribe(received.put)
+    receiver.start()
+    sender.start()
+    try:
+        sender.publish(CounterDelta(delta=4, global_clicks=9))
+        event = received.get(timeout=5)
+    finally:
+        sender.stop()
+        receiver.stop()
+
+    assert event == CounterDelta(delta=4, global_clicks=9, origin=sender.origin)
+
+
+def test_clicks_publish_counter_deltas(pg_client, monkeypatch):
+    """Test that postgres-mode clicks (single and batch) reach the bus as CounterDeltas"""
+    monkeypatch.setattr(settings, "event_bus", "memory")
+    monkeypatch.setattr(deps, "_event_bus", InMemoryEventBus())
+    monkeypatch.setattr(deps, "_counter_batcher", None)
+    received = []
+    deps.get_event_bus().subscribe(received.append)
+
+    pg_client.post("/api/v1/clicks/increment", json={"user_id": "d1", "delta": 3})
+    pg_client.post(
+        "/api/v1/clicks/increment-batch",
+        json={"clicks": [{"user_id": "d1", "delta": 2}, {"user_id": "d2", "delta": 1}]},
+    )
+    deps.get_counter_batcher().flush()
+
+    assert [(e.delta, e.global_clicks) for e in received] == [(6, 6)]
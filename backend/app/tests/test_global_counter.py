@@ -0,0 +1,75 @@
+"""Sharded global counter tests (require TEST_DATABASE_URL)"""
+from sqlalchemy import func, select
+
+from app.models import GlobalCounterORM, GlobalStateORM
+from app.repositories.postgres.click_repo import PostgresClickRepository
+from app.repositories.postgres.global_repo import PostgresGlobalStateRepository
+
+
+def test_click_repo_single_slot(pg_session):
+    """Test that the default mode keeps one global_counter row"""
+    repo = PostgresClickRepository(pg_session)
+
+    assert repo.increment("user-a", 3) == (3, 3)
+    assert repo.increment("user-b", 2) == (2, 5)
+    assert repo.increment("user-a", 1) == (4, 6)
+
+    slots = pg_session.execute(select(func.count(GlobalCounterORM.id))).scalar_one()
+    assert slots == 1
+
+
+def test_click_repo_sharded_sum(pg_session):
+    """Test that sharded increments spread over slots and sum correctly"""
+    repo = PostgresClickRepository(pg_session, shards=8)
+
+    for i in range(200):
+        my_clicks, global_clicks = repo.increment(f"user-{i % 5}", 1)
+        assert global_clicks == i + 1
+
+    assert repo.get_global_total() == 200
+    slots = pg_session.execute(select(func.count(GlobalCounterORM.id))).scalar_one()
+    assert 1 < slots <= 8
+
+
+def test_click_repo_bigint_total(pg_session):
+    """Test that the global counter holds values beyond 32 bits"""
+    pg_session.add(GlobalCounterORM(id=1, total_clicks=2**31 - 1))
+    pg_session.flush()
+
+    _, global_clicks = PostgresClickRepository(pg_session).increment("user-a", 10)
+    assert global_clicks == 2**31 + 9
+
+
+def test_global_state_repo_sharded(pg_session):
+    """Test that sharded global state reads return the sum of all slots"""
+    repo = PostgresGlobalStateRepository(pg_session, shards=4)
+    assert repo.get_state().global_clicks == 0
+
+    for i in range(50):
+        assert repo.increment_clicks(2).global_clicks == 2 * (i + 1)
+
+    assert repo.get_state().global_clicks == 100
+    slots = pg_session.execute(select(func.count(GlobalStateORM.id))).scalar_one()
+    assert slots <= 4
+
+
+def test_click_increment_is_one_statement(pg_session, pg_statements):
+    """Test that a click (including user creation) is a single statement"""
+    repo = PostgresClickRepository(pg_session, shards=4)
+
+    pg_statements.clear()
+    assert repo.increment("user-a", 2) == (2, 2)
+    assert len(pg_statements) == 1
+
+    pg_statements.clear()
+    assert repo.increment("user-a", 3) == (5, 5)
+    assert len(pg_statements) == 1
+
+
+def test_click_endpoint_statement_count(pg_client, pg_statements):
+    """Test that POST /clicks/increment stays at one statement per click"""
+    for expected in (1, 2):
+        pg_statements.clear()
+        response = pg_client.post("/api/v1/clicks/increment", json={"device_id": "device-a"})
+        assert response.json()["my_clicks"] == expected
+        assert len(pg_statements) == 1
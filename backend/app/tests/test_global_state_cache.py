@@ -0,0 +1,112 @@
+"""Cached global state tests"""
+import threading
+
+from app import database, deps
+from app.config import settings
+from app.domain.models import GlobalState
+from app.repositories.cache.global_repo import CachedGlobalStateRepository, GlobalStateCache
+from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
+from app.repositories.postgres.global_repo import PostgresGlobalStateRepository
+
+
+class CountingRepository(InMemoryGlobalStateRepository):
+    """In-memory repository that counts get_state calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_state(self) -> GlobalState:
+        self.reads += 1
+        return super().get_state()
+
+
+def test_reads_served_from_memory():
+    """Test that reads after the first load do not reach the repository"""
+    inner = CountingRepository()
+    cache = GlobalStateCache(inner.get_state)
+    cache.refresh()
+    repo = CachedGlobalStateRepository(inner, cache)
+
+    for _ in range(10):
+        assert repo.get_state().global_clicks == 0
+    assert inner.reads == 1
+    assert repo.staleness_ms() is not None
+
+
+def test_local_increments_visible_immediately():
+    """Test that this process's increments update the cache without a reload"""
+    inner = CountingRepository()
+    cache = GlobalStateCache(inner.get_state)
+    cache.refresh()
+    repo = CachedGlobalStateRepository(inner, cache)
+
+    repo.increment_clicks(5)
+    assert repo.get_state().global_clicks == 5
+    assert inner.reads == 1
+
+
+def test_refresh_picks_up_other_writers():
+    """Test that the background refresher loads increments made elsewhere"""
+    inner = CountingRepository()
+    cache = GlobalStateCache(inner.get_state, refresh_interval_ms=10)
+    refreshed = threading.Event()
+    original = cache.refresh
+
+    def refresh():
+        original()
+        if inner.reads > 1:
+            refreshed.set()
+
+    cache.refresh = refresh
+    cache.start()
+    try:
+        inner.increment_clicks(7)  # Bypasses the cached wrapper
+        assert refreshed.wait(5)
+    finally:
+        cache.stop()
+
+    assert cache.get().global_clicks == 7
+
+
+def test_cache_never_moves_backwards():
+    """Test that an older reload does not hide a newer local write"""
+    inner = CountingRepository()
+    cache = GlobalStateCache(inner.get_state)
+    cache.observe(GlobalState(global_clicks=10))
+    cache.refresh()
+
+    assert cache.get().global_clicks == 10
+
+
+def test_global_state_endpoint_reports_staleness(pg_client, pg_session_factory, monkeypatch):
+    """Test GET /state/global in postgres mode with the cache enabled"""
+    def load():
+        with pg_session_factory() as session:
+            state = PostgresGlobalStateRepository(session).get_state()
+            session.commit()
+        return state
+
+    monkeypatch.setattr(settings, "global_state_cache", True)
+    monkeypatch.setattr(deps, "_global_state_cache", GlobalStateCache(load))
+    deps._global_state_cache.refresh()
+
+    response = pg_client.get("/api/v1/state/global")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["global_clicks"] == 0
+    assert data["max_staleness_ms"] is not None
+
+
+def test_clicks_update_cached_global_state(pg_client, pg_session_factory, monkeypatch):
+    """Test that POST /clicks/increment shows up in GET /state/global without a reload"""
+    monkeypatch.setattr(database, "new_session", pg_session_factory)
+    monkeypatch.setattr(settings, "global_state_cache", True)
+    cache = GlobalStateCache(deps._load_global_state)
+    monkeypatch.setattr(deps, "_global_state_cache", cache)
+
+    pg_client.post("/api/v1/clicks/increment", json={"user_id": "d1", "delta": 2})
+    cache.refresh()  # loads the click above from global_counter
+    pg_client.post("/api/v1/clicks/increment", json={"user_id": "d2", "delta": 3})
+
+    assert pg_client.get("/api/v1/state/global").json()["global_clicks"] == 5
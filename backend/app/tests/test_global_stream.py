@@ -0,0 +1,137 @@
+"""Global counter streaming tests"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from app import database, deps
+from app.config import settings
+from app.api.v1.endpoints.state import _sse_events
+from app.deps import get_global_broadcaster
+from app.domain.models import GlobalState
+from app.main import app
+from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
+from app.services.global_broadcaster import GlobalStateBroadcaster
+
+
+class CountingRepository(InMemoryGlobalStateRepository):
+    """In-memory repository that counts get_state calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_state(self) -> GlobalState:
+        self.reads += 1
+        return super().get_state()
+
+
+@pytest.mark.asyncio
+async def test_one_load_fans_out_to_all_subscribers():
+    """Test that subscribers share the producer's reads"""
+    repo = CountingRepository()
+    broadcaster = GlobalStateBroadcaster(repo.get_state, max_rate_hz=20)
+
+    async with broadcaster.subscribe() as first, broadcaster.subscribe() as second:
+        first_state = await asyncio.wait_for(first.get(), 5)
+        second_state = await asyncio.wait_for(second.get(), 5)
+        await asyncio.sleep(0.2)
+
+    assert first_state.global_clicks == second_state.global_clicks == 0
+    # ~4 producer ticks in 0.2 s, regardless of the subscriber count
+    assert repo.reads <= 8
+    assert broadcaster.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_latest_value_only():
+    """Test that unread updates are replaced rather than queued"""
+    broadcaster = GlobalStateBroadcaster(GlobalState, max_rate_hz=1)
+
+    async with broadcaster.subscribe() as queue:
+        for clicks in range(1, 6):
+            broadcaster.publish(GlobalState(global_clicks=clicks))
+        state = queue.get_nowait()
+
+    assert state.global_clicks == 5
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_count_is_not_republished():
+    """Test that repeated loads of the same count coalesce"""
+    broadcaster = GlobalStateBroadcaster(GlobalState, max_rate_hz=1)
+
+    async with broadcaster.subscribe() as queue:
+        broadcaster.publish(GlobalState(global_clicks=3))
+        queue.get_nowait()
+        broadcaster.publish(GlobalState(global_clicks=3))
+        assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_sse_event_format():
+    """Test the text/event-stream framing of counter updates"""
+    repo = InMemoryGlobalStateRepository()
+    repo.increment_clicks(7)
+    events = _sse_events(GlobalStateBroadcaster(repo.get_state), heartbeat_s=5)
+
+    event = await asyncio.wait_for(events.__anext__(), 5)
+    await events.aclose()
+
+    assert event.startswith("event: global\ndata: ")
+    assert event.endswith("\n\n")
+    assert json.loads(event.split("data: ", 1)[1])["global_clicks"] == 7
+
+
+def test_websocket_stream(client):
+    """Test that the WebSocket endpoint pushes the current count"""
+    repo = InMemoryGlobalStateRepository()
+    repo.increment_clicks(4)
+    app.dependency_overrides[get_global_broadcaster] = lambda: GlobalStateBroadcaster(
+        repo.get_state, max_rate_hz=50
+    )
+
+    with client.websocket_connect("/api/v1/state/global/ws") as websocket:
+        assert websocket.receive_json()["global_clicks"] == 4
+        repo.increment_clicks(1)
+        assert websocket.receive_json()["global_clicks"] == 5
+
+
+def test_idle_websocket_keep_alive_and_disconnect(client, monkeypatch):
+    """Test that an idle socket gets keep-alives and unsubscribes as soon as it closes"""
+    monkeypatch.setattr(settings, "global_stream_heartbeat_s", 0.05)
+    repo = InMemoryGlobalStateRepository()
+    repo.increment_clicks(4)
+    broadcaster = GlobalStateBroadcaster(repo.get_state, max_rate_hz=50)
+    app.dependency_overrides[get_global_broadcaster] = lambda: broadcaster
+
+    with client.websocket_connect("/api/v1/state/global/ws") as websocket:
+        assert websocket.receive_json()["global_clicks"] == 4
+        # No change since: the next message is the keep-alive repeat
+        assert websocket.receive_json()["global_clicks"] == 4
+        assert broadcaster.subscriber_count == 1
+
+    # The handler finishes on the client's event loop thread, shortly after the close;
+    # with no subscribers left the producer stops polling too
+    deadline = time.monotonic() + 2
+    while not broadcaster._producer.done() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert broadcaster.subscriber_count == 0
+    assert broadcaster._producer.done()
+
+
+def test_postgres_clicks_are_pushed(pg_client, pg_session_factory, monkeypatch):
+    """Test that a postgres-mode click reaches WebSocket clients without waiting for a poll"""
+    monkeypatch.setattr(database, "new_session", pg_session_factory)
+    # One load every 20 s: the update below can only arrive as a push
+    broadcaster = GlobalStateBroadcaster(deps._stream_global_state, max_rate_hz=0.05)
+    monkeypatch.setattr(deps, "_global_broadcaster", broadcaster)
+
+    with pg_client.websocket_connect("/api/v1/state/global/ws") as websocket:
+        assert websocket.receive_json()["global_clicks"] == 0
+        started = time.monotonic()
+        pg_client.post("/api/v1/clicks/increment", json={"user_id": "d1", "delta": 3})
+        assert websocket.receive_json()["global_clicks"] == 3
+        assert time.monotonic() - started < 5
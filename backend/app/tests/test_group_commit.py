@@ -0,0 +1,80 @@
+"""Group-commit click writer tests (require TEST_DATABASE_URL)"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.repositories.interfaces import ClickBatchFailed
+from app.repositories.postgres.click_repo import PostgresClickRepository
+from app.services.group_commit import BATCH_SIZE, GroupCommitClickWriter
+
+
+def test_single_click_commits(pg_session_factory):
+    """Test that a lone click is committed and acknowledged"""
+    writer = GroupCommitClickWriter(pg_session_factory, window_ms=1)
+
+    assert writer.increment("user-a", 4) == (4, 4)
+    with pg_session_factory() as session:
+        assert PostgresClickRepository(session).get_user_total("user-a") == 4
+
+
+def test_concurrent_clicks_share_batches(pg_session_factory):
+    """Test that concurrent clicks are merged and each gets its own totals"""
+    writer = GroupCommitClickWriter(pg_session_factory, shards=4, window_ms=5)
+    batches_before = BATCH_SIZE.snapshot()["count"]
+    users = [f"user-{i}" for i in range(4)]
+    clicks = [users[i % len(users)] for i in range(400)]
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda user_id: (user_id, writer.increment(user_id, 1)), clicks))
+
+    # Every click observed a distinct global total, as if applied one at a time
+    assert sorted(global_clicks for _, (_, global_clicks) in results) == list(range(1, 401))
+    for user_id in users:
+        mine = sorted(my_clicks for u, (my_clicks, _) in results if u == user_id)
+        assert mine == list(range(1, 101))
+
+    with pg_session_factory() as session:
+        repo = PostgresClickRepository(session)
+        assert repo.get_global_total() == 400
+        assert [repo.get_user_total(u) for u in users] == [100] * 4
+
+    assert BATCH_SIZE.snapshot()["count"] - batches_before < 400
+
+
+def test_max_batch_closes_early(pg_session_factory):
+    """Test that a full batch commits without waiting for the window"""
+    writer = GroupCommitClickWriter(pg_session_factory, window_ms=60_000, max_batch=1)
+
+    assert writer.increment("user-a", 1) == (1, 1)
+    assert writer.increment("user-a", 2) == (3, 3)
+
+
+def test_increment_many_joins_one_batch(pg_session_factory):
+    """Test that a batch of users commits together with totals including all of it"""
+    writer = GroupCommitClickWriter(pg_session_factory, window_ms=1)
+    writer.increment("user-a", 1)
+
+    assert writer.increment_many({"user-a": 2, "user-b": 5}) == ({"user-a": 3, "user-b": 5}, 8)
+    assert writer.increment("user-b", 1) == (6, 9)
+
+
+def test_failed_batch_raises_per_caller():
+    """Test that every caller of a failed batch gets its own exception, caused by the failure"""
+    failure = OperationalError("commit", {}, Exception("connection lost"))
+
+    def session_factory():
+        raise failure
+
+    writer = GroupCommitClickWriter(session_factory, window_ms=60_000, max_batch=2)
+
+    def click(user_id):
+        with pytest.raises(ClickBatchFailed) as caught:
+            writer.increment(user_id, 1)
+        return caught.value
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        errors = list(pool.map(click, ["user-a", "user-b"]))
+
+    assert errors[0] is not errors[1]
+    assert all(error.__cause__ is failure for error in errors)
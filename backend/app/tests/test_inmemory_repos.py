@@ -0,0 +1,100 @@
+"""Striped / per-thread in-memory repository tests"""
+from concurrent.futures import ThreadPoolExecutor
+
+from app.domain.models import Profile
+from app.repositories.memory.compact_profile_repo import CompactInMemoryProfileRepository
+from app.repositories.memory.global_repo import (
+    InMemoryGlobalStateRepository,
+    PerThreadInMemoryGlobalStateRepository,
+)
+from app.repositories.memory.profile_repo import StripedInMemoryProfileRepository
+from app.services.click_service import ClickService
+from app.services.cosmetic_service import CosmeticService
+
+
+def test_striped_repository_basic_operations():
+    """Test create, read, update and unlock across stripes"""
+    repo = StripedInMemoryProfileRepository(stripes=4)
+    for i in range(20):
+        repo.create(Profile(device_id=f"d{i}"))
+
+    profile = repo.get_by_device_id("d3")
+    profile.selected_cosmetic = "default"
+    assert repo.update(profile).device_id == "d3"
+    assert repo.get_by_device_id("missing") is None
+
+    assert repo.unlock_cosmetic("d3", "neon").unlocked_cosmetics == ["default", "neon"]
+    assert repo.unlock_cosmetic("missing", "neon") is None
+
+
+def test_select_cosmetic_keeps_concurrent_clicks():
+    """Test that selecting a cosmetic only writes the selection"""
+    for repo in (StripedInMemoryProfileRepository(stripes=4), CompactInMemoryProfileRepository()):
+        service = CosmeticService(repo)
+        repo.increment_clicks("d1", 3)
+        repo.unlock_cosmetic("d1", "neon")
+        repo.increment_clicks("d1", 2)
+
+        selected = service.select_cosmetic("d1", "neon")
+        assert (selected.my_clicks, selected.selected_cosmetic) == (5, "neon")
+
+        assert repo.select_cosmetic("d1", "prism").selected_cosmetic == "neon"
+        assert repo.select_cosmetic("missing", "neon") is None
+
+
+def test_concurrent_clicks_are_not_lost():
+    """Test that concurrent clicks through ClickService all land"""
+    profile_repo = StripedInMemoryProfileRepository(stripes=8)
+    global_repo = PerThreadInMemoryGlobalStateRepository()
+    service = ClickService(profile_repo, global_repo)
+    devices = [f"d{i}" for i in range(4)]
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(lambda n: service.increment_clicks(devices[n % 4], 1), range(4000)))
+
+    assert [profile_repo.get_by_device_id(d).my_clicks for d in devices] == [1000] * 4
+    assert global_repo.get_state().global_clicks == 4000
+
+
+def test_increment_returns_snapshot():
+    """Test that an increment's result is not changed by later increments"""
+    repo = StripedInMemoryProfileRepository()
+    first = repo.increment_clicks("d1", 1)
+    repo.increment_clicks("d1", 1)
+
+    assert first.my_clicks == 1
+    assert repo.get_by_device_id("d1").my_clicks == 2
+
+
+def test_compact_repository_round_trip():
+    """Test that the columnar store returns what was written"""
+    repo = CompactInMemoryProfileRepository()
+    created = repo.create(Profile(device_id="d1", my_clicks=5))
+
+    loaded = repo.get_by_device_id("d1")
+    assert loaded == created
+    assert (loaded.my_clicks, loaded.unlocked_cosmetics) == (5, ["default"])
+
+    loaded.selected_cosmetic = "neon"
+    loaded.my_clicks = 9
+    repo.update(loaded)
+    again = repo.get_by_device_id("d1")
+    assert (again.my_clicks, again.selected_cosmetic) == (9, "neon")
+    assert abs((again.updated_at - loaded.updated_at).total_seconds()) < 1e-3
+
+
+def test_compact_repository_through_services():
+    """Test the click and cosmetic flows on the columnar store"""
+    repo = CompactInMemoryProfileRepository()
+    clicks = ClickService(repo, InMemoryGlobalStateRepository())
+    cosmetic_service = CosmeticService(repo)
+
+    clicks.increment_clicks("d1", 3)
+    profile, _ = clicks.increment_clicks("d1", 2)
+    assert profile.my_clicks == 5
+
+    cosmetic_service.unlock_cosmetic("d1", "prism")
+    selected = cosmetic_service.select_cosmetic("d1", "prism")
+    assert selected.selected_cosmetic == "prism"
+    assert repo.get_by_device_id("d1").unlocked_cosmetics == ["default", "prism"]
+    assert len(repo) == 1
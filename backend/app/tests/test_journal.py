@@ -0,0 +1,92 @@
+"""In-memory journal and snapshot recovery tests"""
+import pytest
+
+from app import deps
+from app.config import settings
+from app.repositories.memory.compact_profile_repo import CompactInMemoryProfileRepository
+from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
+from app.repositories.memory.journal import (
+    InMemoryJournal,
+    JournaledGlobalStateRepository,
+    JournaledProfileRepository,
+)
+from app.repositories.memory.profile_repo import StripedInMemoryProfileRepository
+from app.services.click_service import ClickService
+from app.services.cosmetic_service import CosmeticService
+
+
+def _open(directory, profile_store=None):
+    """Recover a fresh pair of stores from `directory`; returns (journal, profiles, global, stats)"""
+    profile_store = profile_store or StripedInMemoryProfileRepository(stripes=4)
+    global_store = InMemoryGlobalStateRepository()
+    journal = InMemoryJournal(str(directory), flush_interval_ms=10, snapshot_interval_s=3600)
+    stats = journal.recover(profile_store, global_store)
+    return (
+        journal,
+        JournaledProfileRepository(profile_store, journal),
+        JournaledGlobalStateRepository(global_store, journal),
+        stats,
+    )
+
+
+def test_restart_replays_journal(tmp_path):
+    """Test that clicks and unlocks survive a restart"""
+    journal, profiles, global_repo, _ = _open(tmp_path)
+    clicks = ClickService(profiles, global_repo)
+    for _ in range(5):
+        clicks.increment_clicks("d1", 2)
+    clicks.increment_clicks("d2", 1)
+    CosmeticService(profiles).unlock_cosmetic("d1", "neon")
+    CosmeticService(profiles).select_cosmetic("d1", "neon")
+    journal.stop()
+
+    _, profiles, global_repo, stats = _open(tmp_path, CompactInMemoryProfileRepository())
+    d1 = profiles.get_by_device_id("d1")
+    assert (d1.my_clicks, d1.unlocked_cosmetics, d1.selected_cosmetic) == (10, ["default", "neon"], "neon")
+    assert profiles.get_by_device_id("d2").my_clicks == 1
+    assert global_repo.get_state().global_clicks == 11
+    assert stats.profiles == 2 and stats.snapshot_records == 0
+
+
+def test_snapshot_replaces_closed_segments(tmp_path):
+    """Test that recovery reads the snapshot plus only the journal tail"""
+    journal, profiles, global_repo, _ = _open(tmp_path)
+    clicks = ClickService(profiles, global_repo)
+    for i in range(100):
+        clicks.increment_clicks(f"d{i % 10}", 1)
+    journal.snapshot()
+    clicks.increment_clicks("d0", 5)
+    journal.stop()
+
+    assert len(list(tmp_path.glob("snapshot-*.log"))) == 1
+    _, profiles, global_repo, stats = _open(tmp_path)
+    assert stats.snapshot_records == 11  # 10 profiles + global
+    assert stats.journal_records == 2
+    assert profiles.get_by_device_id("d0").my_clicks == 15
+    assert global_repo.get_state().global_clicks == 105
+
+
+def test_torn_record_is_skipped(tmp_path):
+    """Test that a partially written last record does not block recovery"""
+    journal, profiles, global_repo, _ = _open(tmp_path)
+    ClickService(profiles, global_repo).increment_clicks("d1", 3)
+    journal.stop()
+    segment = sorted(tmp_path.glob("journal-*.log"))[-1]
+    with open(segment, "ab") as f:
+        f.write(b'["p","d1",99')
+
+    _, profiles, global_repo, _ = _open(tmp_path)
+    assert profiles.get_by_device_id("d1").my_clicks == 3
+    assert global_repo.get_state().global_clicks == 3
+
+
+def test_journal_requires_a_single_worker(tmp_path, monkeypatch):
+    """Test that workers never share a journal directory"""
+    monkeypatch.setattr(settings, "repository_mode", "inmemory")
+    monkeypatch.setattr(settings, "inmemory_journal_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "server_workers", 2)
+    monkeypatch.setattr(deps, "_profile_repo", None)
+
+    with pytest.raises(ValueError, match="SERVER_WORKERS"):
+        deps.prepare_inmemory_stores()
+    assert not any(tmp_path.iterdir())
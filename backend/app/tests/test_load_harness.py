@@ -0,0 +1,37 @@
+"""Load harness tests"""
+import asyncio
+
+from benchmarks.load import endpoint_of, generate_mix, read_log, run_in_process, write_log
+
+
+def test_mix_is_deterministic_and_mixed():
+    """Test that a seed fixes the schedule and every kind of traffic shows up"""
+    requests = generate_mix(rate=200, duration_s=2, seed=7)
+    assert requests == generate_mix(rate=200, duration_s=2, seed=7)
+    assert [r.t for r in requests] == sorted(r.t for r in requests)
+    assert {endpoint_of(r) for r in requests} == {
+        "GET /api/v1/profiles/{device_id}",
+        "GET /api/v1/state/global",
+        "POST /api/v1/clicks/increment",
+        "POST /api/v1/cosmetics/unlock",
+    }
+
+
+def test_replay_scales_time(tmp_path):
+    """Test that a recorded log replays with the same requests, N times faster"""
+    requests = generate_mix(rate=50, duration_s=1)
+    write_log(requests, tmp_path / "log.jsonl")
+    replayed = list(read_log(tmp_path / "log.jsonl", speed=4))
+    assert [(r.method, r.path, r.body) for r in replayed] == [(r.method, r.path, r.body) for r in requests]
+    assert replayed[-1].t == requests[-1].t / 4
+
+
+def test_in_process_run_reports_every_endpoint():
+    """Test a short run against the real app"""
+    requests = generate_mix(rate=40, duration_s=0.5, seed=1)
+    report = asyncio.run(run_in_process(requests, concurrency=32, label="test"))
+    summary = report.to_dict()
+    assert summary["requests"] == len(requests)
+    assert summary["error_rate"] == 0
+    for endpoint in summary["endpoints"].values():
+        assert endpoint["p50_ms"] <= endpoint["p99_ms"] <= endpoint["max_ms"]
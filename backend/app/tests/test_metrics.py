@@ -0,0 +1,100 @@
+"""Metrics registry, exposition and request instrumentation tests"""
+import threading
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.instrumentation import STATEMENT_DURATION, instrument_engine
+from app.metrics import REGISTRY, MetricsRegistry, render_prometheus
+
+
+def test_per_thread_cells_add_up():
+    """Test that counters and histograms written from many threads sum on read"""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", labelnames=("kind",))
+    histogram = registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.labels("a").inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels("a").value == 8000
+    assert histogram.snapshot()["buckets"] == [(0.1, 0), (1.0, 8000), (float("inf"), 8000)]
+    assert histogram.snapshot()["sum"] == 4000
+
+
+def test_prometheus_text_format():
+    """Test HELP/TYPE lines, label escaping, histogram series and collect hooks"""
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits", labelnames=("path",)).labels('/a"b').inc(2)
+    registry.histogram("wait_seconds", "Wait", buckets=(1.0,)).observe(0.5)
+    depth = registry.gauge("depth", "Depth")
+    registry.on_collect(lambda: depth.set(7))
+
+    text = render_prometheus(registry)
+    assert "# TYPE hits_total counter\n" in text
+    assert 'hits_total{path="/a\\"b"} 2.0\n' in text
+    assert 'wait_seconds_bucket{le="1.0"} 1\n' in text
+    assert 'wait_seconds_bucket{le="+Inf"} 1\n' in text
+    assert "wait_seconds_count 1\n" in text
+    assert "depth 7.0\n" in text
+
+
+def test_metrics_endpoint_labels_routes(client, test_device_id):
+    """Test per-route request series and business counters on /metrics"""
+    client.post("/api/v1/clicks/increment", json={"user_id": test_device_id, "delta": 3})
+    client.get(f"/api/v1/profiles/{test_device_id}")
+    client.get("/no/such/path")
+
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/clicks/increment"}' in text
+    assert 'http_requests_total{method="GET",route="/api/v1/profiles/{device_id}",status="200"}' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert "clicks_applied_total" in text
+    assert "http_requests_in_flight" in text
+
+
+def test_statement_durations_per_route(pg_client, instrumented_pg_engine):
+    """Test that statements run in the threadpool are attributed to their route"""
+    route = STATEMENT_DURATION.labels("/api/v1/state/global")
+    before = route.snapshot()["count"]
+
+    assert pg_client.get("/api/v1/state/global").status_code == 200
+
+    assert route.snapshot()["count"] > before
+    assert 'db_pool_checked_out{pool="test"}' in pg_client.get("/metrics").text
+
+
+def test_statement_durations_off_without_metrics(pg_client, instrumented_pg_engine, monkeypatch):
+    """Test that METRICS_ENABLED=false stops statement histograms on instrumented engines"""
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    route = STATEMENT_DURATION.labels("/api/v1/state/global")
+    before = route.snapshot()["count"]
+
+    assert pg_client.get("/api/v1/state/global").status_code == 200
+
+    assert route.snapshot()["count"] == before
+
+
+def test_instrumentation_can_be_removed(monkeypatch):
+    """Test that removing an engine's instrumentation drops its listeners and collect hook"""
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    engine = create_engine("sqlite://")
+    hooks = list(REGISTRY._collect_hooks)
+
+    remove = instrument_engine(engine, "removed")
+    assert engine.dispatch.after_cursor_execute
+    assert len(REGISTRY._collect_hooks) == len(hooks) + 1
+
+    remove()
+    assert not engine.dispatch.before_cursor_execute
+    assert not engine.dispatch.after_cursor_execute
+    assert REGISTRY._collect_hooks == hooks
+    engine.dispose()
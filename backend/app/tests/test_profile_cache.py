@@ -0,0 +1,150 @@
+"""Profile cache tests"""
+from dataclasses import replace
+
+from app.domain.models import Profile
+from app.events.bus import ProfileChanged
+from app.events.memory import InMemoryEventBus
+from app.repositories.cache import profile_repo as cache_module
+from app.repositories.cache.profile_repo import CachedProfileRepository, ProfileCache
+from app.repositories.memory.profile_repo import InMemoryProfileRepository
+from app.repositories.postgres.profile_repo import PostgresProfileRepository
+
+
+class CountingRepository(InMemoryProfileRepository):
+    """In-memory repository that counts get_by_device_id calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_by_device_id(self, device_id):
+        self.reads += 1
+        return super().get_by_device_id(device_id)
+
+
+def test_repeat_reads_are_hits():
+    """Test read-through caching and the hit/miss counters"""
+    inner = CountingRepository()
+    inner.create(Profile(device_id="d1"))
+    repo = CachedProfileRepository(inner, ProfileCache())
+    hits, misses = cache_module.HITS.value, cache_module.MISSES.value
+
+    for _ in range(5):
+        assert repo.get_by_device_id("d1").device_id == "d1"
+
+    assert inner.reads == 1
+    assert cache_module.HITS.value - hits == 4
+    assert cache_module.MISSES.value - misses == 1
+
+
+def test_cached_profiles_are_copies():
+    """Test that mutating a returned profile does not change the cache"""
+    inner = InMemoryProfileRepository()
+    inner.create(Profile(device_id="d1"))
+    repo = CachedProfileRepository(inner, ProfileCache())
+
+    repo.get_by_device_id("d1").unlocked_cosmetics.append("gold")
+
+    assert repo.get_by_device_id("d1").unlocked_cosmetics == ["default"]
+
+
+def test_lru_eviction():
+    """Test that the least recently used profile is evicted at capacity"""
+    cache = ProfileCache(max_entries=2)
+    evictions = cache_module.EVICTIONS.value
+    cache.put(Profile(device_id="a"))
+    cache.put(Profile(device_id="b"))
+    cache.get("a")
+    cache.put(Profile(device_id="c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache_module.EVICTIONS.value - evictions == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    """Test that entries expire after the TTL"""
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ProfileCache(ttl_seconds=5)
+    cache.put(Profile(device_id="a"))
+
+    now[0] += 4
+    assert cache.get("a") is not None
+    now[0] += 2
+    assert cache.get("a") is None
+
+
+def test_writes_refresh_cached_entry():
+    """Test that update replaces the cached profile"""
+    inner = CountingRepository()
+    inner.create(Profile(device_id="d1"))
+    repo = CachedProfileRepository(inner, ProfileCache())
+
+    profile = repo.get_by_device_id("d1")
+    profile.my_clicks = 3
+    profile.selected_cosmetic = "gold"
+    repo.update(profile)
+
+    cached = repo.get_by_device_id("d1")
+    assert (cached.my_clicks, cached.selected_cosmetic) == (3, "gold")
+    assert inner.reads == 1
+    assert not hasattr(repo, "increment_clicks")  # Mirrors the wrapped repository
+
+
+def test_remote_change_invalidates():
+    """Test that ProfileChanged from another replica drops the entry"""
+    bus = InMemoryEventBus(origin="replica-a")
+    cache = ProfileCache()
+    cache.attach(bus)
+    cache.put(Profile(device_id="d1"))
+    cache.put(Profile(device_id="d2"))
+
+    bus.publish(ProfileChanged(device_id="d1"))  # Our own write: keep it
+    bus.publish(ProfileChanged(device_id="d2", origin="replica-b"))
+
+    assert cache.get("d1") is not None
+    assert cache.get("d2") is None
+
+
+def test_stale_read_does_not_overwrite_a_write():
+    """Test that a reader that loaded before a write cannot cache its older profile"""
+    inner = InMemoryProfileRepository()
+    inner.create(Profile(device_id="d1"))
+    cache = ProfileCache()
+    writer = CachedProfileRepository(inner, cache)
+
+    class SlowReader(InMemoryProfileRepository):
+        def get_by_device_id(self, device_id):
+            profile = replace(inner.get_by_device_id(device_id))
+            # Another request writes and commits while this read is in flight
+            writer.update(replace(profile, my_clicks=7))
+            return profile
+
+    assert CachedProfileRepository(SlowReader(), cache).get_by_device_id("d1").my_clicks == 0
+
+    assert cache.get("d1").my_clicks == 7
+    # A read that started after the write is cached as usual
+    cache.invalidate("d1")
+    assert writer.get_by_device_id("d1").my_clicks == 7
+    assert cache.get("d1").my_clicks == 7
+
+
+def test_rolled_back_write_is_not_cached(pg_session_factory, pg_statements):
+    """Test commit-time caching and that hits issue no statements"""
+    cache = ProfileCache()
+
+    with pg_session_factory() as session:
+        repo = CachedProfileRepository(PostgresProfileRepository(session), cache)
+        repo.increment_clicks("d1", 5)
+        session.rollback()
+    assert cache.get("d1") is None
+
+    with pg_session_factory() as session:
+        repo = CachedProfileRepository(PostgresProfileRepository(session), cache)
+        repo.increment_clicks("d1", 2)
+        session.commit()
+
+        pg_statements.clear()
+        assert repo.get_by_device_id("d1").my_clicks == 2
+        assert pg_statements == []
@@ -0,0 +1,89 @@
+"""Statement-count tests for postgres profile loading (require TEST_DATABASE_URL)"""
+from app.domain.cosmetics import COSMETIC_IDS
+from app.domain.models import Profile
+from app.repositories.postgres.cosmetic_repo import PostgresCosmeticRepository
+from app.repositories.postgres.profile_repo import PostgresProfileRepository
+
+
+def seed(session, device_id, *cosmetic_ids):
+    repo = PostgresProfileRepository(session)
+    repo.create(Profile(device_id=device_id))
+    for cosmetic_id in cosmetic_ids:
+        repo.unlock_cosmetic(device_id, cosmetic_id)
+
+
+def test_each_profile_operation_is_one_statement(pg_session, pg_statements):
+    """Test that loads and writes return unlocked cosmetics without extra queries"""
+    seed(pg_session, "d1", "neon")
+    repo = PostgresProfileRepository(pg_session)
+
+    pg_statements.clear()
+    profile = repo.get_by_device_id("d1")
+    assert profile.unlocked_cosmetics == ["default", "neon"]
+    assert len(pg_statements) == 1
+
+    pg_statements.clear()
+    assert repo.increment_clicks("d1", 3).unlocked_cosmetics == ["default", "neon"]
+    assert len(pg_statements) == 1
+
+    pg_statements.clear()
+    profile.selected_cosmetic = "neon"
+    assert repo.update(profile).selected_cosmetic == "neon"
+    assert len(pg_statements) == 1
+
+    pg_statements.clear()
+    assert repo.unlock_cosmetic("d1", "prism").unlocked_cosmetics == ["default", "neon", "prism"]
+    assert len(pg_statements) == 1
+
+    pg_statements.clear()
+    assert repo.select_cosmetic("d1", "prism").selected_cosmetic == "prism"
+    assert len(pg_statements) == 1
+    assert repo.select_cosmetic("d1", "ember").selected_cosmetic == "prism"
+    assert repo.select_cosmetic("missing", "neon") is None
+
+    pg_statements.clear()
+    assert repo.get_by_device_id("missing") is None
+    created = repo.increment_clicks("new-device", 2)
+    assert created.my_clicks == 2
+    assert len(pg_statements) == 2
+
+    # RETURNING rows carry the written profile's unlocks only, never d1's
+    assert created.unlocked_cosmetics == ["default"]
+    assert repo.create(Profile(device_id="other-device")).unlocked_cosmetics == ["default"]
+
+
+def test_get_many_is_one_statement(pg_session, pg_statements):
+    """Test the batch loader for many device ids"""
+    for i in range(20):
+        seed(pg_session, f"d{i}", COSMETIC_IDS[1 + i % 8])
+    repo = PostgresProfileRepository(pg_session)
+
+    pg_statements.clear()
+    profiles = repo.get_many([f"d{i}" for i in range(20)] + ["missing"])
+
+    assert len(pg_statements) == 1
+    assert len(profiles) == 20
+    assert profiles["d7"].unlocked_cosmetics == ["default", COSMETIC_IDS[8]]
+
+
+def test_cosmetic_repository(pg_session, pg_statements):
+    """Test unlock and select on the cosmetic repository"""
+    seed(pg_session, "d1")
+    repo = PostgresCosmeticRepository(pg_session)
+
+    pg_statements.clear()
+    assert repo.unlock_cosmetic("d1", "neon").unlocked_cosmetics == ["default", "neon"]
+    assert repo.unlock_cosmetic("d1", "neon").unlocked_cosmetics == ["default", "neon"]
+    assert repo.set_selected_cosmetic("d1", "neon").selected_cosmetic == "neon"
+    assert len(pg_statements) == 3
+
+
+def test_profile_endpoint_statement_count(pg_client, pg_statements):
+    """Test that GET /profiles/{device_id} stays at one statement per request"""
+    pg_client.get("/api/v1/profiles/d1")  # Creates the profile
+
+    pg_statements.clear()
+    response = pg_client.get("/api/v1/profiles/d1")
+
+    assert response.status_code == 200
+    assert len(pg_statements) == 1
@@ -0,0 +1,149 @@
+"""Read replica routing tests (postgres ones require TEST_DATABASE_URL; the test database stands in for the replica)"""
+import pytest
+
+from app import database, deps
+from app.config import settings
+from app.repositories.replica.monitor import FALLBACKS, REPLICA_READS, ReplicaMonitor
+from app.tests.conftest import TEST_DATABASE_URL
+
+
+def test_monitor_states():
+    """Test lag and failure verdicts, and that a stalled checker stops routing"""
+    lag = [0.5]
+
+    def measure():
+        if lag[0] is None:
+            raise ConnectionError("replica down")
+        return lag[0]
+
+    monitor = ReplicaMonitor(measure, max_lag_ms=1000, check_interval_ms=1000)
+    assert monitor.state() == "unavailable"
+    monitor.check()
+    assert monitor.state() == "ok" and monitor.lag_ms() == 500
+
+    lag[0] = 2.0
+    monitor.check()
+    assert monitor.state() == "lagging"
+
+    lag[0] = None
+    monitor.check()
+    assert monitor.state() == "unavailable"
+
+    lag[0] = 0.0
+    monitor.check()
+    monitor.read_failed(RuntimeError("boom"))
+    assert monitor.state() == "unavailable"
+    monitor.check()
+    assert monitor.usable()
+
+    monitor._checked_at -= 10
+    assert monitor.state() == "unavailable"
+
+
+@pytest.fixture
+def replica(pg_engine, monkeypatch):
+    """DATABASE_REPLICA_URL on the test database, with a monitor that checks on demand"""
+    monkeypatch.setattr(settings, "database_replica_url", TEST_DATABASE_URL)
+    monkeypatch.setattr(database, "_replica_engine", None)
+    monkeypatch.setattr(database, "_replica_session_factory", None)
+    monitor = ReplicaMonitor(database.measure_replica_lag, max_lag_ms=1000, check_interval_ms=60_000)
+    monkeypatch.setattr(deps, "_replica_monitor", monitor)
+    yield monitor
+    if database._replica_engine is not None:
+        database._replica_engine.dispose()
+
+
+def test_reads_go_to_replica(replica, pg_client):
+    """Test that existing profiles and the global state are read from the replica"""
+    pg_client.get("/api/v1/profiles/d1")
+    reads = REPLICA_READS.value
+
+    assert pg_client.get("/api/v1/profiles/d1").json()["device_id"] == "d1"
+    state = pg_client.get("/api/v1/state/global").json()
+
+    assert REPLICA_READS.value == reads + 2
+    assert state["global_clicks"] == 0
+    assert state["max_staleness_ms"] == 0  # a primary reports no lag
+
+
+def test_missing_profile_is_created_on_primary(replica, pg_client):
+    """Test that a replica miss re-reads and creates the profile on the primary"""
+    misses = FALLBACKS.labels("miss").value
+
+    response = pg_client.get("/api/v1/profiles/new-device")
+
+    assert response.status_code == 200
+    assert FALLBACKS.labels("miss").value == misses + 1
+    assert pg_client.get("/api/v1/profiles/new-device").status_code == 200
+
+
+def test_lagging_replica_is_skipped(replica, pg_client, monkeypatch):
+    """Test that lag above REPLICA_MAX_LAG_MS sends reads to the primary"""
+    pg_client.get("/api/v1/profiles/d1")
+    monkeypatch.setattr(replica, "_measure_lag", lambda: 5.0)
+    replica.check()
+    reads, lagging = REPLICA_READS.value, FALLBACKS.labels("lagging").value
+
+    assert pg_client.get("/api/v1/profiles/d1").status_code == 200
+    state = pg_client.get("/api/v1/state/global").json()
+
+    assert REPLICA_READS.value == reads
+    assert FALLBACKS.labels("lagging").value == lagging + 2
+    assert state["max_staleness_ms"] is None
+
+
+def test_replica_error_falls_back(replica, pg_client, monkeypatch):
+    """Test that a failing replica read is served by the primary and pauses routing"""
+    pg_client.get("/api/v1/profiles/d1")
+    monkeypatch.setattr(settings, "database_replica_url", TEST_DATABASE_URL.rsplit("/", 1)[0] + "/no_such_db")
+    monkeypatch.setattr(database, "_replica_engine", None)
+    monkeypatch.setattr(database, "_replica_session_factory", None)
+    errors = FALLBACKS.labels("error").value
+
+    assert pg_client.get("/api/v1/profiles/d1").status_code == 200
+
+    assert FALLBACKS.labels("error").value == errors + 1
+    assert replica.state() == "unavailable"
+
+
+def test_exhausted_replica_pool_falls_back(replica, pg_client, monkeypatch):
+    """Test that a replica pool checkout timeout is served by the primary, not a 500"""
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_pool_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout_s", 0.1)
+    monkeypatch.setattr(database, "_replica_engine", None)
+    monkeypatch.setattr(database, "_replica_session_factory", None)
+    errors = FALLBACKS.labels("error").value
+
+    with database.get_replica_engine().connect():
+        assert pg_client.get("/api/v1/profiles/d1").status_code == 200
+
+    assert FALLBACKS.labels("error").value == errors + 1
+    assert replica.state() == "unavailable"
+
+
+def test_async_reads_go_to_replica(replica, pg_async_client, monkeypatch):
+    """Test replica routing on the asyncio engine (DATABASE_ASYNC=true)"""
+    monkeypatch.setattr(database, "_async_replica_engine", None)
+    monkeypatch.setattr(database, "_async_replica_session_factory", None)
+    monkeypatch.setattr(settings, "db_pool_mode", "pooler")  # NullPool: no connections outlive the test loop
+    pg_async_client.get("/api/v1/profiles/d1")
+    reads = REPLICA_READS.value
+
+    assert pg_async_client.get("/api/v1/profiles/d1").status_code == 200
+    assert pg_async_client.get("/api/v1/state/global").json()["max_staleness_ms"] == 0
+    assert REPLICA_READS.value == reads + 2
+
+
+def test_unreachable_async_replica_falls_back(replica, pg_async_client, monkeypatch):
+    """Test that an async replica that refuses connections is served by the primary, not a 500"""
+    monkeypatch.setattr(settings, "database_replica_url", "postgresql://postgres@127.0.0.1:1/button0_test")
+    monkeypatch.setattr(database, "_async_replica_engine", None)
+    monkeypatch.setattr(database, "_async_replica_session_factory", None)
+    monkeypatch.setattr(settings, "db_pool_mode", "pooler")  # NullPool: no connections outlive the test loop
+    errors = FALLBACKS.labels("error").value
+
+    assert pg_async_client.get("/api/v1/profiles/d1").status_code == 200
+
+    assert FALLBACKS.labels("error").value == errors + 1
+    assert replica.state() == "unavailable"
@@ -0,0 +1,43 @@
+"""Server entry point sizing tests"""
+from app import serve
+from app.config import settings
+
+
+def test_cgroup_v2_quota(tmp_path):
+    """Test reading cpu.max for limited and unlimited quotas"""
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    assert serve.cgroup_cpu_limit(tmp_path) == 2.5
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert serve.cgroup_cpu_limit(tmp_path) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    """Test the cgroup v1 fallback"""
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert serve.cgroup_cpu_limit(tmp_path) == 0.5
+    assert serve.cgroup_cpu_limit(tmp_path / "missing") is None
+
+
+def test_worker_count(monkeypatch):
+    """Test worker sizing from CPUs, the override, and the in-memory and tiering guards"""
+    monkeypatch.setattr(settings, "server_workers", 0)
+    monkeypatch.setattr(settings, "repository_mode", "postgres")
+    monkeypatch.setattr(settings, "profile_tiering", False)
+    assert serve.worker_count(0.5) == 1
+    assert serve.worker_count(3.7) == 3
+
+    monkeypatch.setattr(settings, "profile_tiering", True)
+    assert serve.worker_count(4) == 1
+
+    monkeypatch.setattr(settings, "repository_mode", "inmemory")
+    monkeypatch.setattr(settings, "inmemory_profile_shared", False)
+    assert serve.worker_count(4) == 1
+    monkeypatch.setattr(settings, "inmemory_profile_shared", True)
+    monkeypatch.setattr(settings, "inmemory_global_counter", "shared")
+    assert serve.worker_count(4) == 4
+
+    monkeypatch.setattr(settings, "server_workers", 6)
+    assert serve.worker_count(1) == 6
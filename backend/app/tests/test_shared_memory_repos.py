@@ -0,0 +1,124 @@
+"""Shared-memory (multi-worker) in-memory repository tests"""
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.deps import get_click_service, get_cosmetic_service, get_read_profile_service
+from app.main import app
+from app.repositories.interfaces import ProfileStoreFull, UnsupportedDeviceId
+from app.repositories.memory.shared_global_repo import SharedMemoryGlobalStateRepository
+from app.repositories.memory.shared_memory import unlink_segment
+from app.repositories.memory.shared_profile_repo import SharedMemoryProfileRepository
+from app.services.click_service import ClickService
+from app.services.cosmetic_service import CosmeticService
+from app.services.profile_service import ProfileService
+
+
+@pytest.fixture
+def segment_names():
+    base = f"button0-test-{uuid.uuid4().hex[:8]}"
+    names = (f"{base}-global", f"{base}-profiles")
+    yield names
+    for name in names:
+        unlink_segment(name)
+
+
+def _click_worker(names, device_ids, clicks):
+    profiles = SharedMemoryProfileRepository(names[1], capacity=1000, stripes=8)
+    global_repo = SharedMemoryGlobalStateRepository(names[0], slots=8)
+    service = ClickService(profiles, global_repo)
+    for i in range(clicks):
+        service.increment_clicks(device_ids[i % len(device_ids)], 1)
+
+
+def test_workers_share_one_state(segment_names):
+    """Test that clicks from several processes land in one count"""
+    device_ids = ["d1", "d2", "d3"]
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_click_worker, args=(segment_names, device_ids, 300))
+        for _ in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+
+    profiles = SharedMemoryProfileRepository(segment_names[1], capacity=1000, stripes=8)
+    global_repo = SharedMemoryGlobalStateRepository(segment_names[0], slots=8)
+    assert [profiles.get_by_device_id(d).my_clicks for d in device_ids] == [300, 300, 300]
+    assert global_repo.get_state().global_clicks == 900
+
+
+def test_shared_profile_table_round_trip(segment_names):
+    """Test the cosmetic flow and the table's limits"""
+    profiles = SharedMemoryProfileRepository(segment_names[1], capacity=2, stripes=1)
+    cosmetic_service = CosmeticService(profiles)
+
+    profiles.increment_clicks("d1", 2)
+    cosmetic_service.unlock_cosmetic("d1", "ember")
+    selected = cosmetic_service.select_cosmetic("d1", "ember")
+    assert (selected.my_clicks, selected.unlocked_cosmetics) == (2, ["default", "ember"])
+    assert profiles.get_by_device_id("d1").selected_cosmetic == "ember"
+    assert profiles.get_by_device_id("missing") is None
+
+    profiles.increment_clicks("d2", 1)
+    with pytest.raises(ProfileStoreFull):
+        profiles.increment_clicks("d3", 1)
+    with pytest.raises(UnsupportedDeviceId):
+        profiles.get_by_device_id("x" * 200)
+
+    with pytest.raises(ValueError):
+        SharedMemoryProfileRepository(segment_names[1], capacity=4, stripes=1)
+
+
+def test_table_limits_are_not_server_errors(segment_names):
+    """Test that long device ids get 422 and a full table 503 at the endpoints"""
+    profiles = SharedMemoryProfileRepository(segment_names[1], capacity=1, stripes=1)
+    global_repo = SharedMemoryGlobalStateRepository(segment_names[0], slots=1)
+    app.dependency_overrides[get_click_service] = lambda: ClickService(profiles, global_repo)
+    app.dependency_overrides[get_read_profile_service] = lambda: ProfileService(profiles)
+    app.dependency_overrides[get_cosmetic_service] = lambda: CosmeticService(profiles)
+    try:
+        with TestClient(app) as client:
+            long_id = "x" * 200
+            response = client.post("/api/v1/clicks/increment", json={"user_id": long_id})
+            assert response.status_code == 422
+            assert client.get(f"/api/v1/profiles/{long_id}").status_code == 422
+            response = client.put(
+                "/api/v1/cosmetics/selected", json={"device_id": long_id, "selected_cosmetic": "default"}
+            )
+            assert response.status_code == 422
+
+            assert client.post("/api/v1/clicks/increment", json={"user_id": "d1"}).status_code == 200
+            response = client.post("/api/v1/clicks/increment", json={"user_id": "d2"})
+            assert response.status_code == 503
+            assert client.get("/api/v1/profiles/d2").status_code == 503
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_postgres_mode_opens_no_segments(segment_names):
+    """Test that leftover shared-store settings create nothing outside inmemory mode"""
+    base = segment_names[1].rsplit("-", 1)[0]
+    env = {
+        **os.environ,
+        "REPOSITORY_MODE": "postgres",
+        "INMEMORY_PROFILE_SHARED": "true",
+        "INMEMORY_GLOBAL_COUNTER": "shared",
+        "INMEMORY_SHARED_NAME": base,
+    }
+    code = "import app.main, app.deps; app.deps.get_click_writer"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+    for name in segment_names:
+        assert not Path(f"/dev/shm/{name}").exists()
+        assert not (Path(tempfile.gettempdir()) / f"{name}.lock").exists()
@@ -0,0 +1,57 @@
+"""Per-endpoint SQL statement budgets in postgres mode (require TEST_DATABASE_URL)"""
+import logging
+
+from app.config import settings
+
+
+def test_profile_budget(pg_client, max_queries):
+    """Test that a profile load is one statement, plus one insert on first sight"""
+    with max_queries(2):
+        assert pg_client.get("/api/v1/profiles/d1").status_code == 200
+    with max_queries(1):
+        assert pg_client.get("/api/v1/profiles/d1").status_code == 200
+
+
+def test_click_budgets(pg_client, max_queries):
+    """Test the single-click and batch write paths"""
+    with max_queries(1):
+        response = pg_client.post("/api/v1/clicks/increment", json={"user_id": "d1", "delta": 2})
+        assert response.status_code == 200
+    with max_queries(2):
+        response = pg_client.post(
+            "/api/v1/clicks/increment-batch",
+            json={"clicks": [{"user_id": "d1"}, {"user_id": "d2"}, {"user_id": "d3"}]},
+        )
+        assert response.status_code == 200
+
+
+def test_cosmetic_budgets(pg_client, max_queries):
+    """Test that unlock and select are one statement each"""
+    pg_client.get("/api/v1/profiles/d1")
+    with max_queries(1):
+        response = pg_client.post("/api/v1/cosmetics/unlock", json={"device_id": "d1", "cosmetic_id": "neon"})
+        assert response.status_code == 200
+    with max_queries(1):
+        response = pg_client.put(
+            "/api/v1/cosmetics/selected", json={"device_id": "d1", "selected_cosmetic": "neon"}
+        )
+        assert response.status_code == 200
+
+
+def test_global_state_budget(pg_client, max_queries):
+    """Test that reading the global counter is one statement once its row exists"""
+    pg_client.get("/api/v1/state/global")
+    with max_queries(1):
+        assert pg_client.get("/api/v1/state/global").status_code == 200
+
+
+def test_server_timing_and_slow_statements(pg_client, instrumented_pg_engine, monkeypatch, caplog):
+    """Test the debug Server-Timing header and the slow statement log"""
+    monkeypatch.setattr(settings, "debug", True)
+    monkeypatch.setattr(settings, "db_slow_statement_ms", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        response = pg_client.get("/api/v1/profiles/d1")
+
+    assert 'desc="2 statements"' in response.headers["server-timing"]
+    assert "route /api/v1/profiles/{device_id}" in caplog.text
@@ -0,0 +1,56 @@
+"""Tiered (hot memory / cold Postgres) profile repository tests"""
+import pytest
+
+from app.domain.models import Profile
+from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
+from app.repositories.postgres.profile_repo import PostgresProfileRepository
+from app.repositories.tiered.profile_repo import TieredProfileRepository
+from app.services.click_service import ClickService
+from app.services.cosmetic_service import CosmeticService
+
+
+def _stored(pg_session_factory, device_id):
+    with pg_session_factory() as session:
+        return PostgresProfileRepository(session).get_by_device_id(device_id)
+
+
+def test_hot_profiles_skip_the_database(pg_session_factory, pg_statements):
+    """Test that resident profiles are served without statements until write-back"""
+    tier = TieredProfileRepository(pg_session_factory, max_entries=10)
+    clicks = ClickService(tier, InMemoryGlobalStateRepository())
+
+    clicks.increment_clicks("d1", 1)  # Miss: one load
+    pg_statements.clear()
+    for _ in range(9):
+        clicks.increment_clicks("d1", 1)
+    CosmeticService(tier).unlock_cosmetic("d1", "neon")
+    assert pg_statements == []
+    assert _stored(pg_session_factory, "d1") is None
+
+    assert tier.flush() == 1
+    stored = _stored(pg_session_factory, "d1")
+    assert (stored.my_clicks, stored.unlocked_cosmetics) == (10, ["default", "neon"])
+
+
+def test_evicted_profiles_reload_from_postgres(pg_session_factory):
+    """Test that the hot set stays bounded and evicted profiles come back intact"""
+    tier = TieredProfileRepository(pg_session_factory, max_entries=2)
+    for i in range(5):
+        tier.increment_clicks(f"d{i}", i + 1)
+    assert len(tier) == 2
+
+    # Evicted before any write-back: still served from the parked copy
+    assert tier.get_by_device_id("d0").my_clicks == 1
+    tier.flush()
+
+    fresh = TieredProfileRepository(pg_session_factory, max_entries=2)
+    assert [fresh.get_by_device_id(f"d{i}").my_clicks for i in range(5)] == [1, 2, 3, 4, 5]
+    assert fresh.get_by_device_id("missing") is None
+
+
+def test_update_missing_profile_raises(pg_session_factory):
+    """Test that update keeps the repository contract for unknown devices"""
+    tier = TieredProfileRepository(pg_session_factory)
+    with pytest.raises(ValueError):
+        tier.update(Profile(device_id="missing"))
+    assert tier.unlock_cosmetic("missing", "neon") is None
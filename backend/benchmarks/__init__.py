@@ -0,0 +1 @@
+"""Performance benchmarks (run from backend/: python -m benchmarks.<name>)"""
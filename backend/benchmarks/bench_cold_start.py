@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark.
+
+Starts fresh interpreters and measures how long `import app.main` takes
+and how long until the app (lifespan included) answers its first
+request, per repository mode. Also lists the slowest imports.
+
+    python -m benchmarks.bench_cold_start --runs 5 --modes inmemory postgres
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/healthz")
+    first_response = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (first_response - started) * 1000,
+    "sqlalchemy_loaded": "sqlalchemy" in sys.modules,
+}))
+"""
+
+
+def run_once(mode: str) -> dict:
+    env = {**os.environ, "REPOSITORY_MODE": mode}
+    child = subprocess.run(
+        [sys.executable, "-c", _CHILD], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(mode: str, top: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) of the slowest app.* imports"""
+    env = {**os.environ, "REPOSITORY_MODE": mode}
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in child.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and module.strip().startswith("app."):
+            rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["inmemory", "postgres"])
+    parser.add_argument("--top", type=int, default=5, help="slowest app imports to list")
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<10} {'import ms':>10} {'first response ms':>18} {'sqlalchemy':>11}")
+    for mode in args.modes:
+        results = [run_once(mode) for _ in range(args.runs)]
+        print(
+            f"{mode:<10} {statistics.median(r['import_ms'] for r in results):>10.0f} "
+            f"{statistics.median(r['first_response_ms'] for r in results):>18.0f} "
+            f"{'loaded' if results[0]['sqlalchemy_loaded'] else 'not loaded':>11}"
+        )
+    for mode in args.modes:
+        print(f"\nslowest app imports ({mode}, cumulative):")
+        for micros, module in slowest_imports(mode, args.top):
+            print(f"  {micros / 1000:>8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+In-memory repository contention benchmark.
+
+Runs the ClickService click path from many threads at once against the
+single-lock repositories and the striped / per-thread ones, and reports
+throughput plus lost updates (clicks missing from the final totals).
+
+    python -m benchmarks.bench_inmemory_contention --threads 64 --ops 5000
+"""
+import argparse
+import sys
+import threading
+import time
+
+from app.repositories.memory.global_repo import (
+    InMemoryGlobalStateRepository,
+    PerThreadInMemoryGlobalStateRepository,
+)
+from app.repositories.memory.profile_repo import (
+    InMemoryProfileRepository,
+    StripedInMemoryProfileRepository,
+)
+from app.services.click_service import ClickService
+
+VARIANTS = {
+    "single-lock": lambda: (InMemoryProfileRepository(), InMemoryGlobalStateRepository()),
+    "striped+per-thread": lambda: (
+        StripedInMemoryProfileRepository(stripes=64),
+        PerThreadInMemoryGlobalStateRepository(),
+    ),
+}
+
+
+def run(variant: str, threads: int, ops: int, devices: int) -> dict:
+    profile_repo, global_repo = VARIANTS[variant]()
+    service = ClickService(profile_repo, global_repo)
+    device_ids = [f"device-{i}" for i in range(devices)]
+    start = threading.Barrier(threads + 1)
+
+    def worker(offset: int) -> None:
+        start.wait()
+        for i in range(ops):
+            service.increment_clicks(device_ids[(offset + i * 7919) % devices], 1)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    expected = threads * ops
+    profile_total = sum(
+        profile.my_clicks
+        for profile in map(profile_repo.get_by_device_id, device_ids)
+        if profile is not None
+    )
+    return {
+        "variant": variant,
+        "ops_per_sec": expected / elapsed,
+        "lost_profile_clicks": expected - profile_total,
+        "lost_global_clicks": expected - global_repo.get_state().global_clicks,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--ops", type=int, default=5000, help="clicks per thread")
+    parser.add_argument("--devices", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    gil = "enabled" if getattr(sys, "_is_gil_enabled", lambda: True)() else "disabled"
+    print(f"python {sys.version.split()[0]}, GIL {gil}, {args.threads} threads x {args.ops} clicks")
+    print(f"{'variant':<20} {'ops/sec':>12} {'lost(profile)':>14} {'lost(global)':>13}")
+    for variant in VARIANTS:
+        result = run(variant, args.threads, args.ops, args.devices)
+        print(
+            f"{result['variant']:<20} {result['ops_per_sec']:>12,.0f} "
+            f"{result['lost_profile_clicks']:>14} {result['lost_global_clicks']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+In-memory journal startup benchmark.
+
+Writes journals of increasing length (clicks spread over a fixed device
+population) and measures recovery time from the raw journal and from a
+snapshot plus a short journal tail.
+
+    python -m benchmarks.bench_journal_startup --records 100000 1000000 --devices 100000
+"""
+import argparse
+import tempfile
+import time
+
+from app.repositories.memory.global_repo import InMemoryGlobalStateRepository
+from app.repositories.memory.journal import (
+    InMemoryJournal,
+    JournaledGlobalStateRepository,
+    JournaledProfileRepository,
+)
+from app.repositories.memory.profile_repo import StripedInMemoryProfileRepository
+from app.services.click_service import ClickService
+
+
+def _recover(directory: str):
+    journal = InMemoryJournal(directory)
+    stores = StripedInMemoryProfileRepository(), InMemoryGlobalStateRepository()
+    stats = journal.recover(*stores)
+    return journal, stores, stats
+
+
+def run(records: int, devices: int, tail: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        journal, (profile_store, global_store), _ = _recover(directory)
+        service = ClickService(
+            JournaledProfileRepository(profile_store, journal),
+            JournaledGlobalStateRepository(global_store, journal),
+        )
+        clicks = records // 2  # Each click journals a profile and a global record
+        for i in range(clicks):
+            service.increment_clicks(f"{(i * 7919) % devices:032x}", 1)
+            if i % 10_000 == 0:
+                journal.flush()
+        journal.stop()
+        size = sum(p.stat().st_size for p in journal.directory.iterdir())
+
+        journal, _, journal_only = _recover(directory)
+        journal.snapshot()
+        journal.stop()
+
+        journal, (profile_store, global_store), _ = _recover(directory)
+        service = ClickService(
+            JournaledProfileRepository(profile_store, journal),
+            JournaledGlobalStateRepository(global_store, journal),
+        )
+        for i in range(tail // 2):
+            service.increment_clicks(f"{i % devices:032x}", 1)
+        journal.stop()
+
+        began = time.perf_counter()
+        _, _, with_snapshot = _recover(directory)
+        snapshot_seconds = time.perf_counter() - began
+
+    return {
+        "records": records,
+        "journal_mib": size / 2**20,
+        "journal_only_s": journal_only.seconds,
+        "snapshot_tail_s": snapshot_seconds,
+        "profiles": with_snapshot.profiles,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--devices", type=int, default=100_000)
+    parser.add_argument("--tail", type=int, default=10_000, help="journal records after the snapshot")
+    args = parser.parse_args(argv)
+
+    print(f"{'records':>12} {'journal MiB':>12} {'journal-only s':>15} {'snapshot+tail s':>16} {'profiles':>10}")
+    for records in args.records:
+        result = run(records, args.devices, args.tail)
+        print(
+            f"{result['records']:>12,} {result['journal_mib']:>12,.1f} "
+            f"{result['journal_only_s']:>15.2f} {result['snapshot_tail_s']:>16.2f} "
+            f"{result['profiles']:>10,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
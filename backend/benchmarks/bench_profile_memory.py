@@ -0,0 +1,77 @@
+"""
+In-memory profile store memory benchmark.
+
+Fills each store with N profiles (32-character device ids, like UUID hex)
+in a fresh subprocess and reports resident memory per profile.
+
+    python -m benchmarks.bench_profile_memory --counts 1000000 10000000
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+
+STORES = {
+    "dataclass": "app.repositories.memory.profile_repo:InMemoryProfileRepository",
+    "striped": "app.repositories.memory.profile_repo:StripedInMemoryProfileRepository",
+    "compact": "app.repositories.memory.compact_profile_repo:CompactInMemoryProfileRepository",
+}
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(store: str, count: int) -> dict:
+    """Populate one store in this process; returns bytes per profile"""
+    import importlib
+
+    from app.domain.models import Profile
+
+    module_name, class_name = STORES[store].split(":")
+    repo = getattr(importlib.import_module(module_name), class_name)()
+    gc.collect()
+    before = _rss_bytes()
+    for i in range(count):
+        repo.create(Profile(device_id=f"{i:032x}"))
+    gc.collect()
+    used = _rss_bytes() - before
+    return {"store": store, "count": count, "bytes_per_profile": used / count}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--stores", nargs="+", default=list(STORES), choices=list(STORES))
+    parser.add_argument("--child", nargs=2, metavar=("STORE", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], int(args.child[1]))))
+        return
+
+    print(f"{'store':<12} {'profiles':>12} {'bytes/profile':>14} {'total MiB':>10}")
+    for count in args.counts:
+        for store in args.stores:
+            # One process per run so earlier runs don't skew RSS
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_profile_memory", "--child", store, str(count)],
+                capture_output=True,
+                text=True,
+            )
+            if child.returncode != 0:
+                print(f"{store:<12} {count:>12,} {'failed':>14}  {child.stderr.strip()[-80:]}")
+                continue
+            result = json.loads(child.stdout)
+            per_profile = result["bytes_per_profile"]
+            print(
+                f"{store:<12} {count:>12,} {per_profile:>14,.0f} "
+                f"{per_profile * count / 2**20:>10,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
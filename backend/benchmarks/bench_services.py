@@ -0,0 +1,212 @@
+"""
+Service and repository micro-benchmarks.
+
+Times the service calls on the click and cosmetic paths against each
+repository family and reports ops/sec with p50/p99 latency. Postgres runs
+only when BENCH_DATABASE_URL points at a throwaway database (its tables are
+created and dropped); each Postgres call gets its own session and commit,
+as a request would.
+
+    python -m benchmarks.bench_services --save benchmarks/baselines/local.json
+    python -m benchmarks.bench_services --compare benchmarks/baselines/local.json
+
+or under pytest (BENCH_OPS per case, BENCH_BASELINE to fail on regressions):
+
+    python -m pytest -s benchmarks/bench_services.py
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from app.domain import cosmetics
+from app.repositories.memory.global_repo import (
+    InMemoryGlobalStateRepository,
+    PerThreadInMemoryGlobalStateRepository,
+)
+from app.repositories.memory.profile_repo import (
+    InMemoryProfileRepository,
+    StripedInMemoryProfileRepository,
+)
+from app.services.click_service import ClickService
+from app.services.cosmetic_service import CosmeticService
+from app.services.profile_service import ProfileService
+from benchmarks.harness import (
+    Result,
+    compare,
+    load_baseline,
+    measure,
+    print_comparison,
+    print_results,
+    save_baseline,
+)
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "")
+DEVICES = [f"{i:032x}" for i in range(1000)]
+UNLOCKABLE = cosmetics.COSMETIC_IDS[1:]
+
+# action(click_service, profile_service, cosmetic_service, i)
+Action = Callable[[ClickService, ProfileService, CosmeticService, int], object]
+# run(action, i): performs one call with fresh or shared services
+Runner = Callable[[Action, int], object]
+
+CASES: dict[str, Action] = {
+    "click_service.increment_clicks": lambda c, p, k, i: c.increment_clicks(DEVICES[i % 1000], 1),
+    "profile_service.get_or_create_profile": lambda c, p, k, i: p.get_or_create_profile(DEVICES[i % 1000]),
+    "cosmetic_service.unlock_cosmetic": lambda c, p, k, i: k.unlock_cosmetic(
+        DEVICES[i % 1000], UNLOCKABLE[i % len(UNLOCKABLE)]
+    ),
+    "cosmetic_service.select_cosmetic": lambda c, p, k, i: k.select_cosmetic(
+        DEVICES[i % 1000], "neon" if i % 2 else "default"
+    ),
+}
+
+
+def _inmemory_runner(profile_repo, global_repo) -> Runner:
+    services = (
+        ClickService(profile_repo, global_repo),
+        ProfileService(profile_repo),
+        CosmeticService(profile_repo),
+    )
+    return lambda action, i: action(*services, i)
+
+
+def _postgres_runner(session_factory) -> Runner:
+    from app.repositories.postgres.global_repo import PostgresGlobalStateRepository
+    from app.repositories.postgres.profile_repo import PostgresProfileRepository
+
+    def run(action: Action, i: int):
+        with session_factory() as session:
+            profiles = PostgresProfileRepository(session)
+            result = action(
+                ClickService(profiles, PostgresGlobalStateRepository(session)),
+                ProfileService(profiles),
+                CosmeticService(profiles),
+                i,
+            )
+            session.commit()
+            return result
+
+    return run
+
+
+class Backends:
+    """Builds each repository family and cleans up the throwaway database"""
+
+    def __init__(self):
+        self._engine = None
+
+    def names(self) -> list[str]:
+        return ["inmemory", "inmemory-striped"] + (["postgres"] if BENCH_DATABASE_URL else [])
+
+    def create(self, name: str) -> Runner:
+        if name == "inmemory":
+            runner = _inmemory_runner(InMemoryProfileRepository(), InMemoryGlobalStateRepository())
+        elif name == "inmemory-striped":
+            runner = _inmemory_runner(
+                StripedInMemoryProfileRepository(), PerThreadInMemoryGlobalStateRepository()
+            )
+        elif name == "postgres":
+            runner = _postgres_runner(self._postgres_session_factory())
+        else:
+            raise ValueError(f"Unknown backend {name}")
+        # Every device exists and has "neon" unlocked, so every case hits the common path
+        for i in range(len(DEVICES)):
+            runner(lambda c, p, k, i: p.get_or_create_profile(DEVICES[i]), i)
+            runner(lambda c, p, k, i: k.unlock_cosmetic(DEVICES[i], "neon"), i)
+        return runner
+
+    def _postgres_session_factory(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from app.models import Base
+
+        if self._engine is None:
+            self._engine = create_engine(BENCH_DATABASE_URL)
+            Base.metadata.drop_all(self._engine)
+            Base.metadata.create_all(self._engine)
+        return sessionmaker(bind=self._engine, expire_on_commit=False)
+
+    def close(self) -> None:
+        if self._engine is not None:
+            from app.models import Base
+
+            Base.metadata.drop_all(self._engine)
+            self._engine.dispose()
+            self._engine = None
+
+
+def run_suite(backends: Backends, names: list[str], ops: int, postgres_ops: int) -> list[Result]:
+    results = []
+    for backend in names:
+        runner = backends.create(backend)
+        count = postgres_ops if backend == "postgres" else ops
+        for case, action in CASES.items():
+            results.append(measure(
+                f"{backend}/{case}",
+                lambda i: runner(action, i),
+                ops=count,
+                warmup=min(500, count // 10),
+            ))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    backends = Backends()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=backends.names())
+    parser.add_argument("--ops", type=int, default=20_000, help="calls per in-memory case")
+    parser.add_argument("--postgres-ops", type=int, default=1_000, help="calls per postgres case")
+    parser.add_argument("--save", type=Path, help="write results as a baseline")
+    parser.add_argument("--compare", type=Path, help="compare with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="throughput change treated as noise")
+    args = parser.parse_args(argv)
+
+    try:
+        results = run_suite(backends, args.backends, args.ops, args.postgres_ops)
+    finally:
+        backends.close()
+    print_results(results)
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"\nbaseline saved to {args.save}")
+    if args.compare:
+        comparisons = compare(results, load_baseline(args.compare), args.tolerance)
+        print()
+        print_comparison(comparisons)
+        if any(c.verdict == "slower" for c in comparisons):
+            return 1
+    return 0
+
+
+# pytest entry point -------------------------------------------------------
+
+_backends = Backends()
+
+
+@pytest.fixture(scope="module", params=_backends.names())
+def bench_runner(request):
+    yield request.param, _backends.create(request.param)
+    if request.param == "postgres":
+        _backends.close()
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_benchmark(bench_runner, case):
+    backend, runner = bench_runner
+    ops = int(os.getenv("BENCH_OPS", "2000"))
+    result = measure(f"{backend}/{case}", lambda i: runner(CASES[case], i), ops=ops, warmup=ops // 10)
+    print_results([result])
+
+    baseline_path = os.getenv("BENCH_BASELINE")
+    if baseline_path:
+        for comparison in compare([result], load_baseline(Path(baseline_path))):
+            assert comparison.verdict != "slower", f"{result.name}: {comparison.change:+.1%} vs baseline"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
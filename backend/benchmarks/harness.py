@@ -0,0 +1,127 @@
+"""
+Micro-benchmark harness: timing, percentiles and saved baselines.
+
+`measure` times each call of an operation, `save_baseline` writes results
+as JSON and `compare` reports the change against a saved run.
+"""
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+@dataclass
+class Result:
+    name: str
+    ops: int
+    seconds: float
+    p50_us: float
+    p99_us: float
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.seconds if self.seconds else 0.0
+
+
+def _percentile(sorted_ns: list[int], fraction: float) -> float:
+    index = min(len(sorted_ns) - 1, int(fraction * len(sorted_ns)))
+    return sorted_ns[index] / 1000
+
+
+def measure(
+    name: str,
+    operation: Callable[[int], object],
+    ops: int = 10_000,
+    warmup: int = 500,
+    repeat: int = 3,
+) -> Result:
+    """
+    Call operation(i) for i in range(ops), `repeat` times, and keep the
+    fastest run (the one least disturbed by the rest of the machine).
+    """
+    for i in range(warmup):
+        operation(i)
+    best: Result | None = None
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        samples = [0] * ops
+        began = clock()
+        for i in range(ops):
+            start = clock()
+            operation(i)
+            samples[i] = clock() - start
+        elapsed = (clock() - began) / 1e9
+        samples.sort()
+        run = Result(name, ops, elapsed, _percentile(samples, 0.50), _percentile(samples, 0.99))
+        if best is None or run.ops_per_sec > best.ops_per_sec:
+            best = run
+    return best
+
+
+def print_results(results: Iterable[Result]) -> None:
+    print(f"{'benchmark':<56} {'ops/sec':>12} {'p50 us':>9} {'p99 us':>9}")
+    for result in results:
+        print(
+            f"{result.name:<56} {result.ops_per_sec:>12,.0f} "
+            f"{result.p50_us:>9.1f} {result.p99_us:>9.1f}"
+        )
+
+
+def save_baseline(results: Iterable[Result], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({r.name: asdict(r) for r in results}, indent=2) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, Result]:
+    return {name: Result(**fields) for name, fields in json.loads(path.read_text()).items()}
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_ops_per_sec: float
+    ops_per_sec: float
+    baseline_p99_us: float
+    p99_us: float
+    tolerance: float
+
+    @property
+    def change(self) -> float:
+        """Relative throughput change (+0.10 = 10% faster)"""
+        return self.ops_per_sec / self.baseline_ops_per_sec - 1
+
+    @property
+    def verdict(self) -> str:
+        if self.change < -self.tolerance:
+            return "slower"
+        if self.change > self.tolerance:
+            return "faster"
+        return "same"
+
+
+def compare(
+    results: Iterable[Result], baseline: dict[str, Result], tolerance: float = 0.10
+) -> list[Comparison]:
+    """Compare results with a baseline; changes within `tolerance` count as noise"""
+    return [
+        Comparison(
+            result.name,
+            baseline[result.name].ops_per_sec,
+            result.ops_per_sec,
+            baseline[result.name].p99_us,
+            result.p99_us,
+            tolerance,
+        )
+        for result in results
+        if result.name in baseline
+    ]
+
+
+def print_comparison(comparisons: Iterable[Comparison]) -> None:
+    print(f"{'benchmark':<56} {'baseline/s':>12} {'now/s':>12} {'change':>8} {'p99 us':>15}  verdict")
+    for c in comparisons:
+        print(
+            f"{c.name:<56} {c.baseline_ops_per_sec:>12,.0f} {c.ops_per_sec:>12,.0f} "
+            f"{c.change:>+8.1%} {c.baseline_p99_us:>6.1f} -> {c.p99_us:<6.1f}  {c.verdict}"
+        )
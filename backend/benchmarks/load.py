@@ -0,0 +1,324 @@
+"""
+End-to-end load harness.
+
+Drives the real app with a realistic traffic mix, or replays a recorded
+request log, and reports throughput plus per-endpoint latency percentiles
+and error rates. The schedule is open-loop: requests go out at their
+planned times whether or not earlier ones have answered, and latency is
+measured from the planned time, so queueing inside the app shows up in
+the percentiles instead of silently slowing the generator down.
+
+    # in-process (ASGI, lifespan included), one child interpreter per mode
+    python -m benchmarks.load --modes inmemory postgres --rate 500 --duration 20
+
+    # over a socket against a running server (python -m app.serve)
+    python -m benchmarks.load --url http://127.0.0.1:8000 --rate 500
+
+    # record the generated schedule, then replay it 4x faster
+    python -m benchmarks.load --record /tmp/mix.jsonl --duration 60
+    python -m benchmarks.load --replay /tmp/mix.jsonl --speed 4
+
+Request logs are JSON lines: {"t": seconds since start, "method": "POST",
+"path": "/api/v1/clicks/increment", "body": {...}} (body optional).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import httpx
+
+from app.domain import cosmetics
+
+API = "/api/v1"
+
+
+@dataclass
+class Request:
+    t: float  # seconds after the start of the run
+    method: str
+    path: str
+    body: dict | None = None
+
+
+@dataclass
+class Mix:
+    """Share of arrivals per kind of traffic (normalised, need not sum to 1)"""
+    hot_burst: float = 0.15  # one of a few hot devices spams a burst of clicks
+    new_device: float = 0.30  # a first-time id loads its profile, then clicks
+    poll_global: float = 0.45  # a client polls /state/global
+    unlock: float = 0.10  # a known device unlocks a cosmetic
+    hot_devices: int = 5
+    burst_clicks: int = 20
+    burst_interval_s: float = 0.02
+
+
+def generate_mix(rate: float, duration_s: float, mix: Mix = Mix(), seed: int = 0) -> list[Request]:
+    """Poisson arrivals at `rate` per second; bursts add their extra clicks on top"""
+    rng = random.Random(seed)
+    hot = [f"hot-{i:02d}-{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}" for i in range(mix.hot_devices)]
+    requests: list[Request] = [Request(0.0, "GET", f"{API}/profiles/{device}") for device in hot]
+    known: list[tuple[float, str]] = []  # (first seen, device) of long-tail devices
+    kinds = ["hot_burst", "new_device", "poll_global", "unlock"]
+    weights = [mix.hot_burst, mix.new_device, mix.poll_global, mix.unlock]
+    unlockable = cosmetics.COSMETIC_IDS[1:]
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration_s:
+            break
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "hot_burst":
+            device = rng.choice(hot)
+            for n in range(mix.burst_clicks):
+                requests.append(_click(t + n * mix.burst_interval_s, device))
+        elif kind == "new_device":
+            device = uuid.UUID(int=rng.getrandbits(128)).hex
+            known.append((t, device))
+            requests.append(Request(t, "GET", f"{API}/profiles/{device}"))
+            requests.append(_click(t + 0.05, device))
+        elif kind == "poll_global":
+            requests.append(Request(t, "GET", f"{API}/state/global"))
+        else:
+            # Unlocks come from devices that have been around a while, or hot ones
+            first_seen, device = rng.choice(known) if known else (t, rng.choice(hot))
+            if t - first_seen < 1.0:
+                device = rng.choice(hot)
+            requests.append(Request(t, "POST", f"{API}/cosmetics/unlock", {
+                "device_id": device, "cosmetic_id": rng.choice(unlockable),
+            }))
+    return sorted((r for r in requests if r.t < duration_s), key=lambda r: r.t)
+
+
+def _click(t: float, device: str) -> Request:
+    return Request(t, "POST", f"{API}/clicks/increment", {"user_id": device, "delta": 1})
+
+
+def write_log(requests: Iterable[Request], path: Path) -> None:
+    with path.open("w") as f:
+        for request in requests:
+            f.write(json.dumps({k: v for k, v in asdict(request).items() if v is not None}) + "\n")
+
+
+def read_log(path: Path, speed: float = 1.0) -> Iterator[Request]:
+    """Requests from a log, with their times divided by `speed` (rebased to start at 0)"""
+    start = None
+    with path.open() as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            start = entry["t"] if start is None else start
+            yield Request((entry["t"] - start) / speed, entry["method"], entry["path"], entry.get("body"))
+
+
+_DEVICE_PATH = re.compile(rf"^{API}/profiles/[^/]+$")
+
+
+def endpoint_of(request: Request) -> str:
+    path = request.path.split("?", 1)[0]
+    if _DEVICE_PATH.match(path):
+        path = f"{API}/profiles/{{device_id}}"
+    return f"{request.method} {path}"
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    failures: int = 0  # no response at all (connection error, timeout)
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms) + self.failures
+
+    @property
+    def errors(self) -> int:
+        """Server errors and failed requests; 4xx are the client's problem and reported apart"""
+        return self.failures + sum(n for status, n in self.statuses.items() if status >= 500)
+
+    def percentile(self, fraction: float) -> float:
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+@dataclass
+class Report:
+    label: str
+    seconds: float
+    endpoints: dict[str, EndpointStats]
+
+    @property
+    def requests(self) -> int:
+        return sum(s.count for s in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(s.errors for s in self.endpoints.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "seconds": self.seconds,
+            "requests": self.requests,
+            "requests_per_sec": self.requests / self.seconds if self.seconds else 0.0,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "endpoints": {
+                name: {
+                    "count": s.count,
+                    "p50_ms": s.percentile(0.50),
+                    "p95_ms": s.percentile(0.95),
+                    "p99_ms": s.percentile(0.99),
+                    "max_ms": max(s.latencies_ms, default=0.0),
+                    "errors": s.errors,
+                    "statuses": dict(s.statuses),
+                }
+                for name, s in sorted(self.endpoints.items())
+            },
+        }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    requests: Iterable[Request],
+    concurrency: int = 256,
+    label: str = "",
+) -> Report:
+    """
+    Send each request at its planned time. At most `concurrency` are in
+    flight; beyond that they wait, and the wait counts toward their latency.
+    """
+    stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    slots = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def send(request: Request, planned: float) -> None:
+        endpoint = stats[endpoint_of(request)]
+        async with slots:
+            try:
+                response = await client.request(request.method, request.path, json=request.body)
+            except httpx.HTTPError:
+                endpoint.failures += 1
+                return
+        endpoint.latencies_ms.append((loop.time() - planned) * 1000)
+        endpoint.statuses[response.status_code] += 1
+
+    tasks = []
+    for request in requests:
+        planned = started + request.t
+        delay = planned - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(request, planned)))
+    await asyncio.gather(*tasks)
+    return Report(label, loop.time() - started, dict(stats))
+
+
+async def run_in_process(requests: Iterable[Request], concurrency: int, label: str) -> Report:
+    """Against app.main:app over ASGI, with its lifespan (startup recovery, flushers) running"""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        # Unhandled app errors become 500s in the report instead of aborting the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            return await run_load(client, requests, concurrency, label)
+
+
+async def run_over_socket(url: str, requests: Iterable[Request], concurrency: int, label: str) -> Report:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        return await run_load(client, requests, concurrency, label)
+
+
+def print_report(report: Report) -> None:
+    summary = report.to_dict()
+    print(
+        f"\n{summary['label']}: {summary['requests']} requests in {summary['seconds']:.1f}s "
+        f"= {summary['requests_per_sec']:,.0f} req/s, error rate {summary['error_rate']:.2%}"
+    )
+    print(f"{'endpoint':<42} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}  statuses")
+    for name, e in summary["endpoints"].items():
+        statuses = " ".join(f"{status}:{n}" for status, n in sorted(e["statuses"].items()))
+        print(
+            f"{name:<42} {e['count']:>7} {e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} "
+            f"{e['p99_ms']:>8.1f} {e['max_ms']:>8.1f} {e['errors']:>7}  {statuses}"
+        )
+
+
+def _requests(args) -> list[Request]:
+    if args.replay:
+        return list(read_log(args.replay, args.speed))
+    return generate_mix(args.rate, args.duration, seed=args.seed)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=None,
+                        help="REPOSITORY_MODE values to run in-process, one child interpreter each")
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--rate", type=float, default=200, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of generated traffic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", type=Path, help="replay a request log instead of generating traffic")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed-up factor")
+    parser.add_argument("--record", type=Path, help="write the request schedule as a log and exit")
+    parser.add_argument("--concurrency", type=int, default=256, help="max requests in flight")
+    parser.add_argument("--output", type=Path, help="also write the report(s) as JSON")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        write_log(_requests(args), args.record)
+        return
+    if args.modes:
+        # Settings are read at import, so each mode gets a fresh interpreter
+        child_args = _without_option(sys.argv[1:] if argv is None else argv, "--modes")
+        for mode in args.modes:
+            env = {**os.environ, "REPOSITORY_MODE": mode}
+            output = ["--output", f"{args.output}.{mode}"] if args.output else []
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.load", *_without_option(child_args, "--output"), *output],
+                env=env, check=True,
+            )
+        return
+
+    requests = _requests(args)
+    if args.url:
+        label = args.url
+        report = asyncio.run(run_over_socket(args.url, requests, args.concurrency, label))
+    else:
+        from app.config import settings
+
+        label = f"in-process, REPOSITORY_MODE={settings.repository_mode}"
+        report = asyncio.run(run_in_process(requests, args.concurrency, label))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report.to_dict(), indent=2) + "\n")
+
+
+def _without_option(argv: list[str], option: str) -> list[str]:
+    """argv minus `option` and the values that follow it"""
+    result, skipping = [], False
+    for arg in argv:
+        if arg == option or arg.startswith(option + "="):
+            skipping = arg == option
+            continue
+        if skipping and not arg.startswith("--"):
+            continue
+        skipping = False
+        result.append(arg)
+    return result
+
+
+if __name__ == "__main__":
+    main()